@@ -4,7 +4,8 @@ setup(
     name="stressandra",
     version="0.1",
     packages=find_packages(),
-    install_requires=["cassandra-driver", "jmxquery"],
+    package_data={"stressandra": ["java/*.java"]},
+    install_requires=["cassandra-driver", "numpy"],
     entry_points={
         "console_scripts": [
             "stressandra = stressandra.cli:main"
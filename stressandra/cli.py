@@ -5,6 +5,7 @@ import argparse
 # import pkg_resources
 import yaml
 import datetime
+import os
 # import os
 # from tqdm import tqdm
 # from cassandra import ConsistencyLevel
@@ -114,6 +115,66 @@ import datetime
 from .stressandra import Stressandra
 from .config import Config
 from .db import get_session
+from .generators import benchmark_generators
+from .timeseries import TimeSeriesStore
+
+def load_stressandra(args):
+    with open(args.config, "r") as config_file:
+        config_yaml = yaml.safe_load(config_file)
+
+    return Stressandra(
+        hostIPs=[host['host'] for host in config_yaml['hosts']],
+        hostPorts=[host['port'] for host in config_yaml['hosts']],
+        hostJMXPorts=[host['jmx_port'] for host in config_yaml['hosts']],
+        rate=config_yaml['rate'],
+        duration=config_yaml['duration'],
+        warmup_duration=config_yaml['warmup_duration'],
+        consistency=config_yaml['consistency'],
+        jmx_metrics=config_yaml['jmx_metrics'],
+        jmx_interval=config_yaml.get('jmx_interval', 1.0),
+        replication_factor=config_yaml['replication_factor'],
+        keyspace=config_yaml['keyspace'],
+        table=config_yaml['table'],
+        write_test=config_yaml['write_test'],
+        read_test=config_yaml['read_test'],
+        engine=config_yaml.get('engine', 'async'),
+        max_in_flight=config_yaml.get('max_in_flight', 1024),
+        prepared=config_yaml.get('prepared', True),
+        workers=args.workers or config_yaml.get('workers', 1),
+        search=config_yaml.get('search'),
+        rate_profile=config_yaml.get('rate_profile'),
+        coordinator=config_yaml.get('coordinator', 'pinned'),
+        shared_cluster=config_yaml.get('shared_cluster', False),
+        connections_per_host=config_yaml.get('connections_per_host'),
+        max_requests_per_connection=config_yaml.get('max_requests_per_connection'),
+        protocol_version=config_yaml.get('protocol_version'),
+        retention=config_yaml.get('retention'),
+        seed=config_yaml.get('seed'),
+        key_distribution=config_yaml.get('key_distribution'),
+        reads=config_yaml.get('reads'),
+        mixed_test=config_yaml.get('mixed_test', False),
+        operations=config_yaml.get('operations'),
+        workload=config_yaml.get('workload'),
+        payload=config_yaml.get('payload'),
+        wide_test=config_yaml.get('wide_test', False),
+        wide=config_yaml.get('wide'),
+        lwt_test=config_yaml.get('lwt_test', False),
+        lwt=config_yaml.get('lwt'),
+        counter_test=config_yaml.get('counter_test', False),
+        counters=config_yaml.get('counters'),
+        scan_test=config_yaml.get('scan_test', False),
+        scan=config_yaml.get('scan'),
+        load={**(config_yaml.get('load') or {}), **load_overrides(args)}
+    )
+
+def load_overrides(args):
+    """Load settings given on the command line of the load command."""
+    overrides = {}
+    if getattr(args, "rows", None):
+        overrides["rows"] = args.rows
+    if getattr(args, "bytes", None):
+        overrides["bytes"] = args.bytes
+    return overrides
 
 def main():
     parser = argparse.ArgumentParser(description="Stressandra: A Cassandra Stress Testing Tool")
@@ -123,6 +184,26 @@ def main():
 
     run_parser = subparsers.add_parser("run", help="Run the Cassandra stress test")
     run_parser.add_argument("--config", type=str, default="./default_config.yaml", help="Input YAML file with the required configuration")
+    run_parser.add_argument("--workers", type=int, default=None, help="Number of load generator processes (overrides the config)")
+
+    search_parser = subparsers.add_parser("search", help="Find the highest rate that stays within the latency SLO")
+    search_parser.add_argument("--config", type=str, default="./default_config.yaml", help="Input YAML file with the required configuration")
+    search_parser.add_argument("--workers", type=int, default=None, help="Number of load generator processes (overrides the config)")
+
+    load_parser = subparsers.add_parser("load", help="Fill the table with a dataset as fast as the cluster allows")
+    load_parser.add_argument("--config", type=str, default="./default_config.yaml", help="Input YAML file with the required configuration")
+    load_parser.add_argument("--workers", type=int, default=None, help="Number of loader processes (overrides the config)")
+    load_parser.add_argument("--rows", type=int, default=None, help="Rows to load (overrides the config)")
+    load_parser.add_argument("--bytes", type=int, default=None, help="Value bytes to load; takes precedence over rows")
+
+    export_parser = subparsers.add_parser("export", help="Export a run's metrics.npz time series to CSV")
+    export_parser.add_argument("input", type=str, help="metrics.npz file under a run's metrics directory")
+    export_parser.add_argument("--output", type=str, default=None, help="CSV file to write (defaults to the input with .csv)")
+
+    genbench_parser = subparsers.add_parser("genbench", help="Measure how many ops/sec one core can generate without a cluster")
+    genbench_parser.add_argument("--duration", type=int, default=5, help="Seconds to run the benchmark for")
+    genbench_parser.add_argument("--seed", type=int, default=None, help="Seed of the key and value generators")
+    genbench_parser.add_argument("--payload-size", type=int, default=16, help="Size of each generated value in bytes")
 
     args = parser.parse_args()
 
@@ -131,26 +212,19 @@ def main():
         return
 
     if args.command == "run":
-        with open(args.config, "r") as config_file:
-            config_yaml = yaml.safe_load(config_file)
-
-        stressandra = Stressandra(
-            hostIPs=[host['host'] for host in config_yaml['hosts']],
-            hostPorts=[host['port'] for host in config_yaml['hosts']],
-            hostJMXPorts=[host['jmx_port'] for host in config_yaml['hosts']],
-            rate=config_yaml['rate'],
-            duration=config_yaml['duration'],
-            warmup_duration=config_yaml['warmup_duration'],
-            consistency=config_yaml['consistency'],
-            jmx_metrics=config_yaml['jmx_metrics'],
-            replication_factor=config_yaml['replication_factor'],
-            keyspace=config_yaml['keyspace'],
-            table=config_yaml['table'],
-            write_test=config_yaml['write_test'],
-            read_test=config_yaml['read_test']
-        )
-
-        stressandra.run()
+        load_stressandra(args).run()
+    elif args.command == "search":
+        load_stressandra(args).run_search()
+    elif args.command == "load":
+        load_stressandra(args).run_bulk_load()
+    elif args.command == "export":
+        output = args.output or f"{os.path.splitext(args.input)[0]}.csv"
+        TimeSeriesStore.load(args.input).to_csv(output)
+        print(f"Exported {args.input} to {output}")
+    elif args.command == "genbench":
+        results = benchmark_generators(args.duration, args.seed, payload={"size": args.payload_size})
+        print(f"Generated {results['Ops per Second']:,.0f} ops/sec per core "
+              f"(key refill {results['Key Refill per Second']:,.0f} keys/sec)")
     else:
         parser.print_help()  # Prints description if no subcommand is given
 
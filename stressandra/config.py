@@ -9,7 +9,17 @@ import os
 from tqdm import tqdm
 from cassandra import ConsistencyLevel
 import re
+import math
 from cassandra.cluster import Cluster
+from .profile import RateProfile
+from .db import COORDINATOR_MODES
+from .retention import RETENTION_MODES
+from .distributions import DISTRIBUTION_DEFAULTS, validate_distribution
+from .generators import MIX_DEFAULTS, PAYLOAD_MODES
+from .workload import WorkloadProfile
+from .wide import WidePartitions
+from .lwt import LWT_OPS
+from .counters import COUNTER_VERIFY_LEVELS
 
 def is_valid_ip(ip):
     return bool(re.match(r"^(?:\d{1,3}\.){3}\d{1,3}$", ip))
@@ -20,10 +30,89 @@ def is_valid_port(port):
 def make_consistency(consistency: str):
     return getattr(ConsistencyLevel, consistency.upper(), ConsistencyLevel.ONE)
 
+SEARCH_DEFAULTS = {
+    "min_rate": 100,
+    "max_rate": 10000,
+    "step_duration": 60,
+    "p99_ms": 10,
+    "max_error_rate": 0.001,
+    "strategy": "binary",
+    "tolerance": 50,
+    "ramp_step": 500,
+}
+
+RETENTION_DEFAULTS = {
+    "mode": "none",
+    "max_keys": 1000000,
+    "max_age": None,
+    "delete_rate": 1000,
+    "ttl": None,
+}
+
+READ_DEFAULTS = {
+    "miss_ratio": 0.0,
+    "record_keys": 100000,
+}
+
+PAYLOAD_DEFAULTS = {
+    "mode": "fixed",
+    "size": 16,
+    "min_size": 16,
+    "max_size": 1024,
+    "sizes": None,
+    "weights": None,
+    "buffer_size": 16777216,
+}
+
+WIDE_DEFAULTS = {
+    "table": None,
+    "partitions": 1000,
+    "min_rows": 100,
+    "max_rows": 100,
+    "slice_rows": [10, 100, 1000],
+    "range_ratio": 0.0,
+    "fetch_size": 5000,
+}
+
+LWT_DEFAULTS = {
+    "keys": 10000,
+    "contention": 1,
+    "serial_consistency": "SERIAL",
+    "operations": {"insert": 50, "update": 40, "read": 10},
+}
+
+COUNTER_DEFAULTS = {
+    "table": None,
+    "keys": 10000,
+    "max_delta": 1,
+    "verify_consistency": "ALL",
+}
+
+SCAN_DEFAULTS = {
+    "table": None,
+    "partition_key": "id",
+    "splits_per_range": 1,
+    "parallelism": 16,
+    "fetch_size": 5000,
+}
+
+LOAD_DEFAULTS = {
+    "rows": 1000000,
+    "bytes": None,
+    "chunk_rows": 10000,
+    "concurrency": 256,
+    "checkpoint": None,
+}
+
 class Config:
     def __init__(self, hostIPs=[], hostPorts=[], hostJMXPorts=[], rate=50, duration=30, warmup_duration=300,
                  consistency='ONE', jmx_metrics=[], replication_factor=1, keyspace='stressandra_test_ks',
-                 table="stressandra_test_table", write_test=False, read_test=False):
+                 table="stressandra_test_table", write_test=False, read_test=False, mixed_test=False, wide_test=False,
+                 lwt_test=False, counter_test=False, scan_test=False, engine='async', max_in_flight=1024,
+                 prepared=True, workers=1, search=None, rate_profile=None, coordinator='pinned', shared_cluster=False,
+                 connections_per_host=None, max_requests_per_connection=None, protocol_version=None, retention=None,
+                 seed=None, key_distribution=None, reads=None, operations=None, workload=None,
+                 payload=None, wide=None, lwt=None, counters=None, scan=None, load=None, jmx_interval=1.0):
         self.hostIPs = hostIPs
         self.hostPorts = hostPorts
         self.hostJMXPorts = hostJMXPorts
@@ -32,16 +121,80 @@ class Config:
         self.warmup_duration = warmup_duration
         self.consistency = make_consistency(consistency)
         self.jmx_metrics = jmx_metrics
+        self.jmx_interval = jmx_interval
         self.replication_factor = replication_factor
         self.keyspace = keyspace
         self.table = table
         self.write_test = write_test
         self.read_test = read_test
+        self.mixed_test = mixed_test
+        self.wide_test = wide_test
+        self.lwt_test = lwt_test
+        self.counter_test = counter_test
+        self.scan_test = scan_test
+        self.engine = engine
+        self.max_in_flight = max_in_flight
+        self.prepared = prepared
+        self.workers = workers
+        self.search = {**SEARCH_DEFAULTS, **(search or {})}
+        self.rate_profile = RateProfile(rate_profile) if rate_profile else None
+        self.coordinator = coordinator
+        self.shared_cluster = shared_cluster
+        self.connections_per_host = connections_per_host
+        self.max_requests_per_connection = max_requests_per_connection
+        self.protocol_version = protocol_version
+        self.retention = {**RETENTION_DEFAULTS, **(retention or {})}
+        self.seed = seed
+        self.key_distribution = {**DISTRIBUTION_DEFAULTS, **(key_distribution or {})}
+        self.reads = {**READ_DEFAULTS, **(reads or {})}
+        self.operations = dict(operations or MIX_DEFAULTS)
+        self.workload = WorkloadProfile(**workload) if workload else None
+        self.payload = {**PAYLOAD_DEFAULTS, **(payload or {})}
+        self.wide = {**WIDE_DEFAULTS, **(wide or {})}
+        self.wide_partitions = WidePartitions(self.wide["table"] or f"{table}_wide",
+                                              **{key: value for key, value in self.wide.items() if key != "table"})
+        self.lwt = {**LWT_DEFAULTS, **(lwt or {})}
+        self.counters = {**COUNTER_DEFAULTS, **(counters or {})}
+        self.counters["table"] = self.counters["table"] or f"{table}_counters"
+        self.scan = {**SCAN_DEFAULTS, **(scan or {})}
+        self.scan["table"] = self.scan["table"] or table
+        self.load = {**LOAD_DEFAULTS, **(load or {})}
+        self.load["checkpoint"] = self.load["checkpoint"] or f"./logs/load-{keyspace}.{table}.json"
+        if self.rate_profile:
+            self.duration = math.ceil(self.rate_profile.duration)  # the profile defines how long the test runs
         self.logs_dir = f'./logs/{datetime.datetime.now().strftime("%d-%m-%y-%H-%M-%S")}'
         self.metrics_dir = f'{self.logs_dir}/metrics'
+        self.latency_dir = f'{self.logs_dir}/latency'
         self.cluster_size = len(hostIPs)
         self.validate()  # Auto-validate upon initialization
 
+    def engine_options(self):
+        """Keyword arguments for AsyncEngine, shared with worker processes."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "prepared": self.prepared,
+            "retention": self.retention,
+            "seed": self.seed,
+            "distribution": self.key_distribution,
+            "reads": self.reads,
+            "operations": self.operations,
+            "workload": self.workload,
+            "payload": self.payload,
+            "wide": self.wide_partitions,
+            "lwt": self.lwt,
+            "counters": self.counters,
+        }
+
+    def session_options(self):
+        """Keyword arguments for db.get_sessions, shared with worker processes."""
+        return {
+            "coordinator": self.coordinator,
+            "shared_cluster": self.shared_cluster,
+            "connections_per_host": self.connections_per_host,
+            "max_requests_per_connection": self.max_requests_per_connection,
+            "protocol_version": self.protocol_version,
+        }
+
     def validate(self):
         if not all(is_valid_ip(ip) for ip in self.hostIPs):
             raise ValueError("Invalid IP address in hostIPs.")
@@ -70,12 +223,211 @@ class Config:
         if not isinstance(self.table, str) or not self.table:
             raise ValueError("Table must be a non-empty string.")
 
-        if not isinstance(self.write_test, bool) or not isinstance(self.read_test, bool):
-            raise ValueError("write_test and read_test must be boolean values.")
+        tests = (self.write_test, self.read_test, self.mixed_test, self.wide_test, self.lwt_test, self.counter_test,
+                 self.scan_test)
+        if not all(isinstance(test, bool) for test in tests):
+            raise ValueError("write_test, read_test, mixed_test, wide_test, lwt_test, counter_test and scan_test must be boolean values.")
+
+        if not isinstance(self.prepared, bool):
+            raise ValueError("prepared must be a boolean value.")
         
+        if self.engine not in ("async", "threads"):
+            raise ValueError("Engine must be either 'async' or 'threads'.")
+
+        if not isinstance(self.max_in_flight, int) or self.max_in_flight <= 0:
+            raise ValueError("max_in_flight must be a positive integer.")
+
+        if not isinstance(self.workers, int) or self.workers <= 0:
+            raise ValueError("Workers must be a positive integer.")
+
+        if self.workers > 1 and self.engine != "async":
+            raise ValueError("Multiple workers require the async engine.")
+
+        if self.workers > self.rate:
+            raise ValueError("Rate must be at least the number of workers.")
+
+        if self.coordinator not in COORDINATOR_MODES:
+            raise ValueError(f"Coordinator must be one of {COORDINATOR_MODES}.")
+
+        if not isinstance(self.shared_cluster, bool):
+            raise ValueError("shared_cluster must be a boolean value.")
+
+        for name in ("connections_per_host", "max_requests_per_connection", "protocol_version"):
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                raise ValueError(f"{name} must be a positive integer.")
+
+        if set(self.retention) != set(RETENTION_DEFAULTS):
+            raise ValueError(f"Unknown retention settings: {sorted(set(self.retention) - set(RETENTION_DEFAULTS))}")
+
+        if self.retention["mode"] not in RETENTION_MODES:
+            raise ValueError(f"Retention mode must be one of {RETENTION_MODES}.")
+
+        if self.retention["mode"] == "ring" and (self.retention["max_keys"] <= 0 or self.retention["delete_rate"] <= 0):
+            raise ValueError("Ring retention needs a positive max_keys and delete_rate.")
+
+        if self.retention["mode"] == "ttl" and (not isinstance(self.retention["ttl"], int) or self.retention["ttl"] <= 0):
+            raise ValueError("TTL retention needs a positive integer ttl.")
+
+        if self.seed is not None and (not isinstance(self.seed, int) or self.seed < 0):
+            raise ValueError("Seed must be a non-negative integer.")
+
+        validate_distribution(self.key_distribution)
+
+        if set(self.reads) != set(READ_DEFAULTS):
+            raise ValueError(f"Unknown reads settings: {sorted(set(self.reads) - set(READ_DEFAULTS))}")
+
+        if not 0 <= self.reads["miss_ratio"] <= 1:
+            raise ValueError("Read miss_ratio must be between 0 and 1.")
+
+        if not isinstance(self.reads["record_keys"], int) or self.reads["record_keys"] < 0:
+            raise ValueError("Read record_keys must be a non-negative integer.")
+
+        if set(self.operations) - set(MIX_DEFAULTS):
+            raise ValueError(f"Unknown operations: {sorted(set(self.operations) - set(MIX_DEFAULTS))}")
+
+        if any(weight < 0 for weight in self.operations.values()) or sum(self.operations.values()) <= 0:
+            raise ValueError("Operation weights must be non-negative and not all zero.")
+
+        if self.mixed_test and self.engine != "async":
+            raise ValueError("The mixed test requires the async engine.")
+
+        if set(self.payload) != set(PAYLOAD_DEFAULTS):
+            raise ValueError(f"Unknown payload settings: {sorted(set(self.payload) - set(PAYLOAD_DEFAULTS))}")
+
+        if self.payload["mode"] not in PAYLOAD_MODES:
+            raise ValueError(f"Payload mode must be one of {PAYLOAD_MODES}.")
+
+        if self.payload["mode"] == "fixed" and self.payload["size"] <= 0:
+            raise ValueError("Payload size must be positive.")
+
+        if self.payload["mode"] == "uniform" and not 0 < self.payload["min_size"] <= self.payload["max_size"]:
+            raise ValueError("Payload min_size must be positive and not above max_size.")
+
+        if self.payload["mode"] == "histogram":
+            sizes, weights = self.payload["sizes"], self.payload["weights"]
+            if not sizes or any(size <= 0 for size in sizes):
+                raise ValueError("Histogram payloads need a list of positive sizes.")
+            if weights is not None and (len(weights) != len(sizes) or any(w < 0 for w in weights) or sum(weights) <= 0):
+                raise ValueError("Histogram payload weights must match sizes and not all be zero.")
+
+        if set(self.wide) != set(WIDE_DEFAULTS):
+            raise ValueError(f"Unknown wide settings: {sorted(set(self.wide) - set(WIDE_DEFAULTS))}")
+
+        if not isinstance(self.wide["partitions"], int) or self.wide["partitions"] <= 0:
+            raise ValueError("Wide partitions must be a positive integer.")
+
+        if not 0 < self.wide["min_rows"] <= self.wide["max_rows"]:
+            raise ValueError("Wide min_rows must be positive and not above max_rows.")
+
+        if not self.wide["slice_rows"] or any(rows <= 0 for rows in self.wide["slice_rows"]):
+            raise ValueError("Wide slice_rows must be a list of positive row counts.")
+
+        if not 0 <= self.wide["range_ratio"] <= 1:
+            raise ValueError("Wide range_ratio must be between 0 and 1.")
+
+        if not isinstance(self.wide["fetch_size"], int) or self.wide["fetch_size"] <= 0:
+            raise ValueError("Wide fetch_size must be a positive integer.")
+
+        if self.wide_test and self.engine != "async":
+            raise ValueError("The wide test requires the async engine.")
+
+        if set(self.lwt) != set(LWT_DEFAULTS):
+            raise ValueError(f"Unknown lwt settings: {sorted(set(self.lwt) - set(LWT_DEFAULTS))}")
+
+        if not isinstance(self.lwt["keys"], int) or self.lwt["keys"] <= 0:
+            raise ValueError("LWT keys must be a positive integer.")
+
+        if not isinstance(self.lwt["contention"], int) or self.lwt["contention"] <= 0:
+            raise ValueError("LWT contention must be a positive integer.")
+
+        if self.lwt["serial_consistency"].upper() not in ("SERIAL", "LOCAL_SERIAL"):
+            raise ValueError("LWT serial_consistency must be SERIAL or LOCAL_SERIAL.")
+
+        if set(self.lwt["operations"]) - set(LWT_OPS) or sum(self.lwt["operations"].values()) <= 0:
+            raise ValueError(f"LWT operations must weight some of {LWT_OPS}.")
+
+        if self.lwt_test and self.engine != "async":
+            raise ValueError("The LWT test requires the async engine.")
+
+        if set(self.counters) != set(COUNTER_DEFAULTS):
+            raise ValueError(f"Unknown counter settings: {sorted(set(self.counters) - set(COUNTER_DEFAULTS))}")
+
+        if not isinstance(self.counters["keys"], int) or self.counters["keys"] <= 0:
+            raise ValueError("Counter keys must be a positive integer.")
+
+        if not isinstance(self.counters["max_delta"], int) or self.counters["max_delta"] <= 0:
+            raise ValueError("Counter max_delta must be a positive integer.")
+
+        if self.counters["verify_consistency"].upper() not in COUNTER_VERIFY_LEVELS:
+            raise ValueError(f"Counter verify_consistency must be one of {COUNTER_VERIFY_LEVELS}.")
+
+        if self.counter_test and self.engine != "async":
+            raise ValueError("The counter test requires the async engine.")
+
+        if self.counter_test and self.consistency == ConsistencyLevel.ANY:
+            raise ValueError("Counter updates cannot be written at consistency ANY.")
+
+        if set(self.scan) != set(SCAN_DEFAULTS):
+            raise ValueError(f"Unknown scan settings: {sorted(set(self.scan) - set(SCAN_DEFAULTS))}")
+
+        for setting in ("splits_per_range", "parallelism", "fetch_size"):
+            if not isinstance(self.scan[setting], int) or self.scan[setting] <= 0:
+                raise ValueError(f"Scan {setting} must be a positive integer.")
+
+        for metric in self.jmx_metrics:
+            if "/" not in metric["mbean"].split(":", 1)[-1]:
+                raise ValueError(f"JMX metric {metric['name']} must name an attribute, e.g. {metric['mbean']}/Value "
+                                 f"for gauges or /Count for counters.")
+
+        if not isinstance(self.jmx_interval, (int, float)) or self.jmx_interval <= 0:
+            raise ValueError("jmx_interval must be a positive number of seconds.")
+
+        if set(self.load) != set(LOAD_DEFAULTS):
+            raise ValueError(f"Unknown load settings: {sorted(set(self.load) - set(LOAD_DEFAULTS))}")
+
+        for setting in ("rows", "chunk_rows", "concurrency"):
+            if not isinstance(self.load[setting], int) or self.load[setting] <= 0:
+                raise ValueError(f"Load {setting} must be a positive integer.")
+
+        if self.load["bytes"] is not None and (not isinstance(self.load["bytes"], int) or self.load["bytes"] <= 0):
+            raise ValueError("Load bytes must be a positive integer or null.")
+
+        if self.workload and self.engine != "async":
+            raise ValueError("Workload profiles require the async engine.")
+
+        if self.workload and (self.read_test or self.mixed_test):
+            raise ValueError("Workload profiles bring their own query mix; run them with write_test only.")
+
+        if self.workload and self.retention["mode"] != "none":
+            raise ValueError("Retention only applies to the built-in table; add USING TTL to workload queries instead.")
+
+        if self.rate_profile and self.engine != "async":
+            raise ValueError("Rate profiles require the async engine.")
+
+        if set(self.search) != set(SEARCH_DEFAULTS):
+            raise ValueError(f"Unknown search settings: {sorted(set(self.search) - set(SEARCH_DEFAULTS))}")
+
+        if self.search["strategy"] not in ("binary", "ramp"):
+            raise ValueError("Search strategy must be either 'binary' or 'ramp'.")
+
+        if not 0 < self.search["min_rate"] <= self.search["max_rate"]:
+            raise ValueError("Search min_rate must be positive and not above max_rate.")
+
+        if self.search["min_rate"] < self.workers:
+            raise ValueError("Search min_rate must be at least the number of workers, so every worker gets a share.")
+
         if len(self.hostIPs) != self.cluster_size or len(self.hostPorts) != self.cluster_size or len(self.hostJMXPorts) != self.cluster_size:
             raise ValueError("Length of hostIPs, Ports and JMX Ports must be the same")
 
-        if self.consistency == "ANY" and self.read_test:
-            print("ANY consistency is invalid for read operations, skipping read test...")
-            self.read_test = False
+        if self.read_test and self.consistency == ConsistencyLevel.ANY:
+            raise ValueError("Reads cannot run at consistency ANY; set consistency to ONE or higher for read_test.")
+
+        if self.mixed_test and self.consistency == ConsistencyLevel.ANY:
+            raise ValueError("The mixed test reads at the configured consistency, which cannot be ANY.")
+
+        if self.wide_test and self.consistency == ConsistencyLevel.ANY:
+            raise ValueError("The wide test reads its slices at the configured consistency, which cannot be ANY.")
+
+        if self.scan_test and self.consistency == ConsistencyLevel.ANY:
+            raise ValueError("Scans read at the configured consistency, which cannot be ANY.")
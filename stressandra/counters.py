@@ -0,0 +1,99 @@
+import numpy as np
+from cassandra import ConsistencyLevel
+from cassandra.concurrent import execute_concurrent_with_args
+from .distributions import KeyDistribution, index_keys
+from .generators import keys_from_buffer
+
+# Levels the end-of-run read-back may use; it should see every acknowledged increment.
+COUNTER_VERIFY_LEVELS = ("ONE", "QUORUM", "LOCAL_QUORUM", "ALL")
+
+def counter_table_cql(keyspace, table):
+    return f"CREATE TABLE IF NOT EXISTS {keyspace}.{table} (id uuid PRIMARY KEY, c counter)"
+
+class CounterSource:
+    """
+    Counter increments drawn in batches: which counter, its key and the delta to add.
+
+    Counters are picked with the run's key distribution, or uniformly among keys counters
+    when the distribution is random, so the expected total of every counter can be kept
+    in one array indexed by counter.
+
+    Parameters:
+    - keys (int): Number of counters when the key distribution is random.
+    - max_delta (int): Increments are drawn uniformly from 1..max_delta.
+    - distribution (dict): Key distribution settings, see distributions.KeyDistribution.
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - batch_size (int): Increments drawn per refill.
+    """
+    def __init__(self, keys=10000, max_delta=1, distribution=None, seed=None, batch_size=65536):
+        self.rng = np.random.default_rng(seed)
+        if not distribution or distribution.get("type", "random") == "random":
+            distribution = {**(distribution or {}), "type": "uniform", "partitions": keys}
+        self.distribution = KeyDistribution(self.rng, **distribution)
+        self.keys = self.distribution.partitions
+        self.max_delta = max_delta
+        self.batch_size = batch_size
+        self.updates = []
+        self.position = 0
+
+    def refill(self):
+        indices = self.distribution.sample(self.batch_size)
+        deltas = self.rng.integers(1, self.max_delta, size=self.batch_size, endpoint=True)
+        keys = keys_from_buffer(index_keys(indices, self.distribution.namespace))
+        self.updates = list(zip(indices.tolist(), keys, deltas.tolist()))
+        self.position = 0
+
+    def take(self):
+        """Returns an (index, key, delta) triple."""
+        if self.position == len(self.updates):
+            self.refill()
+        update = self.updates[self.position]
+        self.position += 1
+        return update
+
+def verify_counters(session, keyspace, table, expected, namespace=0, consistency=ConsistencyLevel.ALL, uncertain=0,
+                    concurrency=100):
+    """
+    Reads back every counter the run incremented and compares it with the client-side total.
+    Updates that failed on the client may still have been applied, so they are reported as
+    uncertain next to any mismatches.
+
+    Parameters:
+    - session (Session): Cassandra session object.
+    - expected (ndarray): Acknowledged increments per counter index.
+    - namespace (int): Key namespace the counters were written with.
+    - consistency (ConsistencyLevel): Read consistency of the check.
+    - uncertain (int): Number of failed updates during the run.
+    """
+    statement = session.prepare(f"SELECT c FROM {keyspace}.{table} WHERE id = ?")
+    statement.consistency_level = consistency
+    indices = np.flatnonzero(expected)
+    keys = keys_from_buffer(index_keys(indices, namespace))
+    results = execute_concurrent_with_args(session, statement, [(key,) for key in keys], concurrency=concurrency,
+                                           raise_on_first_error=False)
+
+    matched = mismatched = missing = errors = 0
+    actual_total = 0
+    for index, (success, rows) in zip(indices.tolist(), results):
+        if not success:
+            errors += 1
+            continue
+        row = rows.one()
+        if row is None:
+            missing += 1
+            continue
+        actual_total += row[0]
+        if row[0] == expected[index]:
+            matched += 1
+        else:
+            mismatched += 1
+    return {
+        "Counters": len(indices),
+        "Matched": matched,
+        "Mismatched": mismatched,
+        "Missing": missing,
+        "Read Errors": errors,
+        "Expected Total": int(expected.sum()),
+        "Actual Total": actual_total,
+        "Uncertain Updates": uncertain,
+    }
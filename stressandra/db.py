@@ -1,6 +1,111 @@
-from cassandra.cluster import Cluster
+from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
+from cassandra.policies import HostFilterPolicy, RoundRobinPolicy, TokenAwarePolicy, HostDistance
 
-def get_session(host, port):
-    cluster = Cluster([host], port=port)
+COORDINATOR_MODES = ("pinned", "token_aware", "driver")
+
+def is_endpoint(host, address, port):
+    return host.endpoint.address == address and host.endpoint.port == port
+
+def make_load_balancing_policy(host, port, coordinator):
+    """
+    - pinned: only the given host:port may coordinate, so per-node tests really hit that node.
+    - token_aware: requests go to a replica of the partition, skipping the extra coordinator hop.
+    - driver: the driver's default policy, spreading requests over the whole ring.
+    """
+    if coordinator == "pinned":
+        return HostFilterPolicy(RoundRobinPolicy(), predicate=lambda h: is_endpoint(h, host, port))
+    if coordinator == "token_aware":
+        return TokenAwarePolicy(RoundRobinPolicy())
+    return None
+
+def get_session(host, port, coordinator="driver"):
+    policy = make_load_balancing_policy(host, port, coordinator)
+    if policy is None:
+        cluster = Cluster([host], port=port)
+    else:
+        profile = ExecutionProfile(load_balancing_policy=policy)
+        cluster = Cluster([host], port=port, execution_profiles={EXEC_PROFILE_DEFAULT: profile})
     session = cluster.connect()
     return session
+
+class ProfiledSession:
+    """
+    View of a shared Session that sends every request through one execution profile, so
+    code written against a per-host session can run on a single shared Cluster.
+    """
+    def __init__(self, session, execution_profile):
+        self.session = session
+        self.execution_profile = execution_profile
+
+    def profiled(self, kwargs):
+        # execute_concurrent passes the default profile explicitly; this view's own profile replaces it.
+        if kwargs.get("execution_profile", EXEC_PROFILE_DEFAULT) is EXEC_PROFILE_DEFAULT:
+            kwargs["execution_profile"] = self.execution_profile
+        return kwargs
+
+    def execute(self, query, parameters=None, **kwargs):
+        return self.session.execute(query, parameters, **self.profiled(kwargs))
+
+    def execute_async(self, query, parameters=None, **kwargs):
+        return self.session.execute_async(query, parameters, **self.profiled(kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+def tune_connection_pools(cluster, connections_per_host, max_requests_per_connection):
+    if cluster.protocol_version >= 3:
+        print(f"Protocol v{cluster.protocol_version} multiplexes up to 32768 requests over one connection per host; "
+              "connections_per_host and max_requests_per_connection only apply to protocol v1/v2.")
+        return
+    if connections_per_host:
+        cluster.set_max_connections_per_host(HostDistance.LOCAL, connections_per_host)
+        cluster.set_core_connections_per_host(HostDistance.LOCAL, connections_per_host)
+    if max_requests_per_connection:
+        cluster.set_max_requests_per_connection(HostDistance.LOCAL, max_requests_per_connection)
+
+def get_shared_sessions(hosts, coordinator="pinned", connections_per_host=None, max_requests_per_connection=None,
+                        protocol_version=None):
+    """
+    Opens one Cluster for all hosts instead of one per host, so metadata, token maps and
+    the control connection are built once. Per-host routing is done with one execution
+    profile per host:port. Pinned hosts the driver did not discover raise a RuntimeError.
+
+    Parameters:
+    - hosts (list): (host, port) tuples, one per node.
+    - coordinator (str): Coordinator mode of each host's profile, see make_load_balancing_policy.
+    - connections_per_host (int): Connections opened to each host (protocol v1/v2 only).
+    - max_requests_per_connection (int): Requests per connection before opening another (protocol v1/v2 only).
+    - protocol_version (int): Native protocol version, or None to negotiate.
+    """
+    profiles = {}
+    for host, port in hosts:
+        policy = make_load_balancing_policy(host, port, coordinator)
+        profiles[f"{host}:{port}"] = ExecutionProfile(load_balancing_policy=policy) if policy else ExecutionProfile()
+    profiles[EXEC_PROFILE_DEFAULT] = profiles[f"{hosts[0][0]}:{hosts[0][1]}"]
+
+    options = {"protocol_version": protocol_version} if protocol_version else {}
+    cluster = Cluster(list(hosts), execution_profiles=profiles, **options)
+    session = cluster.connect()
+    if coordinator == "pinned":
+        # The driver only keeps contact points it finds in system.peers, so nodes sharing an
+        # address on different ports (e.g. docker on 127.0.0.1) would leave a profile with no host.
+        known = cluster.metadata.all_hosts()
+        missing = [f"{host}:{port}" for host, port in hosts if not any(is_endpoint(h, host, port) for h in known)]
+        if missing:
+            cluster.shutdown()
+            raise RuntimeError(f"Pinned coordinators {missing} are not in the shared cluster's metadata; "
+                               "set shared_cluster: false to open one cluster per node.")
+    if connections_per_host or max_requests_per_connection:
+        tune_connection_pools(cluster, connections_per_host, max_requests_per_connection)
+    return {f"{host}:{port}": ProfiledSession(session, f"{host}:{port}") for host, port in hosts}
+
+def get_sessions(hosts, coordinator="pinned", shared_cluster=False, connections_per_host=None,
+                 max_requests_per_connection=None, protocol_version=None):
+    """Returns a {host:port: session} dict, from one shared Cluster or one Cluster per host."""
+    if shared_cluster:
+        return get_shared_sessions(hosts, coordinator, connections_per_host, max_requests_per_connection, protocol_version)
+    sessions = {}
+    for host, port in hosts:
+        print(f"Creating session for node {host}:{port}")
+        sessions[f"{host}:{port}"] = get_session(host, port, coordinator)
+    return sessions
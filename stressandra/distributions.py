@@ -0,0 +1,129 @@
+import numpy as np
+
+DISTRIBUTION_TYPES = ("random", "uniform", "zipfian", "gaussian", "sequential", "hotspot")
+
+DISTRIBUTION_DEFAULTS = {
+    "type": "random",
+    "partitions": 1000000,
+    "namespace": 0,
+    "exponent": 0.99,
+    "mean": 0.5,
+    "stddev": 0.1,
+    "hot_fraction": 0.2,
+    "hot_probability": 0.8,
+    "start": 0,
+}
+
+# Above this many partitions the zipfian CDF table gets too large and the continuous approximation is used.
+MAX_ZIPFIAN_TABLE = 1 << 22
+
+class KeyDistribution:
+    """
+    Draws partition indices in [0, partitions) in batches.
+
+    - random: no index at all, every write gets a fresh random key (write-once, the default).
+    - uniform: every partition is equally likely.
+    - zipfian: partition i is drawn with probability proportional to 1 / (i + 1) ** exponent.
+    - gaussian: indices are normal around mean * partitions with stddev * partitions.
+    - sequential: partitions in order from start, wrapping around.
+    - hotspot: hot_probability of the draws go to the first hot_fraction of partitions.
+
+    Indices become keys through index_keys, so any process using the same partitions and
+    namespace sees the same key for the same index, and hot indices are scattered over
+    the token ring instead of clustered.
+
+    Parameters:
+    - rng (Generator): NumPy generator the indices are drawn from.
+    - settings (dict): Distribution settings, see DISTRIBUTION_DEFAULTS.
+    """
+    def __init__(self, rng, **settings):
+        settings = {**DISTRIBUTION_DEFAULTS, **settings}
+        self.rng = rng
+        self.type = settings["type"]
+        self.partitions = settings["partitions"]
+        self.namespace = settings["namespace"]
+        self.exponent = settings["exponent"]
+        self.mean = settings["mean"]
+        self.stddev = settings["stddev"]
+        self.hot_fraction = settings["hot_fraction"]
+        self.hot_probability = settings["hot_probability"]
+        self.next_index = settings["start"]
+        self.cdf = None
+        if self.type == "zipfian" and self.partitions <= MAX_ZIPFIAN_TABLE:
+            weights = 1 / np.arange(1, self.partitions + 1, dtype=np.float64) ** self.exponent
+            self.cdf = np.cumsum(weights)
+            self.cdf /= self.cdf[-1]
+
+    def sample(self, n):
+        """Returns n partition indices as a uint64 array."""
+        if self.type == "uniform":
+            indices = self.rng.integers(0, self.partitions, size=n)
+        elif self.type == "zipfian":
+            indices = self.sample_zipfian(n)
+        elif self.type == "gaussian":
+            indices = np.rint(self.rng.normal(self.mean * self.partitions, self.stddev * self.partitions, size=n))
+            indices = np.clip(indices, 0, self.partitions - 1)
+        elif self.type == "sequential":
+            indices = (self.next_index + np.arange(n)) % self.partitions
+            self.next_index = (self.next_index + n) % self.partitions
+        elif self.type == "hotspot":
+            hot_partitions = max(1, int(self.partitions * self.hot_fraction))
+            hot = self.rng.random(n) < self.hot_probability
+            indices = np.where(hot, self.rng.integers(0, hot_partitions, size=n),
+                               self.rng.integers(hot_partitions, max(self.partitions, hot_partitions + 1), size=n))
+            indices = np.minimum(indices, self.partitions - 1)
+        else:
+            raise ValueError(f"Distribution '{self.type}' does not draw indices.")
+        return indices.astype(np.uint64)
+
+    def sample_zipfian(self, n):
+        u = self.rng.random(n)
+        if self.cdf is not None:
+            return np.searchsorted(self.cdf, u, side="right")
+        # Inverse CDF of the continuous power law on [1, partitions + 1), close to the
+        # discrete one for large key spaces and free of any per-partition table.
+        if abs(self.exponent - 1) < 1e-9:
+            x = (self.partitions + 1.0) ** u
+        else:
+            a = 1 - self.exponent
+            x = (((self.partitions + 1.0) ** a - 1) * u + 1) ** (1 / a)
+        return np.minimum(np.floor(x) - 1, self.partitions - 1)
+
+def splitmix64(values):
+    """Vectorized splitmix64 finalizer; uint64 arithmetic wraps like the reference implementation."""
+    z = values + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def index_keys(indices, namespace=0):
+    """
+    Maps partition indices to 16-byte version-4 UUID keys as an (n, 16) uint8 buffer.
+    The mapping is a pure function of (index, namespace), so readers can regenerate the
+    keys writers used without storing them.
+    """
+    indices = np.asarray(indices, dtype=np.uint64)
+    halves = np.empty((len(indices), 2), dtype=">u8")
+    with np.errstate(over="ignore"):
+        salt = splitmix64(np.uint64(namespace))
+        halves[:, 0] = splitmix64(indices ^ salt)
+        halves[:, 1] = splitmix64(indices + salt * np.uint64(2) + np.uint64(1))
+    buffer = halves.view(np.uint8).reshape(-1, 16)
+    buffer[:, 6] = (buffer[:, 6] & 0x0F) | 0x40  # version 4
+    buffer[:, 8] = (buffer[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    return buffer
+
+def validate_distribution(settings):
+    """Raises ValueError for distribution settings the sampler cannot honour."""
+    if set(settings) != set(DISTRIBUTION_DEFAULTS):
+        raise ValueError(f"Unknown key_distribution settings: {sorted(set(settings) - set(DISTRIBUTION_DEFAULTS))}")
+    if settings["type"] not in DISTRIBUTION_TYPES:
+        raise ValueError(f"Key distribution type must be one of {DISTRIBUTION_TYPES}.")
+    if not isinstance(settings["partitions"], int) or settings["partitions"] <= 0:
+        raise ValueError("Key distribution partitions must be a positive integer.")
+    if settings["type"] == "zipfian" and settings["exponent"] <= 0:
+        raise ValueError("Zipfian exponent must be positive.")
+    if settings["type"] == "gaussian" and settings["stddev"] <= 0:
+        raise ValueError("Gaussian stddev must be positive.")
+    if settings["type"] == "hotspot" and not (0 < settings["hot_fraction"] < 1 and 0 <= settings["hot_probability"] <= 1):
+        raise ValueError("Hotspot needs 0 < hot_fraction < 1 and 0 <= hot_probability <= 1.")
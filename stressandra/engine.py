@@ -0,0 +1,390 @@
+import threading
+import time
+import numpy as np
+from cassandra import ConsistencyLevel
+from .statements import StatementCache
+from .histogram import LatencyHistogram
+from .scheduler import RateScheduler, scale_rate
+from .retention import Retention, KeyRing
+from .workload import RowSource
+from .wide import WideRowSource, SliceSource, size_bucket
+from .lwt import LwtSource
+from .counters import CounterSource
+from .generators import KeyPool, ReadKeyPool, ValuePool, OperationMix, MIX_DEFAULTS, stream_seed
+
+# The op each single-operation engine sends; mixed runs and workload profiles draw theirs from a mix.
+OPERATION_OPS = {"write": "insert", "read": "read", "wide_load": "wide_insert", "wide_read": "wide_read",
+                 "counter": "counter_update"}
+
+class EngineTarget:
+    def __init__(self, session, host, port, prepared=True, retention=None, queries=None, fetch_size=None,
+                 serial_consistency=None):
+        self.session = session
+        self.statements = StatementCache(session, prepared, queries, fetch_size, serial_consistency)
+        self.retention = Retention(**(retention or {}))
+        self.host = host
+        self.port = port
+        self.name = f"{host}:{port}"
+        self.sent = 0
+        self.completed = 0
+        self.errors = 0
+        self.deleted = 0
+        self.delete_errors = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.intended_misses = 0
+        self.last_error = None
+
+class AsyncEngine:
+    """
+    Open-loop write, read or mixed load generator built on Session.execute_async.
+
+    A single thread issues requests on a RateScheduler and round-robins them across
+    all targets. Completions are collected through driver callbacks, so the number of
+    outstanding requests is bounded by max_in_flight rather than by a thread count.
+
+    Latency is measured from each op's intended send time on the schedule, not from when
+    it was actually sent, so time spent queued behind the in-flight cap shows up as latency
+    instead of silently lowering throughput. Each per-second rate sample also carries the
+    latency of that interval, so latency can be plotted against the offered load.
+
+    Parameters:
+    - targets (list): (session, host, port) tuples, one per node.
+    - rate (int or RateProfile): Number of requests per second per target.
+    - duration (int): Duration of the test in seconds.
+    - consistency (ConsistencyLevel): Write consistency level.
+    - keyspace (str): Keyspace to write into.
+    - table (str): Table to write into.
+    - max_in_flight (int): Maximum number of outstanding requests across all targets.
+    - prepared (bool): Whether to use prepared statements or plain CQL.
+    - retention (dict): Retention settings per target, see retention.Retention. Deletes of
+      expired keys are rate-limited background ops, not part of the schedule.
+    - seed (int or list): Seed of the key and value generators; None draws one from the OS.
+    - distribution (dict): Key distribution settings, see distributions.KeyDistribution.
+    - reads (dict): miss_ratio of reads and record_keys, how many written keys are kept to read back.
+    - operation (str): 'write', 'read' or 'mixed'. Reads are reported as read_hit or read_miss
+      by whether a row came back, so the bloom filter and data paths get separate histograms.
+    - written (KeyRing): Written keys to read back; by default a new record filled by this engine's writes.
+    - operations (dict): Relative weights of insert, read and delete in a mixed run. Every op
+      is drawn from the mix and sent on the one schedule, so reads run under write pressure.
+    - workload (WorkloadProfile): User-defined queries to send instead of the built-in ones,
+      drawn by their weights with bind parameters from the profile's column generators.
+    - payload (dict): Size settings of the written values, see generators.ValuePool.
+    - wide (WidePartitions): Wide-partition layout; 'wide_load' fills its table row by row and
+      'wide_read' pages through slice and range reads, with latency also grouped by
+      partition size and rows returned.
+    - stripe (tuple): (index, count) of this engine among worker processes; a wide load fills
+      every count-th partition starting at index.
+    - lwt (dict): Settings of the 'lwt' operation: keys, contention, serial_consistency and
+      operations, see lwt.LwtSource. Conditional writes are counted as applied or not
+      applied and their CAS latency is also split by outcome.
+    - counters (dict): Settings of the 'counter' operation: table, keys and max_delta, see
+      counters.CounterSource. Acknowledged increments are summed per counter in
+      counter_expected so the final values can be verified.
+    """
+    def __init__(self, targets, rate, duration, consistency, keyspace, table, max_in_flight=1024, prepared=True,
+                 retention=None, seed=None, distribution=None, reads=None, operation="write", written=None,
+                 operations=None, workload=None, payload=None, wide=None,
+                 stripe=(0, 1), lwt=None, counters=None):
+        queries = workload.statement_templates() if workload else None
+        fetch_size = wide.fetch_size if wide else None
+        self.serial_consistency = None
+        if operation == "lwt":
+            self.serial_consistency = getattr(ConsistencyLevel, lwt.get("serial_consistency", "SERIAL").upper())
+        self.targets = [EngineTarget(session, host, port, prepared, retention, queries, fetch_size, self.serial_consistency)
+                        for session, host, port in targets]
+        self.rate = rate
+        self.duration = duration
+        self.consistency = consistency
+        self.keyspace = keyspace
+        self.table = table
+        if operation in ("wide_load", "wide_read"):
+            self.table = wide.table
+        elif operation == "counter":
+            self.table = counters["table"]
+        self.max_in_flight = max_in_flight
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.lock = threading.Lock()
+        self.elapsed = 0
+        self.cpu_time = 0
+        self.histograms = {}
+        self.coordinators = {}
+        self.reads = reads or {}
+        self.operation = operation
+        if written is None and operation != "read" and self.reads.get("record_keys"):
+            written = KeyRing(self.reads["record_keys"])
+        self.written = written
+        self.keys = KeyPool(stream_seed(seed, 0), distribution=distribution)
+        self.values = ValuePool(stream_seed(seed, 1), **(payload or {}))
+        self.read_keys = None
+        self.delete_keys = None
+        if operation in ("read", "mixed"):
+            # Mixed runs read keys written moments earlier, so they refill in small batches.
+            self.read_keys = ReadKeyPool(stream_seed(seed, 2), 1024 if operation == "mixed" else 65536, distribution,
+                                         written, self.reads.get("miss_ratio", 0.0))
+        if operation == "mixed":
+            self.delete_keys = ReadKeyPool(stream_seed(seed, 3), 1024, distribution, written)
+        self.mix = OperationMix(operations or MIX_DEFAULTS, stream_seed(seed, 4)) if operation == "mixed" else None
+        self.workload = workload
+        if workload:
+            self.rows = RowSource(workload, stream_seed(seed, 5), distribution)
+            self.mix = OperationMix(workload.weights(), stream_seed(seed, 6))
+        self.wide_rows = WideRowSource(wide, *stripe) if operation == "wide_load" else None
+        self.slices = SliceSource(wide, stream_seed(seed, 7)) if operation == "wide_read" else None
+        self.lwt = None
+        if operation == "lwt":
+            self.lwt = LwtSource(lwt.get("keys", 10000), lwt.get("contention", 1), lwt.get("operations"), stream_seed(seed, 8))
+        self.counters = None
+        self.counter_expected = None
+        if operation == "counter":
+            self.counters = CounterSource(counters.get("keys", 10000), counters.get("max_delta", 1), distribution,
+                                          stream_seed(seed, 9))
+            self.counter_expected = np.zeros(self.counters.keys, dtype=np.int64)
+        self.operations = {}
+        self.interval_histogram = LatencyHistogram()
+        self.scheduler = RateScheduler(scale_rate(rate, len(self.targets)), duration, on_report=self.on_rate_sample)
+
+    def run(self):
+        start_time = time.monotonic()
+        start_cpu = time.process_time()
+        sent = 0
+
+        for intended in self.scheduler:
+            target = self.targets[sent % len(self.targets)]
+            op = self.send(target, intended)
+            # Callbacks create and update the same op stats from the driver's threads.
+            with self.lock:
+                self.operation_stats(op)["Sent"] += 1
+            target.sent += 1
+            sent += 1
+
+            for expired_key in target.retention.due():
+                self.execute(target, "expire", time.monotonic(), "delete", (expired_key,))
+
+        self.drain()
+        self.elapsed = time.monotonic() - start_time
+        self.cpu_time = time.process_time() - start_cpu
+        print(f"Async {self.operation} engine completed {sent} requests across {len(self.targets)} nodes in {self.elapsed:.1f}s.")
+
+    def send(self, target, intended):
+        """Sends the next scheduled op to target and returns its name."""
+        if self.workload:
+            op = self.mix.take()
+            # Tagged so a query's name never selects a built-in op's result handling.
+            self.execute(target, op, intended, op, self.rows.take(op), context={"workload": True})
+            return op
+        if self.lwt:
+            return self.send_lwt(target, intended)
+        op = self.mix.take() if self.mix else OPERATION_OPS[self.operation]
+        {"insert": self.send_insert, "read": self.send_read, "delete": self.send_delete,
+         "wide_insert": self.send_wide_insert, "wide_read": self.send_wide_read,
+         "counter_update": self.send_counter}[op](target, intended)
+        return op
+
+    def send_insert(self, target, intended):
+        key = self.keys.take()
+        value = self.values.take()
+        if target.retention.mode == "ttl":
+            self.execute(target, "insert", intended, "insert_ttl", (key, value, target.retention.ttl))
+        else:
+            self.execute(target, "insert", intended, "insert", (key, value))
+        # Read callbacks add to the same counter from the driver's threads.
+        with self.lock:
+            target.bytes += len(value)
+        target.retention.record(key)
+        if self.written is not None:
+            self.written.push(key.bytes, intended)
+
+    def send_read(self, target, intended):
+        key, intended_miss = self.read_keys.take()
+        target.intended_misses += intended_miss
+        self.execute(target, "read", intended, "select", (key,))
+
+    def send_delete(self, target, intended):
+        key, _ = self.delete_keys.take()
+        self.execute(target, "delete", intended, "delete", (key,))
+
+    def send_wide_insert(self, target, intended):
+        key, clustering = self.wide_rows.take()
+        value = self.values.take()
+        self.execute(target, "wide_insert", intended, "wide_insert", (key, clustering, value))
+        with self.lock:
+            target.bytes += len(value)
+
+    def send_wide_read(self, target, intended):
+        kind, values, partition_rows = self.slices.take()
+        self.execute(target, "wide_read", intended, kind, values,
+                     context={"kind": kind, "partition_rows": partition_rows, "rows": 0})
+
+    def send_counter(self, target, intended):
+        index, key, delta = self.counters.take()
+        self.execute(target, "counter_update", intended, "counter_update", (delta, key),
+                     context={"index": index, "delta": delta})
+
+    def send_lwt(self, target, intended):
+        kind, key = self.lwt.take()
+        if kind == "lwt_insert":
+            self.execute(target, kind, intended, kind, (key, self.values.take()))
+        elif kind == "lwt_update":
+            self.execute(target, kind, intended, kind, (self.values.take(), key))
+        else:
+            # Reads at SERIAL/LOCAL_SERIAL go through Paxos too and show up as CASRead on the nodes.
+            self.execute(target, kind, intended, kind, (key,), consistency=self.serial_consistency)
+        return kind
+
+    def execute(self, target, op, intended, kind, values, context=None, consistency=None):
+        """Sends one request; context carries per-request state to its callbacks, e.g. across result pages."""
+        self.in_flight.acquire()
+        try:
+            statement, parameters = target.statements.bind(kind, self.keyspace, self.table,
+                                                           consistency or self.consistency, values)
+            future = target.session.execute_async(statement, parameters)
+        except Exception as e:
+            self.on_error(e, target, op)
+        else:
+            future.add_callbacks(self.on_success, self.on_error, callback_args=(target, op, intended, future, context),
+                                 errback_args=(target, op))
+
+    def drain(self):
+        # Every outstanding request holds one permit; taking them all back means all callbacks have fired.
+        for _ in range(self.max_in_flight):
+            self.in_flight.acquire()
+        for _ in range(self.max_in_flight):
+            self.in_flight.release()
+
+    def on_success(self, result, target, op, intended, future, context=None):
+        paging = False
+        try:
+            paging = self.record_success(result, target, op, intended, future, context)
+        finally:
+            # Released even if recording fails, or drain() would wait for this permit forever.
+            if not paging:
+                self.in_flight.release()
+
+    def record_success(self, result, target, op, intended, future, context):
+        """Records a successful response; returns True if the request goes on with its next page."""
+        op_kind = "workload" if context is not None and context.get("workload") else op
+        if op_kind == "wide_read":
+            context["rows"] += len(result or [])
+            page_bytes = sum(len(row[-1] or b"") for row in result or [])
+            with self.lock:
+                target.bytes += page_bytes
+            if future.has_more_pages:
+                # The same callbacks fire again for the next page; the permit is kept until the last one.
+                future.start_fetching_next_page()
+                return True
+        latency = time.monotonic() - intended
+        # Attribute latency to the node that actually coordinated the request, which only
+        # matches the session's target when the coordinator is pinned.
+        coordinator = str(future.coordinator_host) if future.coordinator_host else target.name
+        with self.lock:
+            if op_kind == "wide_read":
+                self.histogram(context["kind"], coordinator).record(latency * 1_000_000)
+                bucket = f"{context['kind']}_p{size_bucket(context['partition_rows'])}_r{size_bucket(context['rows'])}"
+                self.histogram(bucket, coordinator).record(latency * 1_000_000)
+                stats = self.operation_stats(op)
+                stats["Rows"] = stats.get("Rows", 0) + context["rows"]
+            elif op_kind == "counter_update":
+                self.counter_expected[context["index"]] += context["delta"]
+                self.histogram(op, coordinator).record(latency * 1_000_000)
+            elif op_kind in ("lwt_insert", "lwt_update"):
+                # Conditional statements answer with one row whose first column is [applied].
+                applied = bool(result and result[0][0])
+                stats = self.operation_stats(op)
+                outcome = "Applied" if applied else "Not Applied"
+                stats[outcome] = stats.get(outcome, 0) + 1
+                self.histogram(op, coordinator).record(latency * 1_000_000)
+                self.histogram(f"{op}_{'applied' if applied else 'not_applied'}", coordinator).record(latency * 1_000_000)
+            elif op_kind == "read":
+                target.hits += bool(result)
+                target.misses += not result
+                target.bytes += sum(len(row[-1] or b"") for row in result or [])
+                self.histogram("read_hit" if result else "read_miss", coordinator).record(latency * 1_000_000)
+            else:
+                self.histogram(op, coordinator).record(latency * 1_000_000)
+            if op_kind == "expire":
+                target.deleted += 1
+            else:
+                target.completed += 1
+                self.operation_stats(op)["Completed"] += 1
+                self.coordinators[coordinator] = self.coordinators.get(coordinator, 0) + 1
+                self.interval_histogram.record(latency * 1_000_000)
+        return False
+
+    def on_rate_sample(self, sample):
+        with self.lock:
+            histogram, self.interval_histogram = self.interval_histogram, LatencyHistogram()
+        summary = histogram.summary()
+        sample["Completed"] = summary["Count"]
+        sample["p50 ms"] = summary["p50"]
+        sample["p99 ms"] = summary["p99"]
+
+    def histogram(self, op, coordinator):
+        key = (op, coordinator)
+        if key not in self.histograms:
+            self.histograms[key] = LatencyHistogram()
+        return self.histograms[key]
+
+    def operation_stats(self, op):
+        if op not in self.operations:
+            self.operations[op] = {"Sent": 0, "Completed": 0, "Errors": 0}
+        return self.operations[op]
+
+    def on_error(self, exception, target, op):
+        with self.lock:
+            if op == "expire":
+                target.delete_errors += 1
+            else:
+                target.errors += 1
+                self.operation_stats(op)["Errors"] += 1
+            first_error = target.last_error is None
+            target.last_error = str(exception)
+        if first_error:
+            print(f"{op.capitalize()} failed on {target.name} - {exception}")
+        self.in_flight.release()
+
+    def read_stats(self, target):
+        return {
+            "Hits": target.hits,
+            "Misses": target.misses,
+            "Intended Misses": target.intended_misses,
+            "Hit Ratio": target.hits / (target.hits + target.misses) if target.hits + target.misses else None,
+        }
+
+    def summary(self):
+        elapsed = self.elapsed or self.duration
+        completed = sum(target.completed for target in self.targets)
+        summary = {}
+        summary["Nodes"] = {
+            target.name: {
+                "Sent": target.sent,
+                "Completed": target.completed,
+                "Errors": target.errors,
+                "Throughput": target.completed / elapsed,
+                "MB/s": target.bytes / elapsed / 1_000_000,
+                "Deleted": target.deleted,
+                "Delete Errors": target.delete_errors,
+                **(self.read_stats(target) if self.read_keys else {}),
+                **target.retention.stats(),
+                "Last Error": target.last_error,
+            }
+            for target in self.targets
+        }
+        summary["Coordinators"] = {
+            coordinator: {"Completed": completed_ops, "Throughput": completed_ops / elapsed}
+            for coordinator, completed_ops in self.coordinators.items()
+        }
+        summary["Operations"] = {
+            op: {**stats, "Throughput": stats["Completed"] / elapsed,
+                 **({"Rows/s": stats["Rows"] / elapsed} if "Rows" in stats else {})}
+            for op, stats in self.operations.items()
+        }
+        summary["Client"] = {
+            "Prepared": self.targets[0].statements.prepared if self.targets else None,
+            "Throughput": completed / elapsed,
+            "MB/s": sum(target.bytes for target in self.targets) / elapsed / 1_000_000,
+            "CPU Seconds": self.cpu_time,
+            "CPU ms per 1k Ops": self.cpu_time * 1000 * 1000 / completed if completed else None,
+        }
+        return summary
@@ -0,0 +1,232 @@
+import time
+import uuid
+import numpy as np
+from .distributions import KeyDistribution, index_keys
+
+MIX_DEFAULTS = {"insert": 60, "read": 35, "delete": 5}
+
+def stream_seed(seed, stream):
+    """Derives an independent, reproducible seed per generator from one run seed."""
+    if seed is None:
+        return None
+    return [*(seed if isinstance(seed, list) else [seed]), stream]
+
+class KeyPool:
+    """
+    Pre-generated random version-4 UUID keys.
+
+    Keys are drawn batch_size at a time from a seeded NumPy PRNG into one (batch_size, 16)
+    uint8 buffer; the UUID objects the driver needs are built for the whole batch at once,
+    so the write loop only indexes into a list and never touches os.urandom. With a key
+    distribution, partition indices are drawn instead and mapped to their keys.
+
+    Parameters:
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - batch_size (int): Keys generated per refill.
+    - distribution (dict): Key distribution settings, see distributions.KeyDistribution.
+    """
+    def __init__(self, seed=None, batch_size=65536, distribution=None):
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.distribution = None
+        if distribution and distribution.get("type", "random") != "random":
+            self.distribution = KeyDistribution(self.rng, **distribution)
+        self.keys = []
+        self.position = 0
+        self.generated = 0
+
+    def refill(self):
+        if self.distribution is not None:
+            buffer = index_keys(self.distribution.sample(self.batch_size), self.distribution.namespace)
+        else:
+            buffer = random_keys(self.rng, self.batch_size)
+        self.keys = keys_from_buffer(buffer)
+        self.position = 0
+        self.generated += self.batch_size
+
+    def take(self):
+        if self.position == len(self.keys):
+            self.refill()
+        key = self.keys[self.position]
+        self.position += 1
+        return key
+
+def random_keys(rng, n):
+    """Draws n random version-4 UUID keys as an (n, 16) uint8 buffer."""
+    buffer = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    buffer[:, 6] = (buffer[:, 6] & 0x0F) | 0x40  # version 4
+    buffer[:, 8] = (buffer[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    return buffer
+
+def keys_from_buffer(buffer):
+    """Builds UUIDs from an (n, 16) uint8 buffer, splitting it into two big-endian uint64 halves."""
+    halves = buffer.view(">u8").reshape(-1, 2)
+    return [uuid.UUID(int=(high << 64) | low) for high, low in halves.tolist()]
+
+class ReadKeyPool:
+    """
+    Pre-generated keys for reads, each tagged with whether it is a deliberate miss.
+
+    Hits are regenerated from the key distribution when one is configured, so reads follow
+    the writes' popularity curve, or else sampled from the record of written keys. A
+    miss_ratio share of keys is replaced by fresh random keys that were never written, so
+    the bloom filter path can be measured next to the data path.
+
+    Parameters:
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - batch_size (int): Keys generated per refill.
+    - distribution (dict): Key distribution settings, see distributions.KeyDistribution.
+    - written (KeyRing): Record of written keys, used when there is no key distribution.
+    - miss_ratio (float): Fraction of reads that target keys that were never written.
+    """
+    def __init__(self, seed=None, batch_size=65536, distribution=None, written=None, miss_ratio=0.0):
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.distribution = None
+        if distribution and distribution.get("type", "random") != "random":
+            self.distribution = KeyDistribution(self.rng, **distribution)
+        self.written = written
+        self.miss_ratio = miss_ratio
+        self.keys = []
+        self.misses = []
+        self.position = 0
+        if self.distribution is None and written is None:
+            print("No key distribution and no written keys to read back, every read will be a miss.")
+
+    def refill(self):
+        if self.distribution is not None:
+            buffer = index_keys(self.distribution.sample(self.batch_size), self.distribution.namespace)
+            misses = self.rng.random(self.batch_size) < self.miss_ratio
+        elif self.written:
+            buffer = self.written.sample(self.rng, self.batch_size)
+            misses = self.rng.random(self.batch_size) < self.miss_ratio
+        else:
+            buffer = np.empty((self.batch_size, 16), dtype=np.uint8)
+            misses = np.ones(self.batch_size, dtype=bool)
+        buffer[misses] = random_keys(self.rng, int(misses.sum()))
+        self.keys = keys_from_buffer(buffer)
+        self.misses = misses.tolist()
+        self.position = 0
+
+    def take(self):
+        """Returns a (key, deliberate miss) pair."""
+        if self.position == len(self.keys):
+            self.refill()
+        position = self.position
+        self.position += 1
+        return self.keys[position], self.misses[position]
+
+class OperationMix:
+    """
+    Pre-drawn sequence of operation names following weighted ratios.
+
+    Parameters:
+    - weights (dict): Relative weight per operation, e.g. {"insert": 60, "read": 35, "delete": 5}.
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - batch_size (int): Operations drawn per refill.
+    """
+    def __init__(self, weights, seed=None, batch_size=65536):
+        self.rng = np.random.default_rng(seed)
+        self.names = np.array([name for name, weight in weights.items() if weight > 0], dtype=object)
+        weights = np.array([weight for weight in weights.values() if weight > 0], dtype=np.float64)
+        self.probabilities = weights / weights.sum()
+        self.batch_size = batch_size
+        self.ops = []
+        self.position = 0
+
+    def refill(self):
+        self.ops = self.names[self.rng.choice(len(self.names), size=self.batch_size, p=self.probabilities)].tolist()
+        self.position = 0
+
+    def take(self):
+        if self.position == len(self.ops):
+            self.refill()
+        op = self.ops[self.position]
+        self.position += 1
+        return op
+
+PAYLOAD_MODES = ("fixed", "uniform", "histogram")
+
+class ValuePool:
+    """
+    Blob payloads for the value column.
+
+    One random buffer of buffer_size bytes is allocated up front and every payload is a
+    memoryview slice of it at a random offset, so even large values cost no generation or
+    copy on the client; the driver serializes the slice straight from the buffer. Sizes
+    and offsets are drawn in batches.
+
+    - fixed: every payload is size bytes.
+    - uniform: sizes uniformly in [min_size, max_size].
+    - histogram: sizes from sizes, drawn with the matching weights.
+
+    Parameters:
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - mode (str): 'fixed', 'uniform' or 'histogram'.
+    - size (int): Payload size in bytes (fixed).
+    - min_size (int): Smallest payload in bytes (uniform).
+    - max_size (int): Largest payload in bytes (uniform).
+    - sizes (list): Payload sizes in bytes (histogram).
+    - weights (list): Relative weight of each of sizes (histogram), equal if omitted.
+    - buffer_size (int): Bytes of random data payloads are sliced from.
+    - batch_size (int): Payloads drawn per refill.
+    """
+    def __init__(self, seed=None, mode="fixed", size=16, min_size=16, max_size=1024, sizes=None, weights=None,
+                 buffer_size=16 * 1024 * 1024, batch_size=65536):
+        self.rng = np.random.default_rng(seed)
+        self.mode = mode
+        self.size = size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.sizes = np.array(sizes or [size])
+        weights = np.array(weights or [1] * len(self.sizes), dtype=np.float64)
+        self.probabilities = weights / weights.sum()
+        self.largest = {"fixed": size, "uniform": max_size, "histogram": int(self.sizes.max())}[mode]
+        self.buffer_size = max(buffer_size, self.largest)
+        self.buffer = memoryview(self.rng.bytes(self.buffer_size))
+        self.batch_size = batch_size
+        self.values = []
+        self.position = 0
+
+    def refill(self):
+        n = self.batch_size
+        if self.mode == "uniform":
+            lengths = self.rng.integers(self.min_size, self.max_size, size=n, endpoint=True)
+        elif self.mode == "histogram":
+            lengths = self.rng.choice(self.sizes, size=n, p=self.probabilities)
+        else:
+            lengths = np.full(n, self.size)
+        offsets = self.rng.integers(0, self.buffer_size - lengths + 1)
+        buffer = self.buffer
+        self.values = [buffer[offset:offset + length] for offset, length in zip(offsets.tolist(), lengths.tolist())]
+        self.position = 0
+
+    def take(self):
+        if self.position == len(self.values):
+            self.refill()
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+def benchmark_generators(duration=5, seed=None, batch_size=65536, distribution=None, payload=None):
+    """
+    Measures how many (key, value) pairs one core can produce with no cluster attached,
+    i.e. the ceiling the generators put on a single load generator process.
+    """
+    keys = KeyPool(seed, batch_size, distribution)
+    values = ValuePool(seed, **(payload or {}))
+    ops = 0
+    start_time = time.perf_counter()
+    end_time = start_time + duration
+    while time.perf_counter() < end_time:
+        for _ in range(10000):
+            keys.take()
+            values.take()
+        ops += 10000
+    elapsed = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(10):
+        keys.refill()
+    refill_rate = 10 * batch_size / (time.perf_counter() - start_time)
+    return {"Ops per Second": ops / elapsed, "Key Refill per Second": refill_rate}
@@ -0,0 +1,132 @@
+import json
+
+class LatencyHistogram:
+    """
+    Fixed-memory log-linear latency histogram in the style of HdrHistogram.
+
+    Values (microseconds) below 2^precision_bits are counted exactly; above that every
+    power-of-two range is split into 2^(precision_bits - 1) linear sub-buckets, which
+    bounds the relative error to 2^-(precision_bits - 1). Values above max_value are
+    clamped into the top bucket, while min/max/mean stay exact.
+
+    Parameters:
+    - max_value (int): Highest trackable value in microseconds.
+    - precision_bits (int): Number of bits of sub-bucket resolution.
+    """
+    def __init__(self, max_value=60_000_000, precision_bits=8):
+        self.max_value = max_value
+        self.precision_bits = precision_bits
+        self.sub_bucket_count = 1 << precision_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.counts = [0] * (self.index_of(max_value) + 1)
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def index_of(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def value_range(self, index):
+        """Returns the (lowest, highest) value counted by the bucket at index."""
+        if index < self.sub_bucket_count:
+            return index, index
+        shift = (index - self.sub_bucket_count) // self.half_count + 1
+        sub_bucket = (index - self.sub_bucket_count) % self.half_count + self.half_count
+        lowest = sub_bucket << shift
+        return lowest, lowest + (1 << shift) - 1
+
+    def record(self, value, count=1):
+        value = max(int(value), 0)
+        index = min(self.index_of(value), len(self.counts) - 1)
+        self.counts[index] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if (other.max_value, other.precision_bits) != (self.max_value, self.precision_bits):
+            raise ValueError("Cannot merge histograms with different max_value or precision_bits.")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percentile):
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * percentile // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index == len(self.counts) - 1:
+                    return self.max  # the top bucket also holds clamped values
+                return min(self.value_range(index)[1], self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def summary(self, unit_divisor=1000):
+        """Summary in milliseconds (by default) for reports."""
+        def scaled(value):
+            return value / unit_divisor if value is not None else None
+        return {
+            "Count": self.total,
+            "Mean": scaled(self.mean()),
+            "Min": scaled(self.min),
+            "p50": scaled(self.percentile(50)),
+            "p90": scaled(self.percentile(90)),
+            "p99": scaled(self.percentile(99)),
+            "p99.9": scaled(self.percentile(99.9)),
+            "Max": scaled(self.max),
+        }
+
+    def to_dict(self):
+        return {
+            "max_value": self.max_value,
+            "precision_bits": self.precision_bits,
+            "total": self.total,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "counts": {index: count for index, count in enumerate(self.counts) if count},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["max_value"], data["precision_bits"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total = data["total"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+def save_histograms(histograms, directory):
+    """Writes one JSON file per (op, host) histogram holding its summary and sparse buckets."""
+    for (op, host), histogram in histograms.items():
+        with open(f"{directory}/{op}-{host}.json", "w") as f:
+            json.dump({"Op": op, "Host": host, "Unit": "ms", "Summary": histogram.summary(),
+                       "Histogram": histogram.to_dict()}, f, indent=4)
+
+def merge_histograms(histogram_sets):
+    """Merges several {(op, host): LatencyHistogram} dicts into a new one."""
+    merged = {}
+    for histograms in histogram_sets:
+        for key, histogram in histograms.items():
+            if key not in merged:
+                merged[key] = LatencyHistogram(histogram.max_value, histogram.precision_bits)
+            merged[key].merge(histogram)
+    return merged
@@ -0,0 +1,154 @@
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import javax.management.Attribute;
+import javax.management.AttributeList;
+import javax.management.MBeanServerConnection;
+import javax.management.ObjectName;
+import javax.management.openmbean.CompositeData;
+import javax.management.remote.JMXConnector;
+import javax.management.remote.JMXConnectorFactory;
+import javax.management.remote.JMXServiceURL;
+
+/**
+ * Long-lived JMX sampler for stressandra, run as a single-file source program:
+ *
+ *   java JmxCollector.java INTERVAL_MS HOST:PORT[,HOST:PORT...] MBEAN [MBEAN...]
+ *
+ * Every MBEAN is "object name/attribute" or "object name/attribute/composite key", as in the
+ * config's jmx_metrics. One thread per node keeps its RMI connection open and samples every
+ * INTERVAL_MS on a fixed schedule, reading all attributes of an object name in one
+ * getAttributes call. Each sample is printed as one tab-separated line:
+ *
+ *   S  HOST:PORT  EPOCH_MS  QUERY_MS  INDEX=VALUE ...
+ *
+ * where INDEX is the position of the mbean on the command line; mbeans that are not
+ * registered (yet) or not numeric are left out. Connection failures print
+ * "E  HOST:PORT  MESSAGE" and the node is reconnected on its next tick. The program exits
+ * when its standard input is closed.
+ */
+public class JmxCollector {
+    static ObjectName[] names;
+    static String[] attributes;
+    static String[] keys;
+    static Map<ObjectName, List<Integer>> byName = new LinkedHashMap<>();
+
+    public static void main(String[] args) throws Exception {
+        long interval = Long.parseLong(args[0]);
+        String[] nodes = args[1].split(",");
+        int count = args.length - 2;
+        names = new ObjectName[count];
+        attributes = new String[count];
+        keys = new String[count];
+        for (int i = 0; i < count; i++) {
+            String mbean = args[i + 2];
+            int slash = mbean.indexOf('/', mbean.indexOf(':'));
+            if (slash < 0) {
+                // Config validation rejects these; skip rather than lose every other metric.
+                System.err.println("Skipping " + mbean + ": no attribute, expected object name/attribute");
+                continue;
+            }
+            String[] parts = mbean.substring(slash + 1).split("/", 2);
+            names[i] = new ObjectName(mbean.substring(0, slash));
+            attributes[i] = parts[0];
+            keys[i] = parts.length > 1 ? parts[1] : null;
+            byName.computeIfAbsent(names[i], name -> new ArrayList<>()).add(i);
+        }
+
+        for (String node : nodes) {
+            Thread sampler = new Thread(() -> sample(node, interval));
+            sampler.setDaemon(true);
+            sampler.start();
+        }
+        while (System.in.read() != -1) {
+            // Runs until the parent closes the pipe.
+        }
+        System.exit(0);
+    }
+
+    static void sample(String node, long interval) {
+        JMXServiceURL url;
+        try {
+            url = new JMXServiceURL("service:jmx:rmi:///jndi/rmi://" + node + "/jmxrmi");
+        } catch (IOException e) {
+            emit("E\t" + node + "\t" + clean(e.toString()));
+            return;
+        }
+        JMXConnector connector = null;
+        long next = System.currentTimeMillis();
+        while (true) {
+            try {
+                if (connector == null) {
+                    connector = JMXConnectorFactory.connect(url);
+                }
+                emit(query(node, connector.getMBeanServerConnection()));
+            } catch (Exception e) {
+                emit("E\t" + node + "\t" + clean(e.toString()));
+                try {
+                    if (connector != null) {
+                        connector.close();
+                    }
+                } catch (IOException ignored) {
+                }
+                connector = null;
+            }
+            next += interval;
+            long now = System.currentTimeMillis();
+            if (next <= now) {
+                next = now;  // A slow node skips ticks instead of sampling back to back.
+                continue;
+            }
+            try {
+                Thread.sleep(next - now);
+            } catch (InterruptedException e) {
+                return;
+            }
+        }
+    }
+
+    static String query(String node, MBeanServerConnection connection) throws IOException {
+        long timestamp = System.currentTimeMillis();
+        long start = System.nanoTime();
+        StringBuilder values = new StringBuilder();
+        for (Map.Entry<ObjectName, List<Integer>> entry : byName.entrySet()) {
+            List<Integer> indices = entry.getValue();
+            String[] requested = indices.stream().map(i -> attributes[i]).distinct().toArray(String[]::new);
+            Map<String, Object> found = new LinkedHashMap<>();
+            try {
+                AttributeList list = connection.getAttributes(entry.getKey(), requested);
+                for (Attribute attribute : list.asList()) {
+                    found.put(attribute.getName(), attribute.getValue());
+                }
+            } catch (javax.management.InstanceNotFoundException e) {
+                continue;  // Registered lazily, e.g. CAS or counter metrics before the first such request.
+            } catch (javax.management.ReflectionException e) {
+                continue;
+            }
+            for (int i : indices) {
+                Object value = found.get(attributes[i]);
+                if (keys[i] != null && value instanceof CompositeData) {
+                    value = ((CompositeData) value).get(keys[i]);
+                }
+                if (value instanceof Boolean) {
+                    value = (Boolean) value ? 1 : 0;
+                }
+                if (value instanceof Number) {
+                    values.append('\t').append(i).append('=').append(value);
+                }
+            }
+        }
+        long queryMicros = (System.nanoTime() - start) / 1000;
+        return "S\t" + node + "\t" + timestamp + "\t" + (queryMicros / 1000.0) + values;
+    }
+
+    static synchronized void emit(String line) {
+        System.out.println(line);
+        System.out.flush();
+    }
+
+    static String clean(String message) {
+        return message.replaceAll("\\s+", " ");
+    }
+}
@@ -1,11 +1,15 @@
 import time
-from jmxquery import JMXConnection, JMXQuery
 import json
 import math
-import statistics
 import os
 import csv
+import shutil
+import subprocess
+import threading
 from .config import Config
+from .streamstats import RunningStats, merge_running_stats
+
+COLLECTOR_SOURCE = os.path.join(os.path.dirname(__file__), "java", "JmxCollector.java")
 
 def save_dict_to_json(data, filename):
     with open(filename, "w") as f:
@@ -20,15 +24,169 @@ def is_valid_json_value(value):
     except (TypeError, ValueError):
         return False
 
-def save_dict_to_csv(data, filename, fill_value="N/A"):
-    max_length = max(len(v) for v in data.values())
-    for key in data:
-        data[key] += [fill_value] * (max_length - len(data[key]))
+class MetricsWriter:
+    """
+    Appends one CSV row per sample to a file as samples arrive, so a long run keeps no
+    samples in memory and a crash loses at most one unflushed batch. Rows are buffered and
+    written every flush_rows rows or flush_seconds seconds, whichever comes first.
+
+    Parameters:
+    - filename (str): CSV file; the header is written when it is created.
+    - columns (list): Column names; a row is a dict and missing columns are left empty.
+    - flush_rows (int): Rows buffered before they are written.
+    - flush_seconds (float): Longest time a row stays buffered.
+    """
+    def __init__(self, filename, columns, flush_rows=100, flush_seconds=5):
+        self.filename = filename
+        self.columns = columns
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        exists = os.path.exists(filename)
+        self.file = open(filename, "a", newline="")
+        self.writer = csv.writer(self.file)
+        if not exists:
+            self.writer.writerow(columns)
+            self.file.flush()
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def write(self, row):
+        self.buffer.append([row.get(column, "") for column in self.columns])
+        if len(self.buffer) >= self.flush_rows or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.buffer)
+        self.file.flush()
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def java_executable():
+    java_home = os.environ.get("JAVA_HOME")
+    return os.path.join(java_home, "bin", "java") if java_home else "java"
+
+def check_java():
+    """Fails before any load is sent if the JVM the collector runs on cannot be found."""
+    executable = java_executable()
+    if shutil.which(executable) is None:
+        raise RuntimeError(f"JMX collection needs Java 11 or later, but {executable} was not found; "
+                           "install it or set JAVA_HOME.")
+
+def parse_collector_line(line, mbeans):
+    """
+    Parses one line of the collector's output into ("sample", node, timestamp, query ms,
+    {mbean: value}) or ("error", node, message); see java/JmxCollector.java for the format.
+    """
+    fields = line.rstrip("\n").split("\t")
+    if fields[0] == "E":
+        return "error", fields[1], fields[2] if len(fields) > 2 else ""
+    values = {}
+    for field in fields[4:]:
+        index, value = field.split("=", 1)
+        values[mbeans[int(index)]] = float(value)
+    return "sample", fields[1], int(fields[2]) / 1000, float(fields[3]), values
 
-    with open(filename, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(data.keys())  
-        writer.writerows(zip(*data.values()))  
+class JMXCollector:
+    """
+    One long-lived JVM that keeps a JMX connection open to every node and streams samples
+    back over a pipe, instead of starting a JVM and reconnecting for every sample.
+
+    Samples are taken every interval seconds on a fixed schedule per node and handed to
+    the callback subscribed for that node as callback(timestamp, values), where values maps
+    mbean to number; collection errors go to on_error(message).
+
+    Parameters:
+    - nodes (list): host:jmx_port of every node.
+    - mbeans (list): Mbeans to sample, as object name/attribute[/composite key].
+    - interval (float): Seconds between samples.
+    """
+    def __init__(self, nodes, mbeans, interval=1.0):
+        self.nodes = nodes
+        self.mbeans = list(mbeans)
+        self.interval = interval
+        self.subscribers = {}
+        self.process = None
+        self.reader = None
+        self.stderr_reader = None
+        self.stderr = []
+        self.stopping = False
+        self.query_ms = {}
+
+    def subscribe(self, node, metrics):
+        """Delivers the node's samples to metrics.add_sample and its errors to metrics.on_error."""
+        self.subscribers[node] = metrics
+
+    def start(self):
+        command = [java_executable(), COLLECTOR_SOURCE, str(max(int(self.interval * 1000), 1)), ",".join(self.nodes),
+                   *self.mbeans]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        text=True, bufsize=1)
+        self.reader = threading.Thread(target=self.read, args=(self.process.stdout,), daemon=True)
+        self.reader.start()
+        # Drained on its own thread so a chatty JVM cannot block on a full stderr pipe.
+        self.stderr_reader = threading.Thread(target=self.read_stderr, args=(self.process.stderr,), daemon=True)
+        self.stderr_reader.start()
+
+    def read_stderr(self, stream):
+        for line in stream:
+            self.stderr = (self.stderr + [line.rstrip()])[-20:]
+
+    def read(self, stream):
+        for line in stream:
+            try:
+                parsed = parse_collector_line(line, self.mbeans)
+            except (IndexError, ValueError):
+                print(f"Ignoring malformed JMX collector output: {line.strip()}")
+                continue
+            metrics = self.subscribers.get(parsed[1])
+            if metrics is None:
+                continue
+            try:
+                if parsed[0] == "error":
+                    metrics.on_error(parsed[2])
+                else:
+                    _, node, timestamp, query_ms, values = parsed
+                    self.query_ms[node] = query_ms
+                    metrics.add_sample(timestamp, values)
+            except Exception as e:
+                # This is the only reader; if it died every node would stop getting samples.
+                print(f"Failed to record JMX collector output from {parsed[1]} - {e}")
+        if self.process is not None:
+            self.check_exit(self.process.wait())
+
+    def check_exit(self, returncode):
+        """Reports a collector that died on its own, which would otherwise leave every node without metrics."""
+        if self.stopping or returncode == 0:
+            return
+        self.stderr_reader.join(5)
+        message = f"JMX collector exited with code {returncode}: {' | '.join(self.stderr) or 'no output'}"
+        print(message)
+        for metrics in self.subscribers.values():
+            metrics.on_error(message)
+
+    def stop(self, timeout=10):
+        if self.process is None:
+            return
+        # Closing stdin is the collector's signal to exit.
+        self.stopping = self.process.poll() is None
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.reader.join(timeout)
+        self.process = None
+
+def save_cluster_stats(jmx_metrics, filename):
+    """Merges every node's metric accumulators into cluster-wide stats and saves them."""
+    merged = merge_running_stats(jmx_metric.metrics for jmx_metric in jmx_metrics)
+    print(f"Saving cluster-wide JMX metrics Stats at {filename}")
+    save_dict_to_json({metric_name: stats.summary() for metric_name, stats in merged.items()}, filename)
 
 class JMXMetric:
     def __init__(self, name, mbean, unit):
@@ -37,84 +195,67 @@ class JMXMetric:
         self.unit = unit
 
 class JMXMetrics():
-    def __init__(self, config, host, jmx_port, metrics_dir, stop_event, max_retries=5, retry_delay=2):
+    def __init__(self, config, host, jmx_port, metrics_dir, stop_event, target_rate=None, store=None):
         self.jmxmetrics = [JMXMetric(metric['name'], metric['mbean'], metric['unit']) for metric in config.jmx_metrics]
         self.host = f"{host}:{jmx_port}"
         self.metrics_dir = metrics_dir
-        self.max_retries = max_retries
-        self.retry_delay = retry_delay
         self.metrics = {}
         self.metrics_name_map = {}
-        self.queries = [JMXQuery(jmx_metric.mbean) for jmx_metric in self.jmxmetrics]
+        self.columns = ["Timestamp"] + (["Target Rate"] if target_rate else []) + list(
+            dict.fromkeys(metric.mbean for metric in self.jmxmetrics))
+        self.writer = None
+        self.lock = threading.Lock()
         self.stats = {}
         self.errors = []
         self.stop_event = stop_event
+        self.target_rate = target_rate  # callable giving the offered load to tag each sample with
+        self.store = store  # optional TimeSeriesStore shared by all nodes
 
     def run(self):
         print(f"Starting JMX Metrics collection on node {self.host}...")
         self.collect_metrics_per_node()
-        self.save_csv()
         self.save_stats()
         print(f"Stopping JMX Metrics collection on node {self.host}")
 
+    def add_sample(self, timestamp, values):
+        """Called by JMXCollector with every sample of this node; writes it out and adds it to the stats."""
+        row = {"Timestamp": timestamp, **values}
+        if self.target_rate:
+            row["Target Rate"] = self.target_rate()
+        with self.lock:
+            if self.writer is None:
+                print(f"Streaming JMX metrics CSV to {self.metrics_dir}/{self.host}.csv")
+                self.writer = MetricsWriter(f"{self.metrics_dir}/{self.host}.csv", self.columns)
+            self.writer.write(row)
+            self.extract_metrics(row)
+        if self.store is not None:
+            self.store.extend(self.host, timestamp, {name: value for name, value in row.items() if name != "Timestamp"})
+
+    def on_error(self, message):
+        # The collector retries on every tick, so each distinct error is only kept once.
+        if message not in self.errors:
+            print(f"Error collecting JMX metrics from {self.host}: {message}")
+            self.errors.append(message)
+
     def collect_metrics_per_node(self):
-        jmx_url = f"service:jmx:rmi:///jndi/rmi://{self.host}/jmxrmi"
-        results = []
-
-        while not self.stop_event.is_set():
-            retries = 0
-            while retries <= self.max_retries:
-                try:
-                    jmx_conn = JMXConnection(jmx_url)
-                    results.append(jmx_conn.query(self.queries))
-                    break  # Success, exit retry loop
-                except Exception as e:
-                    print(f"Error collecting JMX metrics from {self.host}:{self.jmx_port}: {e}. Retry {retries + 1}/{self.max_retries}.")
-                    retries += 1
-                    if retries <= self.max_retries:
-                        time.sleep(self.retry_delay)
-                    else:
-                        print(f"Max retries reached for {self.host}:{self.jmx_port}. Continuing collection.")
-                        self.errors.append(f"Max retries reached for {self.host}:{self.jmx_port}. Continuing collection.")
-                        break #max retries reached, continue the main loop.
-            time.sleep(0.1)
-
-        self.extract_metrics(results)
-        self.generate_stats()
-
-    def extract_metrics(self, results):
-        for result in results:
-            for metric in result:
-                if not is_valid_json_value(metric.value):
-                    continue
-                if metric.to_query_string() in self.metrics.keys():
-                    self.metrics[metric.to_query_string()].append(metric.value)
-                else:
-                    self.metrics[metric.to_query_string()] = [metric.value]
+        self.stop_event.wait()
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+            self.generate_stats()
 
-    def generate_stats(self):
-        for metric_name, metric_value in self.metrics.items():
-            try:
-                mean = sum(metric_value) / len(metric_value)
-                minimum = min(metric_value)
-                maximum = max(metric_value)
-                median = statistics.median(metric_value)
-                stddev = statistics.stdev(metric_value) if len(metric_value) > 1 else 0
-                self.stats[metric_name] = {
-                    "Mean": mean,
-                    "Min": minimum,
-                    "Max": maximum,
-                    "Median": median,
-                    "StdDev": stddev,
-                }
-            except Exception as e:
-                print(e)
-                self.errors.append(e)
+    def extract_metrics(self, row):
+        # Every metric only keeps a constant-size accumulator, however long the run.
+        for name, value in row.items():
+            # NaN and infinities have no place in the sketch's buckets.
+            if name == "Timestamp" or not isinstance(value, (int, float)) or not math.isfinite(value):
                 continue
-    
-    def save_csv(self):
-        print(f"Saving JMX metrics CSV at {self.metrics_dir}/{self.host}.csv")
-        save_dict_to_csv(self.metrics, f"{self.metrics_dir}/{self.host}.csv")
+            if name not in self.metrics:
+                self.metrics[name] = RunningStats()
+            self.metrics[name].add(value)
+
+    def generate_stats(self):
+        self.stats = {metric_name: stats.summary() for metric_name, stats in self.metrics.items()}
 
     def save_stats(self):
         print(f"Saving JMX metrics Stats at {self.metrics_dir}/{self.host}-stats.json")
@@ -0,0 +1,236 @@
+import json
+import math
+import multiprocessing
+import os
+import queue
+import time
+import numpy as np
+from cassandra.concurrent import execute_concurrent_with_args
+from cassandra.metadata import Murmur3Token
+from .db import get_sessions
+from .distributions import index_keys
+from .generators import ValuePool, keys_from_buffer, stream_seed
+
+def mean_payload_size(payload):
+    """Expected value size in bytes of the payload settings, see generators.ValuePool."""
+    if payload["mode"] == "uniform":
+        return (payload["min_size"] + payload["max_size"]) / 2
+    if payload["mode"] == "histogram":
+        sizes = np.array(payload["sizes"], dtype=np.float64)
+        weights = np.array(payload["weights"] or [1] * len(sizes), dtype=np.float64)
+        return float((sizes * weights).sum() / weights.sum())
+    return payload["size"]
+
+def target_rows(rows, target_bytes, payload):
+    """Rows to load: rows, or enough rows of the average payload size to reach target_bytes."""
+    if target_bytes:
+        return math.ceil(target_bytes / mean_payload_size(payload))
+    return rows
+
+def chunk_rows(chunk, chunk_size, total):
+    """Row indices of a chunk; the last chunk may be short."""
+    return np.arange(chunk * chunk_size, min((chunk + 1) * chunk_size, total), dtype=np.uint64)
+
+def sorted_by_token(keys):
+    """
+    Orders keys by their Murmur3 token, so consecutive requests fall in the same token range
+    and go to the same replicas over the same connections.
+    """
+    return sorted(keys, key=lambda key: Murmur3Token.hash_fn(key.bytes))
+
+class Checkpoint:
+    """
+    Chunks already loaded, kept in a JSON file that is rewritten atomically, so an
+    interrupted load resumes with the chunks that are still missing. A checkpoint written
+    for a different dataset (rows, chunk size, key namespace or table) is ignored.
+
+    Parameters:
+    - path (str): Checkpoint file.
+    - dataset (dict): Settings that identify the dataset being loaded.
+    """
+    def __init__(self, path, dataset):
+        self.path = path
+        self.dataset = dataset
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("Dataset") == dataset:
+                self.done = set(saved["Done"])
+            else:
+                print(f"Ignoring checkpoint {path}: it was written for {saved.get('Dataset')}.")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"Dataset": self.dataset, "Done": sorted(self.done)}, f)
+        os.replace(temporary, self.path)
+
+def load_chunk(session, statement, indices, values, namespace=0, concurrency=256):
+    """
+    Inserts the rows of one chunk with execute_concurrent_with_args, ordered by token.
+    Returns (rows written, rows failed, bytes written, last error).
+    """
+    keys = sorted_by_token(keys_from_buffer(index_keys(indices, namespace)))
+    parameters = [(key, values.take()) for key in keys]
+    results = execute_concurrent_with_args(session, statement, parameters, concurrency=concurrency,
+                                           raise_on_first_error=False)
+    written = failed = written_bytes = 0
+    last_error = None
+    for (success, result), (_, value) in zip(results, parameters):
+        if success:
+            written += 1
+            written_bytes += len(value)
+        else:
+            failed += 1
+            last_error = str(result)
+    return written, failed, written_bytes, last_error
+
+def run_loader(worker_id, hosts, keyspace, table, consistency, settings, session_options, chunks, results):
+    """
+    Entry point of a loader process: takes chunk numbers from chunks until a None arrives
+    and reports (chunk, written, failed, bytes, last error) for each on results.
+    """
+    session = None
+    try:
+        # Token-aware routing spreads writes over the ring from one session, so with a cluster per
+        # node only the first node's is opened.
+        options = {**session_options, "coordinator": "token_aware"}
+        sessions = get_sessions(hosts if options.get("shared_cluster") else hosts[:1], **options)
+        session = list(sessions.values())[0]
+        statement = session.prepare(f"INSERT INTO {keyspace}.{table} (id, value) VALUES (?, ?)")
+        statement.consistency_level = consistency
+        values = ValuePool(stream_seed(settings["seed"], worker_id), **settings["payload"])
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            indices = chunk_rows(chunk, settings["chunk_rows"], settings["rows"])
+            results.put((chunk, *load_chunk(session, statement, indices, values, settings["namespace"],
+                                            settings["concurrency"])))
+    except Exception as e:
+        results.put((None, 0, 0, 0, f"Loader {worker_id} failed - {e}"))
+    finally:
+        if session is not None:
+            session.cluster.shutdown()
+
+class BulkLoader:
+    """
+    Fills the built-in (id, value) table as fast as the cluster accepts writes, with no
+    rate limit. Rows are numbered 0..rows-1 and row i gets the key index_keys([i],
+    namespace), the same key a uniform or sequential key distribution over rows
+    partitions reads, so read tests can run straight against the loaded data.
+
+    Rows are loaded in chunks of chunk_rows by workers processes, each running
+    execute_concurrent_with_args with concurrency requests in flight over a token-aware
+    session. Finished chunks are checkpointed, and a chunk with failed rows is left out
+    of the checkpoint so a resumed load writes it again.
+
+    Parameters:
+    - hosts (list): (host, port) tuples, one per node.
+    - keyspace (str): Keyspace of the table.
+    - table (str): Table to fill.
+    - consistency (ConsistencyLevel): Write consistency.
+    - settings (dict): rows, bytes, chunk_rows, concurrency and checkpoint, see config.LOAD_DEFAULTS,
+      plus payload, namespace and seed.
+    - session_options (dict): Keyword arguments for db.get_sessions.
+    - workers (int): Loader processes.
+    """
+    def __init__(self, hosts, keyspace, table, consistency, settings, session_options, workers=1):
+        self.hosts = hosts
+        self.keyspace = keyspace
+        self.table = table
+        self.consistency = consistency
+        self.workers = workers
+        self.session_options = session_options
+        # The parent already holds connected driver sessions, whose reactor threads do not survive fork().
+        self.context = multiprocessing.get_context("spawn")
+        self.settings = {**settings, "rows": target_rows(settings["rows"], settings["bytes"], settings["payload"])}
+        self.chunks = math.ceil(self.settings["rows"] / self.settings["chunk_rows"])
+        self.checkpoint = Checkpoint(settings["checkpoint"], {
+            "Table": f"{keyspace}.{table}",
+            "Rows": self.settings["rows"],
+            "Chunk Rows": self.settings["chunk_rows"],
+            "Namespace": self.settings["namespace"],
+        })
+        self.written = 0
+        self.failed = 0
+        self.bytes = 0
+        self.last_error = None
+        self.elapsed = None
+
+    def pending(self):
+        return [chunk for chunk in range(self.chunks) if chunk not in self.checkpoint.done]
+
+    def pending_rows(self):
+        return sum(len(chunk_rows(chunk, self.settings["chunk_rows"], self.settings["rows"])) for chunk in self.pending())
+
+    def run(self, progress=None, checkpoint_interval=5):
+        """
+        Loads every chunk not yet in the checkpoint. progress, if given, is called with the
+        number of rows written or failed so far after every chunk.
+        """
+        pending = self.pending()
+        if len(pending) < self.chunks:
+            print(f"Resuming from {self.checkpoint.path}: {self.chunks - len(pending)} of {self.chunks} chunks already loaded.")
+        chunks, results = self.context.Queue(), self.context.Queue()
+        for chunk in pending:
+            chunks.put(chunk)
+        for _ in range(self.workers):
+            chunks.put(None)
+        processes = [
+            self.context.Process(target=run_loader, args=(worker_id, self.hosts, self.keyspace, self.table,
+                                                          self.consistency, self.settings, self.session_options,
+                                                          chunks, results))
+            for worker_id in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        start = time.monotonic()
+        last_saved = start
+        remaining = len(pending)
+        try:
+            while (remaining and any(process.is_alive() for process in processes)) or not results.empty():
+                try:
+                    chunk, written, failed, written_bytes, error = results.get(timeout=1)
+                except queue.Empty:
+                    continue
+                self.written += written
+                self.failed += failed
+                self.bytes += written_bytes
+                self.last_error = error or self.last_error
+                if chunk is None:
+                    print(error)
+                    continue
+                remaining -= 1
+                if not failed:
+                    self.checkpoint.done.add(chunk)
+                if progress:
+                    progress(self.written + self.failed)
+                if time.monotonic() - last_saved >= checkpoint_interval:
+                    self.checkpoint.save()
+                    last_saved = time.monotonic()
+        finally:
+            # Saved on the way out too, so an interrupted load resumes where it stopped.
+            self.checkpoint.save()
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        self.elapsed = time.monotonic() - start
+
+    def summary(self):
+        elapsed = self.elapsed or 1e-9
+        return {
+            "Rows": self.settings["rows"],
+            "Written": self.written,
+            "Failed": self.failed,
+            "Chunks Done": len(self.checkpoint.done),
+            "Chunks": self.chunks,
+            "Seconds": elapsed,
+            "Rows/s": self.written / elapsed,
+            "MB/s": self.bytes / elapsed / 1_000_000,
+            "Last Error": self.last_error,
+        }
@@ -0,0 +1,55 @@
+import numpy as np
+from .distributions import index_keys
+from .generators import keys_from_buffer
+
+LWT_OPS = ("insert", "update", "read")
+
+class LwtSource:
+    """
+    Keys and operations for the lightweight-transaction workload.
+
+    Each drawn key is used by contention consecutive requests with the same operation.
+    They go out back to back on the open-loop schedule, round-robined over coordinators,
+    so contention clients race on every key: 1 means no racing, higher values make Paxos
+    rounds collide and retry.
+
+    - insert: INSERT ... IF NOT EXISTS
+    - update: UPDATE ... IF EXISTS
+    - read: SELECT at the serial consistency level
+
+    Parameters:
+    - keys (int): Number of distinct keys the LWTs run against.
+    - contention (int): Concurrent requests racing on each key.
+    - operations (dict): Relative weight of insert, update and read.
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - namespace (int): Key namespace, see distributions.index_keys.
+    - batch_size (int): Requests drawn per refill.
+    """
+    def __init__(self, keys=10000, contention=1, operations=None, seed=None, namespace=2, batch_size=65536):
+        self.rng = np.random.default_rng(seed)
+        self.keys = keys
+        self.contention = contention
+        operations = {op: weight for op, weight in (operations or {"insert": 1}).items() if weight > 0}
+        self.names = [f"lwt_{op}" for op in operations]
+        weights = np.array(list(operations.values()), dtype=np.float64)
+        self.probabilities = weights / weights.sum()
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self.requests = []
+        self.position = 0
+
+    def refill(self):
+        groups = -(-self.batch_size // self.contention)
+        indices = np.repeat(self.rng.integers(0, self.keys, size=groups), self.contention)
+        kinds = np.repeat(self.rng.choice(len(self.names), size=groups, p=self.probabilities), self.contention)
+        keys = keys_from_buffer(index_keys(indices, self.namespace))
+        self.requests = [(self.names[kind], key) for kind, key in zip(kinds.tolist(), keys)]
+        self.position = 0
+
+    def take(self):
+        """Returns a (query kind, key) pair."""
+        if self.position == len(self.requests):
+            self.refill()
+        request = self.requests[self.position]
+        self.position += 1
+        return request
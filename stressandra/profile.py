@@ -0,0 +1,128 @@
+import math
+
+SEGMENT_TYPES = ("constant", "ramp", "step", "spike", "sine")
+
+class RateSegment:
+    """
+    One piece of a rate profile. Rates are per-node ops per second.
+
+    - constant: rate for duration.
+    - ramp: linear from start_rate to end_rate over duration.
+    - step: each of rates in turn, step_duration seconds each.
+    - spike: base_rate, jumping to peak_rate for spike_duration seconds starting at spike_at.
+    - sine: mean_rate + amplitude * sin(2 * pi * t / period) for duration.
+    """
+    def __init__(self, type, duration=None, rate=None, start_rate=None, end_rate=None, rates=None, step_duration=None,
+                 base_rate=None, peak_rate=None, spike_at=0, spike_duration=None, mean_rate=None, amplitude=None, period=None):
+        if type not in SEGMENT_TYPES:
+            raise ValueError(f"Rate profile segment type must be one of {SEGMENT_TYPES}.")
+        self.type = type
+        self.rate = rate
+        self.start_rate = start_rate
+        self.end_rate = end_rate
+        self.rates = rates
+        self.step_duration = step_duration
+        self.base_rate = base_rate
+        self.peak_rate = peak_rate
+        self.spike_at = spike_at
+        self.spike_duration = spike_duration
+        self.mean_rate = mean_rate
+        self.amplitude = amplitude
+        self.period = period
+        self.duration = len(rates) * step_duration if type == "step" and rates and step_duration else duration
+        self.validate()
+
+    def validate(self):
+        if not isinstance(self.duration, (int, float)) or self.duration <= 0:
+            raise ValueError(f"Rate profile {self.type} segment needs a positive duration.")
+        required = {
+            "constant": ["rate"],
+            "ramp": ["start_rate", "end_rate"],
+            "step": ["rates", "step_duration"],
+            "spike": ["base_rate", "peak_rate", "spike_duration"],
+            "sine": ["mean_rate", "amplitude", "period"],
+        }[self.type]
+        missing = [name for name in required if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"Rate profile {self.type} segment is missing {missing}.")
+        if self.type == "sine" and self.amplitude >= self.mean_rate:
+            raise ValueError("Rate profile sine amplitude must be below mean_rate so the rate stays positive.")
+        if self.min_rate() <= 0:
+            raise ValueError(f"Rate profile {self.type} segment rates must be positive.")
+
+    def min_rate(self):
+        return {
+            "constant": lambda: self.rate,
+            "ramp": lambda: min(self.start_rate, self.end_rate),
+            "step": lambda: min(self.rates),
+            "spike": lambda: min(self.base_rate, self.peak_rate),
+            "sine": lambda: self.mean_rate - self.amplitude,
+        }[self.type]()
+
+    def rate_at(self, t):
+        if self.type == "constant":
+            return self.rate
+        if self.type == "ramp":
+            return self.start_rate + (self.end_rate - self.start_rate) * t / self.duration
+        if self.type == "step":
+            return self.rates[min(int(t // self.step_duration), len(self.rates) - 1)]
+        if self.type == "spike":
+            return self.peak_rate if self.spike_at <= t < self.spike_at + self.spike_duration else self.base_rate
+        return self.mean_rate + self.amplitude * math.sin(2 * math.pi * t / self.period)
+
+    def ops_until(self, t):
+        """Ops the segment schedules in its first t seconds, the integral of rate_at."""
+        if self.type == "constant":
+            return self.rate * t
+        if self.type == "ramp":
+            return self.start_rate * t + (self.end_rate - self.start_rate) * t * t / (2 * self.duration)
+        if self.type == "step":
+            steps = min(int(t // self.step_duration), len(self.rates) - 1)
+            return sum(self.rates[:steps]) * self.step_duration + self.rates[steps] * (t - steps * self.step_duration)
+        if self.type == "spike":
+            peak = max(min(t, self.spike_at + self.spike_duration) - self.spike_at, 0)
+            return self.base_rate * t + (self.peak_rate - self.base_rate) * peak
+        return self.mean_rate * t + self.amplitude * self.period / (2 * math.pi) * (1 - math.cos(2 * math.pi * t / self.period))
+
+class RateProfile:
+    """
+    Time-based per-node rate made of consecutive segments, read from the rate_profile
+    section of the config. rate_at(t) gives the target rate t seconds into the run; the
+    last segment's rate holds past the end.
+
+    Parameters:
+    - segments (list): Segment settings dicts, see RateSegment.
+    - scale (float): Factor applied to every rate, e.g. node count or a worker's share.
+    """
+    def __init__(self, segments, scale=1):
+        if not segments:
+            raise ValueError("Rate profile needs at least one segment.")
+        self.segment_configs = segments
+        self.segments = [RateSegment(**segment) for segment in segments]
+        self.scale = scale
+        self.duration = sum(segment.duration for segment in self.segments)
+
+    def rate_at(self, t):
+        for segment in self.segments:
+            if t < segment.duration:
+                return segment.rate_at(t) * self.scale
+            t -= segment.duration
+        last = self.segments[-1]
+        return last.rate_at(last.duration) * self.scale
+
+    def ops_until(self, t):
+        """Ops scheduled in the first t seconds of the run, the integral of rate_at."""
+        ops = 0
+        for segment in self.segments:
+            if t < segment.duration:
+                return (ops + segment.ops_until(t)) * self.scale
+            ops += segment.ops_until(segment.duration)
+            t -= segment.duration
+        last = self.segments[-1]
+        return (ops + last.rate_at(last.duration) * t) * self.scale
+
+    def scaled(self, factor):
+        return RateProfile(self.segment_configs, self.scale * factor)
+
+    def __repr__(self):
+        return f"RateProfile({[segment.type for segment in self.segments]}, duration={self.duration}s)"
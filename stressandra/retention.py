@@ -0,0 +1,122 @@
+import time
+import uuid
+from array import array
+import numpy as np
+
+RETENTION_MODES = ("none", "ring", "ttl")
+
+class KeyRing:
+    """
+    Fixed-size, array-backed FIFO of written 16-byte keys and their write times.
+
+    Keys live in one preallocated bytearray and times in a double array, so memory is
+    capacity * 24 bytes no matter how long the run is, and push/pop are O(1). When the
+    ring is full, push overwrites the oldest key and counts it as dropped.
+
+    Parameters:
+    - capacity (int): Maximum number of keys held.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.keys = bytearray(capacity * 16)
+        self.times = array("d", bytes(capacity * 8))
+        self.head = 0  # next slot to write
+        self.size = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, key, written_at):
+        if self.size == self.capacity:
+            self.size -= 1
+            self.dropped += 1
+        self.keys[self.head * 16:self.head * 16 + 16] = key
+        self.times[self.head] = written_at
+        self.head = (self.head + 1) % self.capacity
+        self.size += 1
+
+    def tail(self):
+        return (self.head - self.size) % self.capacity
+
+    def oldest_time(self):
+        return self.times[self.tail()] if self.size else None
+
+    def pop(self):
+        index = self.tail()
+        self.size -= 1
+        return bytes(self.keys[index * 16:index * 16 + 16])
+
+    def key_at(self, position):
+        """Key at position counted from the oldest retained key."""
+        index = (self.tail() + position) % self.capacity
+        return bytes(self.keys[index * 16:index * 16 + 16])
+
+    def sample(self, rng, n):
+        """Draws n retained keys uniformly at random as an (n, 16) uint8 buffer."""
+        positions = (self.tail() + rng.integers(0, self.size, size=n)) % self.capacity
+        return np.frombuffer(self.keys, dtype=np.uint8).reshape(-1, 16)[positions]
+
+def merge_key_rings(rings, capacity):
+    """Combines the keys of several rings into one ring of the given capacity, oldest first."""
+    merged = KeyRing(capacity)
+    for ring in rings:
+        for position in range(len(ring)):
+            merged.push(ring.key_at(position), 0)
+    return merged
+
+class Retention:
+    """
+    Keeps table size bounded on long runs.
+
+    - ring: written keys go into a KeyRing; once more than max_keys are retained, or the
+      oldest is older than max_age seconds, keys are handed out for deletion at no more than
+      delete_rate per second, so cleanup never stalls the write loop.
+    - ttl: every write carries USING TTL ttl and Cassandra expires rows itself.
+    - none: rows are kept forever.
+
+    Parameters:
+    - mode (str): 'none', 'ring' or 'ttl'.
+    - max_keys (int): Keys to retain before deleting the oldest (ring mode).
+    - max_age (float): Seconds to retain a key before deleting it (ring mode, optional).
+    - delete_rate (float): Maximum deletes per second (ring mode).
+    - ttl (int): Row TTL in seconds (ttl mode).
+    """
+    def __init__(self, mode="none", max_keys=1000000, max_age=None, delete_rate=1000, ttl=None, clock=time.monotonic):
+        self.mode = mode
+        self.max_keys = max_keys
+        self.max_age = max_age
+        self.delete_rate = delete_rate
+        self.ttl = ttl
+        self.clock = clock
+        # Headroom above max_keys so a delete backlog is absorbed before keys are dropped.
+        self.ring = KeyRing(max_keys * 2) if mode == "ring" else None
+        self.tokens = delete_rate
+        self.refilled_at = None
+
+    def record(self, key):
+        if self.ring is not None:
+            self.ring.push(key.bytes, self.clock())
+
+    def due(self):
+        """Yields keys to delete now, within the delete rate budget."""
+        if self.ring is None or not len(self.ring):
+            return
+        now = self.clock()
+        if self.refilled_at is not None:
+            self.tokens = min(self.delete_rate, self.tokens + (now - self.refilled_at) * self.delete_rate)
+        self.refilled_at = now
+
+        while self.tokens >= 1 and len(self.ring) and self.expired(now):
+            self.tokens -= 1
+            yield uuid.UUID(bytes=self.ring.pop())
+
+    def expired(self, now):
+        if len(self.ring) > self.max_keys:
+            return True
+        return self.max_age is not None and now - self.ring.oldest_time() > self.max_age
+
+    def stats(self):
+        if self.ring is None:
+            return {"Retention": self.mode}
+        return {"Retention": self.mode, "Retained Keys": len(self.ring), "Dropped Keys": self.ring.dropped}
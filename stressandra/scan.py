@@ -0,0 +1,182 @@
+import threading
+import time
+from .histogram import LatencyHistogram
+
+# Lowest and highest token of each partitioner; the lowest is never assigned to a partition.
+TOKEN_BOUNDS = {
+    "Murmur3Partitioner": (-2 ** 63, 2 ** 63 - 1),
+    "RandomPartitioner": (-1, 2 ** 127),
+}
+
+def split_range(start, end, splits):
+    """Splits the token range (start, end] into splits contiguous (start, end] sub-ranges."""
+    width = end - start
+    bounds = [start + width * i // splits for i in range(splits + 1)]
+    return [(low, high) for low, high in zip(bounds, bounds[1:]) if high > low]
+
+def split_ring(metadata, keyspace, splits_per_range=1):
+    """
+    Covers the whole ring with (start, end, replicas) sub-ranges built from the driver's
+    token map. Every range between two consecutive ring tokens is cut into
+    splits_per_range pieces; the range wrapping past the highest token is cut at the
+    partitioner's bounds, since token(id) > ? AND token(id) <= ? cannot wrap.
+
+    Parameters:
+    - metadata (Metadata): Cluster metadata with a populated token_map.
+    - keyspace (str): Keyspace whose replication decides each range's replicas.
+    - splits_per_range (int): Sub-ranges per token range.
+    """
+    partitioner = metadata.partitioner.rsplit(".", 1)[-1]
+    if partitioner not in TOKEN_BOUNDS:
+        raise ValueError(f"Token-range scans support {sorted(TOKEN_BOUNDS)}, not {partitioner}.")
+    lowest, highest = TOKEN_BOUNDS[partitioner]
+    token_map = metadata.token_map
+    ring = token_map.ring
+    ranges = []
+    for i, token in enumerate(ring):
+        replicas = token_map.get_replicas(keyspace, token)
+        if i == 0:
+            # (last, first] wraps around: scan (last, highest] and (lowest, first] instead.
+            pieces = split_range(ring[-1].value, highest, splits_per_range) + split_range(lowest, token.value, splits_per_range)
+        else:
+            pieces = split_range(ring[i - 1].value, token.value, splits_per_range)
+        ranges.extend((start, end, replicas) for start, end in pieces)
+    return ranges
+
+def row_bytes(row):
+    """Payload bytes of a row: the length of its blob and text columns."""
+    return sum(len(value) for value in row if isinstance(value, (bytes, bytearray, memoryview, str)))
+
+class NodeScan:
+    def __init__(self, name):
+        self.name = name
+        self.ranges = 0
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+        self.last_error = None
+
+class TableScan:
+    """
+    Full-table scan split by token range: each sub-range is read with
+    SELECT ... WHERE token(key) > ? AND token(key) <= ? and paged through fetch_size rows
+    at a time, with at most parallelism ranges in flight. A range goes to the session of
+    one of its replicas, so no coordinator hop is needed when coordinators are pinned.
+
+    Parameters:
+    - sessions (dict): host:port to session, see db.get_sessions.
+    - keyspace (str): Keyspace of the scanned table.
+    - table (str): Table to scan.
+    - partition_key (str): Partition key column(s), as written inside token().
+    - ranges (list): (start, end, replicas) sub-ranges, see split_ring.
+    - consistency (ConsistencyLevel): Consistency of every page.
+    - parallelism (int): Ranges read concurrently.
+    - fetch_size (int): Rows per page.
+    """
+    def __init__(self, sessions, keyspace, table, partition_key, ranges, consistency, parallelism=16, fetch_size=5000):
+        self.sessions = sessions
+        self.ranges = ranges
+        self.parallelism = parallelism
+        self.in_flight = threading.Semaphore(parallelism)
+        self.lock = threading.Lock()
+        self.query = f"SELECT * FROM {keyspace}.{table} WHERE token({partition_key}) > ? AND token({partition_key}) <= ?"
+        self.statements = {}
+        self.consistency = consistency
+        self.fetch_size = fetch_size
+        self.nodes = {}
+        self.histograms = {}
+        self.completed = 0
+        self.elapsed = None
+
+    def statement(self, name, session):
+        # Prepared once per session; scanning with SimpleStatements would re-parse every range.
+        if name not in self.statements:
+            statement = session.prepare(self.query)
+            statement.consistency_level = self.consistency
+            statement.fetch_size = self.fetch_size
+            self.statements[name] = statement
+        return self.statements[name]
+
+    def session_for(self, replicas, index):
+        """Picks a replica that has a session, spreading ranges over them; any session otherwise."""
+        names = [f"{host.endpoint.address}:{host.endpoint.port}" for host in replicas]
+        names = [name for name in names if name in self.sessions] or list(self.sessions)
+        name = names[index % len(names)]
+        return name, self.sessions[name]
+
+    def node(self, name):
+        if name not in self.nodes:
+            self.nodes[name] = NodeScan(name)
+        return self.nodes[name]
+
+    def run(self):
+        start = time.monotonic()
+        for index, (low, high, replicas) in enumerate(self.ranges):
+            self.in_flight.acquire()
+            name, session = self.session_for(replicas, index)
+            context = {"name": name, "start": time.monotonic(), "rows": 0, "bytes": 0}
+            try:
+                future = session.execute_async(self.statement(name, session), (low, high))
+            except Exception as e:
+                self.on_error(e, context)
+            else:
+                future.add_callbacks(self.on_page, self.on_error, callback_args=(future, context),
+                                     errback_args=(context,))
+        # Every range still being read holds one permit; taking them all back waits for the last page.
+        for _ in range(self.parallelism):
+            self.in_flight.acquire()
+        self.elapsed = time.monotonic() - start
+        for _ in range(self.parallelism):
+            self.in_flight.release()
+
+    def on_page(self, rows, future, context):
+        context["rows"] += len(rows or [])
+        context["bytes"] += sum(row_bytes(row) for row in rows or [])
+        if future.has_more_pages:
+            future.start_fetching_next_page()
+            return
+        with self.lock:
+            node = self.node(context["name"])
+            node.ranges += 1
+            node.rows += context["rows"]
+            node.bytes += context["bytes"]
+            key = ("scan_range", context["name"])
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            self.histograms[key].record((time.monotonic() - context["start"]) * 1_000_000)
+            self.completed += 1
+        self.in_flight.release()
+
+    def on_error(self, exception, context):
+        with self.lock:
+            node = self.node(context["name"])
+            node.errors += 1
+            first_error = node.last_error is None
+            node.last_error = str(exception)
+            self.completed += 1
+        if first_error:
+            print(f"Scan range failed on {context['name']} - {exception}")
+        self.in_flight.release()
+
+    def summary(self):
+        elapsed = self.elapsed or 1e-9
+        summary = {"Nodes": {}, "Total": {}}
+        for name, node in self.nodes.items():
+            summary["Nodes"][name] = {
+                "Ranges": node.ranges,
+                "Errors": node.errors,
+                "Rows": node.rows,
+                "Rows/s": node.rows / elapsed,
+                "MB/s": node.bytes / elapsed / 1_000_000,
+                "Last Error": node.last_error,
+            }
+        rows = sum(node.rows for node in self.nodes.values())
+        summary["Total"] = {
+            "Ranges": len(self.ranges),
+            "Errors": sum(node.errors for node in self.nodes.values()),
+            "Rows": rows,
+            "Seconds": elapsed,
+            "Rows/s": rows / elapsed,
+            "MB/s": sum(node.bytes for node in self.nodes.values()) / elapsed / 1_000_000,
+        }
+        return summary
@@ -0,0 +1,112 @@
+import math
+import time
+
+def scale_rate(rate, factor):
+    """Scales a constant rate or a RateProfile, e.g. from per-node to total or to a worker's share."""
+    if hasattr(rate, "scaled"):
+        return rate.scaled(factor)
+    return rate * factor
+
+class RateScheduler:
+    """
+    Drift-free pacing against absolute deadlines on the monotonic clock.
+
+    The n-th op is due at start + n / rate, independent of how long earlier ops took, so
+    work time and sleep overshoot never accumulate. With a RateProfile each deadline is
+    about 1 / rate_at(t) after the previous one, so the schedule follows the profile
+    instead. When the caller falls behind, due ops are released back to back, yielding the
+    GIL every max_burst ops so driver I/O threads keep running. Iterating yields each op's
+    intended send time, which workloads use to measure latency without coordinated omission.
+
+    Every report_interval seconds the intended and achieved ops/s of the last interval are
+    appended to samples and passed to on_report, if given.
+
+    Parameters:
+    - rate (float or RateProfile): Target number of ops per second.
+    - duration (float): How long to schedule ops for, in seconds.
+    - max_burst (int): Number of late ops released back to back before yielding.
+    - report_interval (float): Seconds between rate samples.
+    - on_report (callable): Called with each rate sample.
+    """
+    def __init__(self, rate, duration, max_burst=100, report_interval=1, on_report=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.profile = rate if hasattr(rate, "rate_at") else None
+        self.duration = duration
+        self.max_burst = max_burst
+        self.report_interval = report_interval
+        self.on_report = on_report
+        self.clock = clock
+        self.sleep = sleep
+        self.start_time = None
+        self.sent = 0
+        self.samples = []
+
+    def __iter__(self):
+        self.start_time = self.clock()
+        end_time = self.start_time + self.duration
+        next_report = self.start_time + self.report_interval
+        reported_sent = 0
+        burst = 0
+        offset = 0
+        # The stepped deadlines drift by rounding, so a profile stops at the ops it integrates to.
+        planned = math.ceil(self.profile.ops_until(self.duration) - 1e-6) if self.profile else None
+
+        while True:
+            if self.profile:
+                intended = self.start_time + offset
+            else:
+                intended = self.start_time + self.sent / self.rate
+            if intended >= end_time or (planned is not None and self.sent >= planned):
+                break
+
+            now = self.clock()
+            if now < intended:
+                self.sleep(intended - now)
+                burst = 0
+            else:
+                burst += 1
+                if burst >= self.max_burst:
+                    self.sleep(0)
+                    burst = 0
+
+            now = self.clock()
+            while now >= next_report:
+                self.report(next_report, self.sent - reported_sent, intended)
+                reported_sent = self.sent
+                next_report += self.report_interval
+
+            self.sent += 1
+            yield intended
+            if self.profile:
+                # Trapezoidal step, so rate changes take effect within one interval instead of one interval late.
+                rate = self.profile.rate_at(offset)
+                offset += 2 / (rate + self.profile.rate_at(offset + 1 / rate))
+
+        self.report(max(self.clock(), end_time), self.sent - reported_sent, end_time, final=True)
+
+    def report(self, report_time, sent, intended, final=False):
+        interval_start = self.start_time + len(self.samples) * self.report_interval
+        interval = report_time - interval_start
+        if interval <= 0 or (final and sent == 0):
+            return
+        if final and self.samples and interval < self.report_interval / 10:
+            # Ops released just after the last full window; their rate over a sliver of time means nothing.
+            return
+        sample = {
+            "Time": round(report_time - self.start_time, 3),
+            "Intended": self.intended_rate(interval_start - self.start_time, report_time - self.start_time),
+            "Achieved": sent / interval,
+            "Lag": max(report_time - intended, 0),
+        }
+        self.samples.append(sample)
+        if self.on_report:
+            self.on_report(sample)
+
+    def intended_rate(self, start, end):
+        """Average target rate between start and end seconds into the run."""
+        if self.profile:
+            return (self.profile.ops_until(end) - self.profile.ops_until(start)) / (end - start)
+        return self.rate
+
+    def latest(self):
+        return self.samples[-1] if self.samples else None
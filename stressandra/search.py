@@ -0,0 +1,132 @@
+from .histogram import LatencyHistogram
+
+# Retention deletes run beside the schedule at their own rate limit; their latency says nothing about the step's rate.
+BACKGROUND_OPS = ("expire",)
+
+class SearchStep:
+    def __init__(self, rate, achieved, p50, p99, error_rate, passed, reason):
+        self.rate = rate
+        self.achieved = achieved
+        self.p50 = p50
+        self.p99 = p99
+        self.error_rate = error_rate
+        self.passed = passed
+        self.reason = reason
+
+    def to_dict(self):
+        return {
+            "Rate": self.rate,
+            "Achieved": self.achieved,
+            "p50 ms": self.p50,
+            "p99 ms": self.p99,
+            "Error Rate": self.error_rate,
+            "Passed": self.passed,
+            "Reason": self.reason,
+        }
+
+class ThroughputSearch:
+    """
+    Finds the highest per-node rate at which client p99 latency and error rate stay within
+    an SLO, by running short steady-state steps at different rates.
+
+    The binary strategy checks min_rate and max_rate and then bisects until the bracket is
+    narrower than tolerance. The ramp strategy steps up from min_rate by ramp_step until a
+    step fails. A step also fails when the achieved rate falls below min_achieved_ratio of
+    the target, since the load generator itself could not keep up.
+
+    Parameters:
+    - run_step (callable): Runs one step at a rate; returns (summary, histograms).
+    - min_rate (int): Lowest per-node rate to try.
+    - max_rate (int): Highest per-node rate to try.
+    - p99_ms (float): Client p99 latency SLO in milliseconds.
+    - max_error_rate (float): Highest tolerated fraction of failed ops.
+    - strategy (str): 'binary' or 'ramp'.
+    - tolerance (int): Binary search stops once max and min passing rates are this close.
+    - ramp_step (int): Rate increment of the ramp strategy.
+    - min_achieved_ratio (float): Lowest tolerated achieved/target throughput ratio.
+    """
+    def __init__(self, run_step, min_rate, max_rate, p99_ms, max_error_rate=0.001, strategy="binary", tolerance=50,
+                 ramp_step=100, min_achieved_ratio=0.95):
+        self.run_step = run_step
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.p99_ms = p99_ms
+        self.max_error_rate = max_error_rate
+        self.strategy = strategy
+        self.tolerance = tolerance
+        self.ramp_step = ramp_step
+        self.min_achieved_ratio = min_achieved_ratio
+        self.steps = []
+        self.best = None
+
+    def run(self):
+        if self.strategy == "ramp":
+            self.ramp()
+        else:
+            self.bisect()
+        return self.best
+
+    def ramp(self):
+        rate = self.min_rate
+        while rate <= self.max_rate and self.evaluate(rate).passed:
+            self.best = rate
+            rate += self.ramp_step
+
+    def bisect(self):
+        if not self.evaluate(self.min_rate).passed:
+            return
+        self.best = self.min_rate
+        if self.evaluate(self.max_rate).passed:
+            self.best = self.max_rate
+            return
+
+        low, high = self.min_rate, self.max_rate
+        while high - low > self.tolerance:
+            rate = (low + high) // 2
+            if self.evaluate(rate).passed:
+                low = self.best = rate
+            else:
+                high = rate
+
+    def evaluate(self, rate):
+        print(f"Search step at {rate} ops/sec per node...")
+        summary, histograms = self.run_step(rate)
+        step = self.judge(rate, summary, histograms)
+        self.steps.append(step)
+        print(f"Step at {rate} ops/sec per node {'passed' if step.passed else 'failed'}: {step.reason}")
+        return step
+
+    def judge(self, rate, summary, histograms):
+        nodes = list(summary["Nodes"].values())
+        sent = sum(node["Sent"] for node in nodes)
+        errors = sum(node["Errors"] for node in nodes)
+        achieved = sum(node["Throughput"] for node in nodes) / len(nodes) if nodes else 0
+        error_rate = errors / sent if sent else 1
+
+        latency = LatencyHistogram()
+        for (op, _), histogram in histograms.items():
+            if op not in BACKGROUND_OPS:
+                latency.merge(histogram)
+        p50 = latency.percentile(50) / 1000 if latency.total else None
+        p99 = latency.percentile(99) / 1000 if latency.total else None
+
+        if p99 is None:
+            passed, reason = False, "no successful ops"
+        elif p99 > self.p99_ms:
+            passed, reason = False, f"p99 {p99:.2f}ms above SLO {self.p99_ms}ms"
+        elif error_rate > self.max_error_rate:
+            passed, reason = False, f"error rate {error_rate:.4%} above {self.max_error_rate:.4%}"
+        elif achieved < rate * self.min_achieved_ratio:
+            passed, reason = False, f"achieved {achieved:.0f} ops/sec below {self.min_achieved_ratio:.0%} of target"
+        else:
+            passed, reason = True, f"p99 {p99:.2f}ms, error rate {error_rate:.4%}"
+        return SearchStep(rate, achieved, p50, p99, error_rate, passed, reason)
+
+    def table(self):
+        lines = [f"{'Rate':>10} {'Achieved':>10} {'p50 ms':>9} {'p99 ms':>9} {'Errors':>9}  Result"]
+        for step in self.steps:
+            p50 = f"{step.p50:9.2f}" if step.p50 is not None else f"{'-':>9}"
+            p99 = f"{step.p99:9.2f}" if step.p99 is not None else f"{'-':>9}"
+            lines.append(f"{step.rate:>10} {step.achieved:>10.0f} {p50} {p99} {step.error_rate:>9.4%}  "
+                         f"{'PASS' if step.passed else 'FAIL'}")
+        return "\n".join(lines)
@@ -0,0 +1,76 @@
+import threading
+from cassandra.query import SimpleStatement
+
+QUERIES = {
+    "insert": "INSERT INTO {keyspace}.{table} (id, value) VALUES ({marker}, {marker})",
+    "insert_ttl": "INSERT INTO {keyspace}.{table} (id, value) VALUES ({marker}, {marker}) USING TTL {marker}",
+    "delete": "DELETE FROM {keyspace}.{table} WHERE id = {marker}",
+    "select": "SELECT id, value FROM {keyspace}.{table} WHERE id = {marker}",
+    "lwt_insert": "INSERT INTO {keyspace}.{table} (id, value) VALUES ({marker}, {marker}) IF NOT EXISTS",
+    "lwt_update": "UPDATE {keyspace}.{table} SET value = {marker} WHERE id = {marker} IF EXISTS",
+    "lwt_read": "SELECT id, value FROM {keyspace}.{table} WHERE id = {marker}",
+    "counter_update": "UPDATE {keyspace}.{table} SET c = c + {marker} WHERE id = {marker}",
+    "wide_insert": "INSERT INTO {keyspace}.{table} (pk, ck, value) VALUES ({marker}, {marker}, {marker})",
+    "wide_slice": "SELECT ck, value FROM {keyspace}.{table} WHERE pk = {marker} AND ck > {marker} LIMIT {marker}",
+    "wide_range": "SELECT ck, value FROM {keyspace}.{table} WHERE pk = {marker} AND ck > {marker} AND ck <= {marker}",
+}
+
+class StatementCache:
+    """
+    Per-session cache of the statements issued by the stress workloads.
+
+    With prepared=True each query is prepared once per (kind, keyspace, table, consistency)
+    and every op only binds values, so the coordinator skips parsing and planning. With
+    prepared=False the same cache hands out SimpleStatements, which lets both modes be
+    compared at the same rate.
+
+    Parameters:
+    - session (Session): Cassandra session object the statements belong to.
+    - prepared (bool): Whether to prepare statements or send them as plain CQL.
+    - queries (dict): Extra query templates by kind, e.g. a workload profile's named queries.
+    - fetch_size (int): Rows per page of the statements' results, or None for the session default.
+    - serial_consistency (ConsistencyLevel): Paxos consistency of conditional statements, or None.
+    """
+    def __init__(self, session, prepared=True, queries=None, fetch_size=None, serial_consistency=None):
+        self.session = session
+        self.prepared = prepared
+        self.queries = {**QUERIES, **(queries or {})}
+        self.fetch_size = fetch_size
+        self.serial_consistency = serial_consistency
+        self.statements = {}
+        self.lock = threading.Lock()
+
+    def get(self, kind, keyspace, table, consistency):
+        key = (kind, keyspace, table, consistency)
+        statement = self.statements.get(key)
+        if statement is None:
+            with self.lock:
+                statement = self.statements.get(key)
+                if statement is None:
+                    statement = self.build(kind, keyspace, table, consistency)
+                    self.statements[key] = statement
+        return statement
+
+    def build(self, kind, keyspace, table, consistency):
+        if self.prepared:
+            statement = self.session.prepare(self.queries[kind].format(keyspace=keyspace, table=table, marker="?"))
+            statement.consistency_level = consistency
+            if self.fetch_size:
+                statement.fetch_size = self.fetch_size
+            if self.serial_consistency is not None:
+                statement.serial_consistency_level = self.serial_consistency
+            return statement
+        return SimpleStatement(self.queries[kind].format(keyspace=keyspace, table=table, marker="%s"),
+                               consistency_level=consistency, fetch_size=self.fetch_size,
+                               serial_consistency_level=self.serial_consistency)
+
+    def bind(self, kind, keyspace, table, consistency, values):
+        """
+        Returns a (statement, parameters) pair ready for Session.execute/execute_async.
+        Prepared statements come back as a BoundStatement with no separate parameters.
+        """
+        statement = self.get(kind, keyspace, table, consistency)
+        if self.prepared:
+            return statement.bind(values), None
+        # The CQL literal encoder has no memoryview mapping, so blob slices are copied for plain CQL.
+        return statement, tuple(bytes(value) if isinstance(value, memoryview) else value for value in values)
@@ -0,0 +1,143 @@
+import math
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error, in the style of DDSketch.
+
+    Every value v > 0 is counted in bucket ceil(log_gamma(v)) with
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy), so a quantile is returned
+    within relative_accuracy of a value that really is at that rank. Negative values use a
+    mirrored set of buckets and zeros are counted apart. When a side holds more than
+    max_buckets buckets its lowest ones are folded together, which only costs accuracy
+    at the far low end. Merging adds bucket counts, so sketches of different nodes or
+    runs combine exactly.
+
+    Parameters:
+    - relative_accuracy (float): Relative error bound of quantiles.
+    - max_buckets (int): Most buckets kept for positive and for negative values each.
+    """
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def value(self, key):
+        # Midpoint of (gamma^(key-1), gamma^key] in the relative sense.
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        if value > 0:
+            buckets = self.positive
+        elif value < 0:
+            buckets = self.negative
+        else:
+            self.zeros += count
+            self.count += count
+            return
+        key = self.key(abs(value))
+        buckets[key] = buckets.get(key, 0) + count
+        self.count += count
+        if len(buckets) > self.max_buckets:
+            self.collapse(buckets)
+
+    def collapse(self, buckets):
+        keys = sorted(buckets)
+        folded = sum(buckets.pop(key) for key in keys[:len(keys) - self.max_buckets + 1])
+        lowest = keys[len(keys) - self.max_buckets]
+        buckets[lowest] = buckets.get(lowest, 0) + folded
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+            if len(mine) > self.max_buckets:
+                self.collapse(mine)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q):
+        """Value at quantile q in [0, 1], or None if nothing was added."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self.value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self.value(key)
+        return self.value(max(self.positive))
+
+class RunningStats:
+    """
+    Count, mean, variance, min, max and quantiles of a stream of numbers in constant
+    memory. Mean and variance use Welford's update and Chan's formula to merge, so
+    per-node accumulators combine into exact cluster-wide ones.
+    """
+    QUANTILES = {"Median": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.sketch.add(value)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def stddev(self):
+        """Sample standard deviation, 0 below two values."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0
+
+    def summary(self):
+        summary = {"Count": self.count, "Mean": self.mean if self.count else None, "Min": self.min, "Max": self.max}
+        for name, q in self.QUANTILES.items():
+            value = self.sketch.quantile(q)
+            # Bucket midpoints can fall outside the exact extremes; clamp them back.
+            summary[name] = None if value is None else min(max(value, self.min), self.max)
+        summary["StdDev"] = self.stddev()
+        return summary
+
+def merge_running_stats(stats_sets):
+    """Merges {name: RunningStats} dicts, e.g. one per node, into one {name: RunningStats}."""
+    merged = {}
+    for stats_set in stats_sets:
+        for name, stats in stats_set.items():
+            merged.setdefault(name, RunningStats(stats.sketch.relative_accuracy)).merge(stats)
+    return merged
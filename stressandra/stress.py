@@ -1,15 +1,21 @@
 import time
 import concurrent.futures
+import threading
 import uuid
 from .db import get_session
 from cassandra import ConsistencyLevel
 from cassandra.cluster import Session
 from cassandra.query import SimpleStatement
+from .statements import StatementCache
+from .scheduler import RateScheduler
+from .retention import Retention
+from .generators import KeyPool, ReadKeyPool, ValuePool
 
 def set_keyspace(session, keyspace):
     session.set_keyspace(keyspace)
 
-def run_stress_writes(session, host, port, rate, duration, consistency, keyspace, table, cleanup_interval=10, cleanup_batch_size=1000):
+def run_stress_writes(session, host, port, rate, duration, consistency, keyspace, table, prepared=True, retention=None,
+                      distribution=None, payload=None):
     """
     Runs a Cassandra write stress test on the given host and port.
 
@@ -20,57 +26,58 @@ def run_stress_writes(session, host, port, rate, duration, consistency, keyspace
     - rate (int): Number of requests per second.
     - duration (int): Duration of the test in seconds.
     - consistency (str): Write consistency level.
-    - cleanup_interval (int): Interval (in seconds) to clean up old data.
-    - cleanup_batch_size (int): Number of records to delete per cleanup batch.
+    - prepared (bool): Whether to use prepared statements or plain CQL.
+    - retention (dict): Retention settings, see retention.Retention. Deletes are sent without
+      waiting for them, so cleanup never stalls the write loop.
+    - distribution (dict): Key distribution settings, see distributions.KeyDistribution.
+    - payload (dict): Size settings of the written values, see generators.ValuePool.
     """
     set_keyspace(session, keyspace)  # Ensure keyspace exists
-
+    statements = StatementCache(session, prepared)
+    retention = Retention(**(retention or {}))
+    keys, values = KeyPool(distribution=distribution), ValuePool(**(payload or {}))
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=rate) as executor:
-        start_time = time.time()
-        cleanup_time = start_time + cleanup_interval
-        inserted_ids = []
-
-        while time.time() - start_time < duration:
-            new_id = uuid.uuid4()
-            
-            insert_query = SimpleStatement(
-                f"INSERT INTO {table} (id, value) VALUES (%s, %s)", 
-                consistency_level=consistency
-            )
+        for _ in RateScheduler(rate, duration):
+            new_id = keys.take()
+            if retention.mode == "ttl":
+                insert_query, parameters = statements.bind("insert_ttl", keyspace, table, consistency,
+                                                           (new_id, values.take(), retention.ttl))
+            else:
+                insert_query, parameters = statements.bind("insert", keyspace, table, consistency, (new_id, values.take()))
 
             try:
-                future = executor.submit(session.execute, insert_query, (new_id, "stress_test"))
+                future = executor.submit(session.execute, insert_query, parameters)
                 result = future.result()
+                retention.record(new_id)
             except Exception as e:
                 print(f"Write failed on {host}:{port} during query {insert_query} - {e}")
 
-            if time.time() >= cleanup_time:
-                cleanup_list = inserted_ids[:cleanup_batch_size]
-                for id_to_delete in cleanup_list:
-                    delete_query = SimpleStatement(f"DELETE FROM {table} WHERE id = %s", consistency_level=consistency)
-                    try:
-                        future = executor.submit(session.execute, delete_query, (id_to_delete,))
-                        result = future.result()  # Ensure deletion is successful
-                        inserted_ids.remove(id_to_delete)
-                    except Exception as e:
-                        print(f"Delete failed for {id_to_delete} on {host}:{port} during query {delete_query} - {e}")
-
-                cleanup_time += cleanup_interval
-
-            time.sleep(1 / rate)
+            for id_to_delete in retention.due():
+                delete_query, parameters = statements.bind("delete", keyspace, table, consistency, (id_to_delete,))
+                session.execute_async(delete_query, parameters).add_errback(
+                    lambda e, id_to_delete=id_to_delete: print(f"Delete failed for {id_to_delete} on {host}:{port} - {e}"))
 
     print(f"Write stress test completed on {host}:{port} for {duration}s at {rate} ops/sec.")
 
 
-def run_stress_reads(session, host, port, rate, duration, consistency, keyspace, table):
-    session = get_session(host, port)
+def run_stress_reads(session, host, port, rate, duration, consistency, keyspace, table, prepared=True, distribution=None,
+                     miss_ratio=0.0):
+    statements = StatementCache(session, prepared)
+    # Without a key distribution there is no record of this node's writes, so reads can only miss.
+    keys = ReadKeyPool(distribution=distribution, miss_ratio=miss_ratio)
+    counts = {"Hits": 0, "Misses": 0}
+    lock = threading.Lock()
 
-    select_query = "SELECT id, value FROM test WHERE id = %s"
+    def read(query, parameters):
+        found = session.execute(query, parameters).one() is not None
+        with lock:
+            counts["Hits" if found else "Misses"] += 1
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=rate) as executor:
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            random_id = uuid.uuid4()  # Simulating a lookup for a random ID
-            executor.submit(session.execute, select_query, (random_id,))
-            time.sleep(1 / rate)  # Control request rate
\ No newline at end of file
+        for _ in RateScheduler(rate, duration):
+            read_id, _ = keys.take()
+            select_query, parameters = statements.bind("select", keyspace, table, consistency, (read_id,))
+            executor.submit(read, select_query, parameters)
+
+    print(f"Read stress test completed on {host}:{port} with {counts['Hits']} hits and {counts['Misses']} misses.")
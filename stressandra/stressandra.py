@@ -9,48 +9,148 @@ import os
 from tqdm import tqdm
 from cassandra import ConsistencyLevel
 import re
+import math
+import json
+import csv
 from cassandra.cluster import Cluster
-from .jmx import JMXMetrics
-from .db import get_session
-from .config import Config
+from .jmx import JMXMetrics, JMXCollector, check_java, save_cluster_stats
+from .timeseries import TimeSeriesStore
+from .engine import AsyncEngine
+from .workers import WorkerPool
+from .histogram import LatencyHistogram, save_histograms
+from .search import ThroughputSearch
+from .db import get_sessions
+import psutil
+from .counters import counter_table_cql, verify_counters
+from .scan import TableScan, split_ring
+from .load import BulkLoader
+from .config import Config, make_consistency
 
 class Stressandra(Config):
-    def __init__(self, hostIPs=[], hostPorts=[], hostJMXPorts=[], rate=50, duration=30, warmup_duration=300,
-                 consistency='ONE', jmx_metrics=[], replication_factor=1, keyspace='stressandra_test_ks',
-                 table="stressandra_test_table", write_test=False, read_test=False):
-        super().__init__(hostIPs, hostPorts, hostJMXPorts, rate, duration, warmup_duration, consistency,
-            jmx_metrics, replication_factor, keyspace, table, write_test, read_test)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.sessions = {}
         self.warmup_threads = []
         self.stress_threads = []
         self.jmx_metric_objs = []
+        self.client_stats = {}
+        self.latency_histograms = {}
+        self.rate_samples = {}
+        self.phase_rate = None
+        self.phase_start = None
+        self.written_keys = None
+        self.counter_expected = None
 
     def run(self):
-        self.get_sessions()
-        self.make_dirs()
-        self.validate_cluster_size()
-        self.create_keyspace()
-        self.create_table()
+        check_java()
+        self.setup()
         self.run_warmup()
+        collector = JMXCollector([f"{host}:{port}" for host, port in zip(self.hostIPs, self.hostJMXPorts)],
+                                 [metric["mbean"] for metric in self.jmx_metrics], self.jmx_interval)
+        metrics_threads = []
+        store = TimeSeriesStore()
         for i in range(self.cluster_size):
             stop_event = threading.Event()
-            jmx_metric = JMXMetrics(self, self.hostIPs[i], self.hostJMXPorts[i], self.metrics_dir, stop_event)
+            jmx_metric = JMXMetrics(self, self.hostIPs[i], self.hostJMXPorts[i], self.metrics_dir, stop_event,
+                                    target_rate=self.current_target_rate, store=store)
             self.jmx_metric_objs.append(jmx_metric)
+            collector.subscribe(jmx_metric.host, jmx_metric)
             metrics_thread = threading.Thread(target=jmx_metric.run)
             metrics_thread.start()
-        self.run_stress_test()
-        for jmx_metric in self.jmx_metric_objs:
-            jmx_metric.stop_event.set()
+            metrics_threads.append(metrics_thread)
+        try:
+            collector.start()
+            self.run_stress_test()
+        finally:
+            # The metrics threads are not daemons; unless they are stopped a failed run never exits.
+            collector.stop()
+            for jmx_metric in self.jmx_metric_objs:
+                jmx_metric.stop_event.set()
+            for metrics_thread in metrics_threads:
+                metrics_thread.join()
+        save_cluster_stats(self.jmx_metric_objs, f"{self.metrics_dir}/cluster-stats.json")
+        print(f"Saving JMX metric time series at {self.metrics_dir}/metrics.npz")
+        store.save(f"{self.metrics_dir}/metrics.npz")
+        self.save_client_stats()
+        self.save_latency_histograms()
+        self.save_rate_samples()
         self.save_config()
 
+    def setup(self):
+        self.get_sessions()
+        self.make_dirs()
+        self.validate_cluster_size()
+        self.create_keyspace()
+        self.create_table()
+
+    def run_bulk_load(self):
+        """Fills the table to the load target with no rate limit, resuming from the load checkpoint."""
+        if self.workload:
+            raise ValueError("The load command fills the built-in (id, value) table; workload profiles are not supported.")
+        self.setup()
+        settings = {**self.load, "payload": self.payload, "namespace": self.key_distribution["namespace"],
+                    "seed": self.seed}
+        loader = BulkLoader(list(zip(self.hostIPs, self.hostPorts)), self.keyspace, self.table, self.consistency,
+                            settings, self.session_options(), self.workers)
+        print(f"Loading {loader.settings['rows']} rows into {self.keyspace}.{self.table} with {self.workers} "
+              f"loader processes.")
+        with tqdm(total=loader.pending_rows(), desc="Load", unit="row") as pbar:
+            loader.run(progress=lambda rows: pbar.update(rows - pbar.n))
+        summary = loader.summary()
+        print(f"Loaded {summary['Written']} rows in {summary['Seconds']:.1f}s: {summary['Rows/s']:.0f} rows/s, "
+              f"{summary['MB/s']:.2f} MB/s, {summary['Failed']} failed.")
+        self.client_stats["Load"] = summary
+        self.save_client_stats()
+        self.save_config()
+
+    def run_search(self):
+        check_java()
+        self.setup()
+        self.run_warmup()
+        search = ThroughputSearch(self.run_search_step, self.search["min_rate"], self.search["max_rate"],
+            self.search["p99_ms"], self.search["max_error_rate"], self.search["strategy"], self.search["tolerance"],
+            self.search["ramp_step"])
+        best = search.run()
+        print(search.table())
+        if best is None:
+            print(f"No rate between {self.search['min_rate']} and {self.search['max_rate']} ops/sec per node met the SLO.")
+        else:
+            print(f"Highest rate within SLO: {best} ops/sec per node ({best * self.cluster_size} ops/sec total).")
+        self.save_search(search)
+        self.save_config()
+
+    def run_search_step(self, rate):
+        summary, histograms, _ = self.run_load(rate, self.search["step_duration"], self.consistency, f"Search @ {rate}/s")
+        self.client_stats[f"Search {rate}"] = summary
+        return summary, histograms
+
     def make_dirs(self):
         os.mkdir(self.logs_dir)
         os.mkdir(self.metrics_dir)
+        os.mkdir(self.latency_dir)
 
     def get_sessions(self):
-        for host, port in zip(self.hostIPs, self.hostPorts):
-            print(f"Creating session for node {host}:{port}")
-            self.sessions[f"{host}:{port}"] = get_session(host, port)
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        start_time = time.monotonic()
+        if self.shared_cluster:
+            print(f"Creating one shared session for {self.cluster_size} nodes")
+        self.sessions = get_sessions(list(zip(self.hostIPs, self.hostPorts)), **self.session_options())
+        startup = time.monotonic() - start_time
+        rss = process.memory_info().rss
+        print(f"Sessions ready in {startup:.2f}s, client RSS {rss / 2**20:.1f} MB")
+        self.client_stats["Startup"] = {
+            "Shared Cluster": self.shared_cluster,
+            "Retention": self.retention,
+            "Seed": self.seed,
+            "Key Distribution": self.key_distribution,
+            "Reads": self.reads,
+            "Mixed Test": self.mixed_test,
+            "Operations": self.operations,
+            "Seconds": startup,
+            "RSS MB": rss / 2**20,
+            "RSS Growth MB": (rss - rss_before) / 2**20,
+        }
 
     def validate_cluster_size(self):
         print("Validating cluster size...")
@@ -100,19 +200,37 @@ class Stressandra(Config):
         query = f"""
         CREATE TABLE IF NOT EXISTS {self.keyspace}.{self.table} (
             id UUID PRIMARY KEY,
-            value TEXT
+            value BLOB
         );
         """
+        if self.workload:
+            query = self.workload.create_table_cql(self.keyspace, self.table)
         list(self.sessions.values())[0].execute(query)
         print(f"Table '{self.table}' created successfully.")
+        if self.wide_test:
+            print(f"Creating table '{self.keyspace}.{self.wide_partitions.table}'...")
+            list(self.sessions.values())[0].execute(self.wide_partitions.create_table_cql(self.keyspace))
+        if self.counter_test:
+            print(f"Creating table '{self.keyspace}.{self.counters['table']}'...")
+            list(self.sessions.values())[0].execute(counter_table_cql(self.keyspace, self.counters["table"]))
+            # Counter keys are the same every run, so leftovers from a previous run would fail verification.
+            print(f"Truncating '{self.keyspace}.{self.counters['table']}' so every counter starts from zero...")
+            list(self.sessions.values())[0].execute(f"TRUNCATE {self.keyspace}.{self.counters['table']}", timeout=60)
 
 
     def run_warmup(self):
         print("Starting warmup phase...")
+        if self.engine == "async":
+            self.run_async_engine(50, self.warmup_duration, ConsistencyLevel.ONE, "Warmup")
+            print("Warmup phase completed.")
+            return
+
         for i in range(self.cluster_size):
             print(f"Warming up node {self.hostIPs[i]}:{self.hostPorts[i]} for {self.warmup_duration}s with replication factor {self.replication_factor} before stress test...")
             thread = threading.Thread(target=stress.run_stress_writes, args=(self.sessions[f"{self.hostIPs[i]}:{self.hostPorts[i]}"],
-                self.hostIPs[i], self.hostPorts[i], 50, self.warmup_duration, ConsistencyLevel.ONE, self.keyspace, self.table))
+                self.hostIPs[i], self.hostPorts[i], 50, self.warmup_duration, ConsistencyLevel.ONE, self.keyspace, self.table),
+                kwargs={"prepared": self.prepared, "retention": self.retention,
+                        "distribution": self.key_distribution, "payload": self.payload})
             self.warmup_threads.append(thread)
             thread.start()
 
@@ -128,25 +246,70 @@ class Stressandra(Config):
 
     def run_stress_test(self):
         print("Starting stress test...")
+        rate = self.rate_profile or self.rate
+        if self.rate_profile:
+            print(f"Following rate profile {self.rate_profile} instead of a constant rate.")
 
-        if self.write_test:
+        if self.write_test and self.engine == "async":
+            print("Running async write test on all nodes.")
+            self.client_stats["Write"], self.latency_histograms["Write"], self.rate_samples["Write"] = self.run_load(
+                rate, self.duration, self.consistency, "Write Stress Test")
+        elif self.write_test:
             print("Running write test on all nodes.")
             for i in range(self.cluster_size):
                 print(f"Starting write stress test on host {self.hostIPs[i]}:{self.hostPorts[i]}")
                 thread = threading.Thread(target=stress.run_stress_writes, args=(self.sessions[f"{self.hostIPs[i]}:{self.hostPorts[i]}"],
-                    self.hostIPs[i], self.hostPorts[i], self.rate, self.duration, self.consistency, self.keyspace, self.table))
+                    self.hostIPs[i], self.hostPorts[i], self.rate, self.duration, self.consistency, self.keyspace, self.table),
+                    kwargs={"prepared": self.prepared, "retention": self.retention,
+                            "distribution": self.key_distribution, "payload": self.payload})
                 self.stress_threads.append(thread)
                 thread.start()
 
             self.progress_bar(self.duration, "Write Stress Test")
             self.end_stress_test()
 
-        if self.read_test:
+        if self.mixed_test:
+            mix = ", ".join(f"{op} {weight}" for op, weight in self.operations.items())
+            print(f"Running mixed test on all nodes ({mix}).")
+            self.client_stats["Mixed"], self.latency_histograms["Mixed"], self.rate_samples["Mixed"] = self.run_load(
+                rate, self.duration, self.consistency, "Mixed Stress Test", operation="mixed", written=self.written_keys)
+
+        if self.wide_test:
+            rows = self.wide_partitions.total_rows()
+            load_duration = math.ceil(rows / (self.rate * self.cluster_size))
+            print(f"Loading {rows} rows into {self.wide_partitions.partitions} wide partitions over {load_duration}s.")
+            self.client_stats["Wide Load"], self.latency_histograms["Wide Load"], self.rate_samples["Wide Load"] = self.run_load(
+                self.rate, load_duration, self.consistency, "Wide Load", operation="wide_load")
+            print("Running wide-partition slice reads on all nodes.")
+            self.client_stats["Wide Read"], self.latency_histograms["Wide Read"], self.rate_samples["Wide Read"] = self.run_load(
+                rate, self.duration, self.consistency, "Wide Read", operation="wide_read")
+
+        if self.lwt_test:
+            print(f"Running LWT test on all nodes with {self.lwt['contention']} clients racing per key.")
+            self.client_stats["LWT"], self.latency_histograms["LWT"], self.rate_samples["LWT"] = self.run_load(
+                rate, self.duration, self.consistency, "LWT Stress Test", operation="lwt")
+
+        if self.counter_test:
+            print(f"Running counter test on all nodes over {self.counters['keys']} counters.")
+            self.client_stats["Counter"], self.latency_histograms["Counter"], self.rate_samples["Counter"] = self.run_load(
+                rate, self.duration, self.consistency, "Counter Stress Test", operation="counter")
+            self.client_stats["Counter Verification"] = self.verify_counters()
+
+        if self.scan_test:
+            self.client_stats["Scan"], self.latency_histograms["Scan"] = self.run_scan()
+
+        if self.read_test and self.engine == "async":
+            print("Running async read test on all nodes.")
+            self.client_stats["Read"], self.latency_histograms["Read"], self.rate_samples["Read"] = self.run_load(
+                rate, self.duration, self.consistency, "Read Stress Test", operation="read", written=self.written_keys)
+        elif self.read_test:
             print("Running read test on all nodes.")
             for i in range(self.cluster_size):
                 print(f"Starting read stress test on host {self.hostIPs[i]}:{self.hostPorts[i]}")
                 thread = threading.Thread(target=stress.run_stress_reads, args=(self.sessions[f"{self.hostIPs[i]}:{self.hostPorts[i]}"],
-                    self.hostIPs[i], self.hostPorts[i], self.rate, self.duration, self.consistency, self.keyspace, self.table))
+                    self.hostIPs[i], self.hostPorts[i], self.rate, self.duration, self.consistency, self.keyspace, self.table),
+                    kwargs={"prepared": self.prepared, "distribution": self.key_distribution,
+                            "miss_ratio": self.reads["miss_ratio"]})
                 self.stress_threads.append(thread)
                 thread.start()
 
@@ -155,26 +318,179 @@ class Stressandra(Config):
 
         print("Stress test completed.")
 
+    def current_target_rate(self):
+        """Rate offered by the running phase; every phase starts its rate profile from the beginning."""
+        if self.phase_start is None:
+            return self.rate
+        if hasattr(self.phase_rate, "rate_at"):
+            return self.phase_rate.rate_at(time.monotonic() - self.phase_start)
+        return self.phase_rate
+
+    def run_load(self, rate, duration, consistency, desc, **overrides):
+        """
+        Runs the async engine in-process or across workers; returns (summary, histograms, rate samples).
+        The keys written are kept so a later read phase can read them back.
+        """
+        self.phase_rate, self.phase_start = rate, time.monotonic()
+        try:
+            if self.workers > 1:
+                pool = self.run_worker_pool(rate, duration, consistency, desc, **overrides)
+                summary, histograms, samples, written = pool.summary, pool.histograms, pool.rate_samples, pool.written
+                counter_expected = pool.counter_expected
+            else:
+                engine = self.run_async_engine(rate, duration, consistency, desc, **overrides)
+                summary, histograms, samples, written = engine.summary(), engine.histograms, engine.scheduler.samples, engine.written
+                counter_expected = engine.counter_expected
+        finally:
+            self.phase_rate = self.phase_start = None
+        if overrides.get("operation", "write") == "write" and written:
+            self.written_keys = written
+        if counter_expected is not None:
+            self.counter_expected = counter_expected
+        return summary, histograms, samples
+
+    def verify_counters(self):
+        """Reads every incremented counter back and compares it with the acknowledged increments."""
+        stats = self.client_stats["Counter"]["Operations"].get("counter_update", {})
+        print(f"Verifying counters at consistency {self.counters['verify_consistency']}...")
+        verification = verify_counters(list(self.sessions.values())[0], self.keyspace, self.counters["table"],
+                                       self.counter_expected, namespace=self.key_distribution["namespace"],
+                                       consistency=make_consistency(self.counters["verify_consistency"]),
+                                       uncertain=stats.get("Errors", 0))
+        print(f"Counters matched: {verification['Matched']}/{verification['Counters']}, "
+              f"mismatched: {verification['Mismatched']}, missing: {verification['Missing']}, "
+              f"uncertain updates: {verification['Uncertain Updates']}")
+        return verification
+
+    def run_scan(self):
+        """Scans the whole scan table by token range; returns (summary, per-range latency histograms)."""
+        session = list(self.sessions.values())[0]
+        ranges = split_ring(session.cluster.metadata, self.keyspace, self.scan["splits_per_range"])
+        print(f"Scanning {self.keyspace}.{self.scan['table']} in {len(ranges)} token ranges, "
+              f"{self.scan['parallelism']} at a time.")
+        scan = TableScan(self.sessions, self.keyspace, self.scan["table"], self.scan["partition_key"], ranges,
+                         self.consistency, self.scan["parallelism"], self.scan["fetch_size"])
+        thread = threading.Thread(target=scan.run)
+        thread.start()
+        with tqdm(total=len(ranges), desc="Scan", unit="range") as pbar:
+            while thread.is_alive():
+                thread.join(1)
+                pbar.update(scan.completed - pbar.n)
+        summary = scan.summary()
+        total = summary["Total"]
+        print(f"Scanned {total['Rows']} rows in {total['Seconds']:.1f}s: {total['Rows/s']:.0f} rows/s, "
+              f"{total['MB/s']:.2f} MB/s, {total['Errors']} failed ranges.")
+        return summary, scan.histograms
+
+    def run_async_engine(self, rate, duration, consistency, desc, **overrides):
+        targets = [(self.sessions[f"{host}:{port}"], host, port) for host, port in zip(self.hostIPs, self.hostPorts)]
+        engine = AsyncEngine(targets, rate, duration, consistency, self.keyspace, self.table,
+                             **{**self.engine_options(), **overrides})
+        thread = threading.Thread(target=engine.run)
+        thread.start()
+        self.progress_bar(duration, desc, status=engine.scheduler.latest)
+        thread.join()
+        return engine
+
+    def run_worker_pool(self, rate, duration, consistency, desc, **overrides):
+        print(f"Splitting {rate} ops/sec per node across {self.workers} worker processes.")
+        pool = WorkerPool(list(zip(self.hostIPs, self.hostPorts)), self.workers, self.keyspace, self.table,
+                          self.engine_options(), self.session_options())
+        pool.start(rate, duration, consistency, **overrides)
+        self.progress_bar(duration, desc)
+        pool.join()
+        return pool
+
     def end_stress_test(self):
         for i, thread in enumerate(self.stress_threads):
             thread.join()
             print(f"Stopping stress test on host {self.hostIPs[i]}:{self.hostPorts[i]}")
         self.stress_threads = []
 
-    def progress_bar(self, total_progress, desc):
+    def progress_bar(self, total_progress, desc, status=None):
         with tqdm(total=total_progress, desc=desc, unit="s") as pbar:
             start_time = time.time()
             while time.time() - start_time < total_progress:
                 remaining_time = total_progress - (time.time() - start_time)
                 pbar.update(1)
+                sample = status() if status else None
+                if sample:
+                    pbar.set_postfix(intended=f"{sample['Intended']:.0f}/s", achieved=f"{sample['Achieved']:.0f}/s")
                 time.sleep(1)
             pbar.update(total_progress - pbar.n)
 
+    def save_client_stats(self):
+        if not self.client_stats:
+            return
+        filename = f"{self.logs_dir}/client-stats.json"
+        print(f"Saving client stats at {filename}")
+        with open(filename, "w") as f:
+            json.dump(self.client_stats, f, indent=4)
+
+    def save_latency_histograms(self):
+        summary = {}
+        for phase, histograms in self.latency_histograms.items():
+            os.makedirs(f"{self.latency_dir}/{phase}", exist_ok=True)
+            print(f"Saving client latency histograms at {self.latency_dir}/{phase}")
+            save_histograms(histograms, f"{self.latency_dir}/{phase}")
+            summary[phase] = {f"{op} {host}": histogram.summary() for (op, host), histogram in histograms.items()}
+            for op in sorted({op for op, _ in histograms}):
+                merged = LatencyHistogram()
+                for (name, _), histogram in histograms.items():
+                    if name == op:
+                        merged.merge(histogram)
+                summary[phase][f"{op} All"] = merged.summary()
+        if summary:
+            with open(f"{self.latency_dir}/latency-summary.json", "w") as f:
+                json.dump(summary, f, indent=4)
+
+    def save_rate_samples(self):
+        for phase, samples in self.rate_samples.items():
+            if not samples:
+                continue
+            filename = f"{self.logs_dir}/rate-{phase}.csv"
+            print(f"Saving intended vs achieved rate at {filename}")
+            with open(filename, mode="w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=samples[0].keys())
+                writer.writeheader()
+                writer.writerows(samples)
+
+    def save_search(self, search):
+        filename = f"{self.logs_dir}/search.csv"
+        print(f"Saving search steps at {filename}")
+        steps = [step.to_dict() for step in search.steps]
+        with open(filename, mode="w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=steps[0].keys() if steps else [])
+            writer.writeheader()
+            writer.writerows(steps)
+        with open(f"{self.logs_dir}/search.json", "w") as f:
+            json.dump({"Best Rate": search.best, "SLO": self.search, "Steps": steps}, f, indent=4)
+        self.save_client_stats()
+
     def save_config(self):
         filename = f"{self.logs_dir}/config.json"
         data = {
             "Consistency": self.consistency,
-            "Replication": self.replication,
+            "Replication": self.replication_factor,
+            "Engine": self.engine,
+            "Max In Flight": self.max_in_flight,
+            "Prepared": self.prepared,
+            "Workers": self.workers,
+            "Coordinator": self.coordinator,
+            "Shared Cluster": self.shared_cluster,
+            "Rate Profile": self.rate_profile.segment_configs if self.rate_profile else None,
+            "Workload": self.workload.settings if self.workload else None,
+            "Payload": self.payload,
+            "Wide Test": self.wide_test,
+            "Wide": self.wide,
+            "LWT Test": self.lwt_test,
+            "LWT": self.lwt,
+            "Counter Test": self.counter_test,
+            "Counters": self.counters,
+            "Scan Test": self.scan_test,
+            "Scan": self.scan,
+            "Load": self.load,
+            "JMX Interval": self.jmx_interval,
             "Rate": self.rate,
             "Duration": self.duration,
             "Cluster Size": self.cluster_size
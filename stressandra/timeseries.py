@@ -0,0 +1,77 @@
+import csv
+import threading
+from array import array
+import numpy as np
+
+class TimeSeriesStore:
+    """
+    (timestamp, value) series per node and metric, kept as packed doubles while a run
+    collects them and saved as one columnar .npz file.
+
+    On disk every series is a slice of two flat arrays, t (seconds since the epoch) and
+    value, with offsets marking where each series starts, next to the node and metric
+    name of each series. Loading is a handful of array reads however long the run was, and
+    the loaded series are slices of them.
+    """
+    def __init__(self):
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def append(self, node, metric, t, value):
+        with self.lock:
+            if (node, metric) not in self.series:
+                self.series[(node, metric)] = (array("d"), array("d"))
+            times, values = self.series[(node, metric)]
+            if isinstance(times, np.ndarray):
+                # Loaded series are read-only array slices until something is appended.
+                times, values = array("d", times.tobytes()), array("d", values.tobytes())
+                self.series[(node, metric)] = (times, values)
+            times.append(t)
+            values.append(value)
+
+    def extend(self, node, t, values):
+        """Adds one sample of several metrics of a node, values mapping metric to number."""
+        for metric, value in values.items():
+            self.append(node, metric, t, value)
+
+    def keys(self):
+        return list(self.series)
+
+    def get(self, node, metric):
+        """Returns copies of the (t, value) arrays of one series."""
+        with self.lock:
+            times, values = self.series[(node, metric)]
+            return np.array(times, dtype=np.float64), np.array(values, dtype=np.float64)
+
+    def save(self, filename):
+        with self.lock:
+            keys = list(self.series)
+            lengths = [len(self.series[key][0]) for key in keys]
+            offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+            times = np.concatenate([np.frombuffer(self.series[key][0], dtype=np.float64) for key in keys] or [[]])
+            values = np.concatenate([np.frombuffer(self.series[key][1], dtype=np.float64) for key in keys] or [[]])
+        np.savez(filename, t=times, value=values, offsets=offsets,
+                 nodes=np.array([node for node, _ in keys], dtype=str),
+                 metrics=np.array([metric for _, metric in keys], dtype=str))
+
+    @classmethod
+    def load(cls, filename):
+        store = cls()
+        with np.load(filename, allow_pickle=False) as data:
+            times, values, offsets = data["t"], data["value"], data["offsets"]
+            for i, key in enumerate(zip(data["nodes"].tolist(), data["metrics"].tolist())):
+                start, end = offsets[i], offsets[i + 1]
+                store.series[key] = (times[start:end], values[start:end])
+        return store
+
+    def to_csv(self, filename):
+        """Exports every sample as a Timestamp, Node, Metric, Value row, ordered by time."""
+        rows = []
+        for node, metric in self.keys():
+            times, values = self.get(node, metric)
+            rows.extend((t, node, metric, value) for t, value in zip(times.tolist(), values.tolist()))
+        rows.sort(key=lambda row: row[0])
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Node", "Metric", "Value"])
+            writer.writerows(rows)
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+from .distributions import splitmix64, index_keys
+from .generators import keys_from_buffer
+
+class WidePartitions:
+    """
+    Layout of the wide-partition table: partitions partition keys, each holding between
+    min_rows and max_rows clustering rows.
+
+    Row counts are a hash of the partition index, so writers and readers in any process
+    agree on every partition's size without storing it.
+
+    Parameters:
+    - table (str): Table holding the wide partitions.
+    - partitions (int): Number of partitions.
+    - min_rows (int): Fewest clustering rows in a partition.
+    - max_rows (int): Most clustering rows in a partition.
+    - slice_rows (list): LIMITs of slice queries, one drawn per query.
+    - range_ratio (float): Fraction of reads that are bounded range queries instead of slices.
+    - fetch_size (int): Rows per page; larger results are paged.
+    - namespace (int): Key namespace, see distributions.index_keys.
+    """
+    def __init__(self, table, partitions=1000, min_rows=100, max_rows=100, slice_rows=(10, 100, 1000), range_ratio=0.0,
+                 fetch_size=5000, namespace=1):
+        self.table = table
+        self.partitions = partitions
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.slice_rows = list(slice_rows)
+        self.range_ratio = range_ratio
+        self.fetch_size = fetch_size
+        self.namespace = namespace
+
+    def rows_in(self, indices):
+        """Clustering rows in each of the given partitions, as an int64 array."""
+        indices = np.asarray(indices, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            hashes = splitmix64(indices ^ np.uint64(self.namespace))
+        return (self.min_rows + hashes % np.uint64(self.max_rows - self.min_rows + 1)).astype(np.int64)
+
+    def total_rows(self):
+        return int(self.rows_in(np.arange(self.partitions)).sum())
+
+    def create_table_cql(self, keyspace):
+        return (f"CREATE TABLE IF NOT EXISTS {keyspace}.{self.table} (pk uuid, ck int, value blob, "
+                f"PRIMARY KEY ((pk), ck))")
+
+def size_bucket(n):
+    """Smallest power of ten not below n, so latency can be grouped by order of magnitude."""
+    return 0 if n <= 0 else 10 ** math.ceil(math.log10(n))
+
+class WideRowSource:
+    """
+    (partition key, clustering key) pairs that fill partitions in turn, wrapping around
+    once the whole layout has been written. Workers each fill every step-th partition
+    from their own first one, so together they write the layout exactly once.
+
+    Parameters:
+    - layout (WidePartitions): Partitions to fill.
+    - first (int): First partition to fill.
+    - step (int): Distance between the partitions this source fills.
+    - batch_size (int): Pairs generated per refill.
+    """
+    def __init__(self, layout, first=0, step=1, batch_size=65536):
+        self.layout = layout
+        self.step = step
+        self.batch_size = batch_size
+        self.partition = first
+        self.row = 0
+        self.rows = []
+        self.position = 0
+
+    def refill(self):
+        keys, clustering = [], []
+        while len(keys) < self.batch_size:
+            rows_in_partition = int(self.layout.rows_in([self.partition])[0])
+            count = min(self.batch_size - len(keys), rows_in_partition - self.row)
+            key = keys_from_buffer(index_keys([self.partition], self.layout.namespace))[0]
+            keys.extend([key] * count)
+            clustering.extend(range(self.row, self.row + count))
+            self.row += count
+            if self.row == rows_in_partition:
+                self.partition = (self.partition + self.step) % self.layout.partitions
+                self.row = 0
+        self.rows = list(zip(keys, clustering))
+        self.position = 0
+
+    def take(self):
+        if self.position == len(self.rows):
+            self.refill()
+        row = self.rows[self.position]
+        self.position += 1
+        return row
+
+class SliceSource:
+    """
+    Slice and range reads over the wide partitions, drawn in batches.
+
+    A slice reads up to limit rows after a random clustering key (ck > ? LIMIT ?), a range
+    reads the rows between two clustering keys (ck > ? AND ck <= ?).
+
+    Parameters:
+    - layout (WidePartitions): Partitions to read.
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - batch_size (int): Reads drawn per refill.
+    """
+    def __init__(self, layout, seed=None, batch_size=65536):
+        self.layout = layout
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.reads = []
+        self.position = 0
+
+    def refill(self):
+        n = self.batch_size
+        partitions = self.rng.integers(0, self.layout.partitions, size=n)
+        rows = self.layout.rows_in(partitions)
+        limits = self.rng.choice(self.layout.slice_rows, size=n)
+        starts = (self.rng.random(n) * np.maximum(rows - limits, 0)).astype(np.int64) - 1
+        ranged = self.rng.random(n) < self.layout.range_ratio
+        keys = keys_from_buffer(index_keys(partitions, self.layout.namespace))
+        self.reads = [
+            ("wide_range", (key, start, start + limit), partition_rows) if is_range else
+            ("wide_slice", (key, start, limit), partition_rows)
+            for key, start, limit, partition_rows, is_range in
+            zip(keys, starts.tolist(), limits.tolist(), rows.tolist(), ranged.tolist())
+        ]
+        self.position = 0
+
+    def take(self):
+        """Returns a (query kind, bind values, rows in the partition) triple."""
+        if self.position == len(self.reads):
+            self.refill()
+        read = self.reads[self.position]
+        self.position += 1
+        return read
@@ -0,0 +1,163 @@
+import multiprocessing
+from .db import get_sessions
+from .engine import AsyncEngine
+from .histogram import merge_histograms
+from .retention import merge_key_rings
+
+def split_rate(rate, workers):
+    """Splits a per-node rate between workers, spreading the remainder over the first ones."""
+    if hasattr(rate, "scaled"):
+        return [rate.scaled(1 / workers)] * workers
+    if rate < workers:
+        raise ValueError(f"A rate of {rate} ops/sec cannot be split across {workers} workers.")
+    return [rate // workers + (1 if i < rate % workers else 0) for i in range(workers)]
+
+def run_worker(worker_id, hosts, rate, duration, consistency, keyspace, table, engine_options, session_options, results):
+    """
+    Entry point of a generator process. Each worker opens its own driver Cluster(s),
+    runs an AsyncEngine for its share of the rate and reports the summary back on results.
+    """
+    sessions = []
+    try:
+        sessions = [(session, host, port) for (host, port), session in
+                    zip(hosts, get_sessions(hosts, **session_options).values())]
+        engine = AsyncEngine(sessions, rate, duration, consistency, keyspace, table, **engine_options)
+        engine.run()
+        results.put((worker_id, {"Summary": engine.summary(), "Histograms": engine.histograms,
+                                 "Rate": engine.scheduler.samples, "Written": engine.written,
+                                 "Counters": engine.counter_expected}, None))
+    except Exception as e:
+        results.put((worker_id, None, str(e)))
+    finally:
+        for session, _, _ in sessions:
+            session.cluster.shutdown()
+
+def merge_summaries(summaries):
+    """Merges per-worker engine summaries into one report, keeping each worker's own summary."""
+    merged = {"Nodes": {}, "Coordinators": {}, "Operations": {}}
+    for summary in summaries:
+        for name, stats in summary["Coordinators"].items():
+            coordinator = merged["Coordinators"].setdefault(name, {"Completed": 0, "Throughput": 0})
+            coordinator["Completed"] += stats["Completed"]
+            coordinator["Throughput"] += stats["Throughput"]
+        for name, stats in summary.get("Operations", {}).items():
+            operation = merged["Operations"].setdefault(name, {})
+            for key, value in stats.items():
+                operation[key] = operation.get(key, 0) + value
+        for name, stats in summary["Nodes"].items():
+            node = merged["Nodes"].setdefault(name, {})
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    node[key] = node.get(key, 0) + value
+                else:
+                    node[key] = value or node.get(key)
+    for node in merged["Nodes"].values():
+        if "Hit Ratio" in node:
+            reads = node["Hits"] + node["Misses"]
+            node["Hit Ratio"] = node["Hits"] / reads if reads else None
+
+    completed = sum(node["Completed"] for node in merged["Nodes"].values())
+    cpu_time = sum(summary["Client"]["CPU Seconds"] for summary in summaries)
+    merged["Client"] = {
+        "Prepared": summaries[0]["Client"]["Prepared"] if summaries else None,
+        "Throughput": sum(summary["Client"]["Throughput"] for summary in summaries),
+        "MB/s": sum(summary["Client"].get("MB/s", 0) for summary in summaries),
+        "CPU Seconds": cpu_time,
+        "CPU ms per 1k Ops": cpu_time * 1000 * 1000 / completed if completed else None,
+        "Workers": len(summaries),
+    }
+    merged["Workers"] = {f"Worker {i}": summary for i, summary in enumerate(summaries)}
+    return merged
+
+def merge_rate_samples(sample_sets):
+    """
+    Sums per-interval scheduler samples of all workers. Lag and interval latencies are
+    the worst of any worker, since interval percentiles cannot be summed.
+    """
+    merged = []
+    for samples in sample_sets:
+        for i, sample in enumerate(samples):
+            if i == len(merged):
+                merged.append(dict(sample))
+            else:
+                merged[i]["Intended"] += sample["Intended"]
+                merged[i]["Achieved"] += sample["Achieved"]
+                merged[i]["Lag"] = max(merged[i]["Lag"], sample["Lag"])
+                merged[i]["Completed"] = merged[i].get("Completed", 0) + sample.get("Completed", 0)
+                for key in ("p50 ms", "p99 ms"):
+                    values = [value for value in (merged[i].get(key), sample.get(key)) if value is not None]
+                    merged[i][key] = max(values) if values else None
+    return merged
+
+class WorkerPool:
+    """
+    Runs the async engine in several generator processes so driver serialization is not
+    capped by a single interpreter's GIL. The per-node rate is split between workers and
+    their summaries are merged into one report.
+
+    Parameters:
+    - hosts (list): (host, port) tuples, one per node.
+    - workers (int): Number of generator processes.
+    - keyspace (str): Keyspace to write into.
+    - table (str): Table to write into.
+    - engine_options (dict): Keyword arguments for AsyncEngine in each worker.
+    - session_options (dict): Keyword arguments for db.get_sessions in each worker.
+    """
+    def __init__(self, hosts, workers, keyspace, table, engine_options=None, session_options=None):
+        self.hosts = hosts
+        self.workers = workers
+        self.keyspace = keyspace
+        self.table = table
+        self.engine_options = engine_options or {}
+        self.session_options = session_options or {}
+        # Driver clusters own reactor threads that do not survive fork(), so every worker starts clean.
+        self.context = multiprocessing.get_context("spawn")
+        self.processes = []
+        self.results = self.context.Queue()
+        self.errors = []
+        self.summary = {}
+        self.histograms = {}
+        self.rate_samples = []
+        self.written = None
+        self.counter_expected = None
+
+    def start(self, rate, duration, consistency, **overrides):
+        """Starts the workers; overrides replace engine options for this run, e.g. operation and written."""
+        for worker_id, worker_rate in enumerate(split_rate(rate, self.workers)):
+            engine_options = {**self.engine_options, **overrides}
+            if engine_options.get("seed") is not None:
+                engine_options["seed"] = [engine_options["seed"], worker_id]  # distinct but reproducible streams
+            engine_options["stripe"] = (worker_id, self.workers)
+            distribution = engine_options.get("distribution")
+            if distribution and distribution["type"] == "sequential":
+                # Each worker walks its own slice of the key space instead of all writing the same keys.
+                offset = worker_id * distribution["partitions"] // self.workers
+                engine_options["distribution"] = {**distribution, "start": distribution["start"] + offset}
+            process = self.context.Process(target=run_worker, args=(worker_id, self.hosts, worker_rate, duration, consistency,
+                self.keyspace, self.table, engine_options, self.session_options, self.results))
+            self.processes.append(process)
+            process.start()
+
+    def join(self):
+        results = {}
+        for _ in self.processes:
+            worker_id, result, error = self.results.get()
+            if error:
+                print(f"Worker {worker_id} failed - {error}")
+                self.errors.append(f"Worker {worker_id} failed - {error}")
+            else:
+                results[worker_id] = result
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        summaries = {worker_id: result["Summary"] for worker_id, result in results.items()}
+        self.histograms = merge_histograms([result["Histograms"] for result in results.values()])
+        self.rate_samples = merge_rate_samples([result["Rate"] for result in results.values()])
+        self.summary = merge_summaries([summaries[worker_id] for worker_id in sorted(summaries)])
+        rings = [result["Written"] for result in results.values() if result["Written"] is not None]
+        if rings:
+            self.written = merge_key_rings(rings, max(ring.capacity for ring in rings))
+        counters = [result["Counters"] for result in results.values() if result["Counters"] is not None]
+        if counters:
+            self.counter_expected = sum(counters)
+        return self.summary
@@ -0,0 +1,253 @@
+import datetime
+import numpy as np
+from .generators import KeyPool, ValuePool, random_keys, keys_from_buffer, stream_seed
+from .statements import QUERIES
+
+COLUMN_TYPES = ("uuid", "int", "bigint", "text", "double", "timestamp", "boolean", "blob")
+
+# Generators each type may use; the first one is the default when a column names none.
+TYPE_GENERATORS = {
+    "uuid": ("uuid", "key"),
+    "int": ("uniform", "gaussian", "sequence", "choice", "constant"),
+    "bigint": ("uniform", "gaussian", "sequence", "choice", "constant"),
+    "text": ("text", "choice", "constant"),
+    "double": ("uniform", "gaussian", "choice", "constant"),
+    "timestamp": ("now", "sequence"),
+    "boolean": ("choice", "constant"),
+    "blob": ("payload", "constant"),
+}
+
+TEXT_ALPHABET = np.frombuffer(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789", dtype=np.uint8)
+
+# Built-in statements share the statement cache with profile queries, and these ops get their own result handling.
+RESERVED_QUERY_NAMES = tuple(QUERIES) + ("read", "expire", "wide_read")
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+PLACEHOLDERS = ("{keyspace}", "{table}")
+
+def cql_template(cql):
+    """
+    Turns a profile query into a StatementCache template. Returns (template, bind markers).
+
+    Every ? outside string literals and quoted identifiers becomes {marker}, {keyspace} and
+    {table} outside string literals are kept, and all other braces are doubled, so map and
+    set literals come out of str.format as written.
+    """
+    template = []
+    markers = 0
+    quote = None
+    i = 0
+    while i < len(cql):
+        if quote:
+            end = i + 1
+            if cql.startswith(quote, i):
+                # '' inside a literal closes and reopens it, which leaves the same text.
+                end = i + len(quote)
+                quote = None
+            template.append(cql[i:end].replace("{", "{{").replace("}", "}}"))
+            i = end
+            continue
+        if cql.startswith("$$", i):
+            quote = "$$"
+            template.append("$$")
+            i += 2
+        elif cql[i] in "'\"":
+            quote = cql[i]
+            template.append(quote)
+            i += 1
+        elif cql[i] == "?":
+            template.append("{marker}")
+            markers += 1
+            i += 1
+        elif cql.startswith(PLACEHOLDERS, i):
+            placeholder = next(name for name in PLACEHOLDERS if cql.startswith(name, i))
+            template.append(placeholder)
+            i += len(placeholder)
+        else:
+            template.append(cql[i].replace("{", "{{").replace("}", "}}"))
+            i += 1
+    return "".join(template), markers
+
+class ColumnGenerator:
+    """
+    Generates values for one column, batch_size at a time.
+
+    - key: partition keys from the run's key distribution (uuid columns).
+    - uuid: fresh random version-4 UUIDs.
+    - uniform: numbers in [min, max].
+    - gaussian: numbers around mean with stddev (rounded for int and bigint).
+    - sequence: start, start + 1, ... (timestamps count milliseconds from now).
+    - text: random alphanumeric strings of size characters.
+    - payload: size-byte slices of a preallocated random buffer, see generators.ValuePool.
+    - choice: one of values, uniformly.
+    - constant: value on every row.
+    - now: the wall clock at generation time, one millisecond (the precision of a CQL
+      timestamp) later for every row, so no two rows share one.
+
+    Parameters:
+    - name (str): Column name.
+    - type (str): CQL type, one of COLUMN_TYPES.
+    - generator (str): Generator name, see TYPE_GENERATORS for what each type allows.
+    - settings (dict): Generator settings (min, max, mean, stddev, start, size, values, value).
+    """
+    def __init__(self, name, type, generator=None, min=0, max=1000000, mean=0.0, stddev=1.0, start=0, size=16,
+                 values=None, value=None):
+        if type not in COLUMN_TYPES:
+            raise ValueError(f"Column {name} type must be one of {COLUMN_TYPES}.")
+        generator = generator or TYPE_GENERATORS[type][0]
+        if generator not in TYPE_GENERATORS[type]:
+            raise ValueError(f"Column {name} of type {type} can use generators {TYPE_GENERATORS[type]}, not '{generator}'.")
+        if generator == "choice" and not values and type != "boolean":
+            raise ValueError(f"Column {name} needs values for the choice generator.")
+        self.name = name
+        self.type = type
+        self.generator = generator
+        self.min = min
+        self.max = max
+        self.mean = mean
+        self.stddev = stddev
+        self.next_value = start
+        self.size = size
+        self.values = values if values is not None else [True, False]
+        self.value = value
+        self.payloads = None
+        self.last_now = 0
+
+    def batch(self, rng, n, keys=None):
+        """Returns the next n values as a list of Python objects the driver can serialize."""
+        if self.generator == "key":
+            return [keys.take() for _ in range(n)]
+        if self.generator == "uuid":
+            return keys_from_buffer(random_keys(rng, n))
+        if self.generator == "constant":
+            return [self.value] * n
+        if self.generator == "payload":
+            if self.payloads is None:
+                self.payloads = ValuePool(int(rng.integers(2 ** 63)), size=self.size, batch_size=n)
+            return [self.payloads.take() for _ in range(n)]
+        if self.generator == "choice":
+            return [self.values[i] for i in rng.integers(0, len(self.values), size=n).tolist()]
+        if self.generator == "text":
+            return TEXT_ALPHABET[rng.integers(0, len(TEXT_ALPHABET), size=(n, self.size))].view(f"S{self.size}").ravel().astype(str).tolist()
+        if self.generator == "now":
+            now = int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000)
+            first = max(now, self.last_now + 1)
+            self.last_now = first + n - 1
+            return [EPOCH + datetime.timedelta(milliseconds=value) for value in range(first, first + n)]
+        if self.generator == "sequence":
+            values = np.arange(self.next_value, self.next_value + n)
+            self.next_value += n
+            if self.type == "timestamp":
+                now = datetime.datetime.now(datetime.timezone.utc)
+                return [now + datetime.timedelta(milliseconds=int(value)) for value in values.tolist()]
+            return values.tolist()
+        if self.generator == "uniform":
+            if self.type == "double":
+                return rng.uniform(self.min, self.max, size=n).tolist()
+            return rng.integers(self.min, self.max, size=n, endpoint=True).tolist()
+        values = rng.normal(self.mean, self.stddev, size=n)
+        if self.type != "double":
+            values = np.rint(values).astype(np.int64)
+        return values.tolist()
+
+class WorkloadProfile:
+    """
+    User-defined table and queries to benchmark instead of the built-in (id, value) table.
+
+    Queries are CQL with ? bind markers and {keyspace}/{table} placeholders. Each names the
+    columns whose generators supply its bind parameters, in order, and a weight in the
+    query mix.
+
+    Parameters:
+    - columns (dict): Column name to {type, generator, ...} settings, see ColumnGenerator.
+    - partition_keys (list): Partition key columns.
+    - clustering_columns (list): Clustering columns, in order.
+    - clustering_order (dict): Optional column to ASC/DESC.
+    - queries (dict): Query name to {cql, parameters, weight}.
+    """
+    def __init__(self, columns, partition_keys, queries, clustering_columns=None, clustering_order=None):
+        self.settings = {"columns": columns, "partition_keys": partition_keys, "queries": queries,
+                         "clustering_columns": clustering_columns, "clustering_order": clustering_order}
+        self.columns = {name: dict(settings) for name, settings in columns.items()}
+        self.partition_keys = list(partition_keys)
+        self.clustering_columns = list(clustering_columns or [])
+        self.clustering_order = clustering_order or {}
+        self.queries = {name: dict(query) for name, query in queries.items()}
+        self.validate()
+
+    def validate(self):
+        for name, settings in self.columns.items():
+            ColumnGenerator(name, **settings)
+        if not self.partition_keys:
+            raise ValueError("Workload profile needs at least one partition key.")
+        for name in self.partition_keys + self.clustering_columns + list(self.clustering_order):
+            if name not in self.columns:
+                raise ValueError(f"Workload profile key column {name} is not declared in columns.")
+        if not self.queries:
+            raise ValueError("Workload profile needs at least one query.")
+        for name, query in self.queries.items():
+            if name in RESERVED_QUERY_NAMES:
+                raise ValueError(f"Workload query name {name} is reserved for a built-in operation, "
+                                 f"pick one not in {sorted(RESERVED_QUERY_NAMES)}.")
+            if "cql" not in query:
+                raise ValueError(f"Workload query {name} needs cql.")
+            parameters = query.get("parameters", [])
+            unknown = [column for column in parameters if column not in self.columns]
+            if unknown:
+                raise ValueError(f"Workload query {name} binds unknown columns {unknown}.")
+            markers = cql_template(query["cql"])[1]
+            if markers != len(parameters):
+                raise ValueError(f"Workload query {name} has {markers} bind markers but {len(parameters)} parameters.")
+            if query.get("weight", 1) < 0:
+                raise ValueError(f"Workload query {name} weight must be non-negative.")
+        if sum(query.get("weight", 1) for query in self.queries.values()) <= 0:
+            raise ValueError("Workload query weights must not all be zero.")
+
+    def create_table_cql(self, keyspace, table):
+        columns = ", ".join(f"{name} {settings['type']}" for name, settings in self.columns.items())
+        primary_key = ", ".join([f"({', '.join(self.partition_keys)})"] + self.clustering_columns)
+        cql = f"CREATE TABLE IF NOT EXISTS {keyspace}.{table} ({columns}, PRIMARY KEY ({primary_key}))"
+        if self.clustering_order:
+            order = ", ".join(f"{name} {direction.upper()}" for name, direction in self.clustering_order.items())
+            cql += f" WITH CLUSTERING ORDER BY ({order})"
+        return cql
+
+    def statement_templates(self):
+        """Queries in the form StatementCache expects, see cql_template."""
+        return {name: cql_template(query["cql"])[0] for name, query in self.queries.items()}
+
+    def weights(self):
+        return {name: query.get("weight", 1) for name, query in self.queries.items()}
+
+class RowSource:
+    """
+    Bind parameters for a workload profile's queries. Every column keeps its own batch of
+    pre-generated values, so a query only pops one value per bound column.
+
+    Parameters:
+    - profile (WorkloadProfile): Profile whose columns and queries are generated for.
+    - seed (int or list): PRNG seed; None draws one from the OS.
+    - distribution (dict): Key distribution of 'key' columns, see distributions.KeyDistribution.
+    - batch_size (int): Values generated per column refill.
+    """
+    def __init__(self, profile, seed=None, distribution=None, batch_size=4096):
+        # Separate streams: one seed for both would make 'uuid' columns repeat the 'key' columns.
+        self.rng = np.random.default_rng(stream_seed(seed, 0))
+        self.keys = KeyPool(stream_seed(seed, 1), distribution=distribution)
+        self.batch_size = batch_size
+        self.generators = {name: ColumnGenerator(name, **settings) for name, settings in profile.columns.items()}
+        self.parameters = {name: query.get("parameters", []) for name, query in profile.queries.items()}
+        self.batches = {name: [] for name in self.generators}
+        self.positions = {name: 0 for name in self.generators}
+
+    def value(self, column):
+        if self.positions[column] == len(self.batches[column]):
+            self.batches[column] = self.generators[column].batch(self.rng, self.batch_size, self.keys)
+            self.positions[column] = 0
+        value = self.batches[column][self.positions[column]]
+        self.positions[column] += 1
+        return value
+
+    def take(self, query):
+        return tuple(self.value(column) for column in self.parameters[query])
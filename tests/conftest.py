@@ -0,0 +1,44 @@
+import pytest
+
+class FakeFuture:
+    """
+    Stand-in for the driver's ResponseFuture that answers as soon as callbacks are added.
+    Pages of rows reach the callback one at a time, like a statement with a fetch_size.
+
+    Parameters:
+    - pages (list): Row lists, one per page; a single empty page by default.
+    - exception (Exception): Passed to the errback instead of any rows.
+    - coordinator_host (str): Host reported as the request's coordinator.
+    """
+    # Read by the ResultSet that execute_concurrent wraps rows in.
+    _col_names = None
+    _col_types = None
+    _paging_state = None
+    _continuous_paging_session = None
+
+    def __init__(self, pages=None, exception=None, coordinator_host=None):
+        self.pages = list(pages) if pages is not None else [[]]
+        self.exception = exception
+        self.coordinator_host = coordinator_host
+        self.callback = None
+
+    @property
+    def has_more_pages(self):
+        return bool(self.pages)
+
+    def add_callbacks(self, callback, errback, callback_args=(), errback_args=()):
+        if self.exception is not None:
+            errback(self.exception, *errback_args)
+            return
+        self.callback = lambda: callback(self.pages.pop(0), *callback_args)
+        self.callback()
+
+    def start_fetching_next_page(self):
+        self.callback()
+
+    def clear_callbacks(self):
+        self.callback = None
+
+@pytest.fixture
+def fake_future():
+    return FakeFuture
@@ -0,0 +1,19 @@
+import pytest
+import stressandra.jmx  # config and jmx import each other; jmx has to load first
+from stressandra.config import Config
+
+NODE = {"hostIPs": ["127.0.0.1"], "hostPorts": [9042], "hostJMXPorts": [7199]}
+
+def test_reads_are_rejected_at_consistency_any():
+    with pytest.raises(ValueError, match="ANY"):
+        Config(**NODE, read_test=True, consistency="ANY")
+    assert Config(**NODE, read_test=True, consistency="ONE").read_test
+
+@pytest.mark.parametrize("test", ["mixed_test", "wide_test", "scan_test"])
+def test_reading_phases_are_rejected_at_consistency_any(test):
+    with pytest.raises(ValueError, match="ANY"):
+        Config(**NODE, consistency="ANY", **{test: True})
+
+def test_search_min_rate_covers_every_worker():
+    with pytest.raises(ValueError, match="min_rate"):
+        Config(**NODE, write_test=True, consistency="ONE", rate=100, workers=8, search={"min_rate": 4})
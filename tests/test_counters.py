@@ -0,0 +1,58 @@
+import numpy as np
+from cassandra import ConsistencyLevel
+from stressandra.counters import CounterSource, verify_counters
+from stressandra.db import ProfiledSession
+from stressandra.distributions import index_keys
+from stressandra.engine import AsyncEngine
+from stressandra.generators import keys_from_buffer
+
+def test_counter_source_maps_indices_to_keys():
+    source = CounterSource(keys=50, max_delta=3, seed=1, batch_size=100)
+    updates = [source.take() for _ in range(300)]
+
+    assert {delta for _, _, delta in updates} == {1, 2, 3}
+    assert all(0 <= index < 50 for index, _, _ in updates)
+    index, key, _ = updates[0]
+    assert key == keys_from_buffer(index_keys([index]))[0]
+
+def test_engine_sums_acknowledged_increments(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future()
+    engine = AsyncEngine([(session, "127.0.0.1", 9042)], rate=100, duration=1, consistency=ConsistencyLevel.QUORUM,
+                         keyspace="ks", table="tbl", operation="counter", seed=3,
+                         counters={"table": "tbl_counters", "keys": 20, "max_delta": 5})
+    engine.run()
+
+    deltas = [call.args[0][0] for call in session.prepare.return_value.bind.call_args_list]
+    assert engine.counter_expected.sum() == sum(deltas)
+    assert len(engine.counter_expected) == 20
+    session.prepare.assert_called_once_with("UPDATE ks.tbl_counters SET c = c + ? WHERE id = ?")
+
+def test_verify_counters_reports_mismatches(mocker):
+    expected = np.array([0, 5, 2, 7], dtype=np.int64)
+    rows = [mocker.Mock(), mocker.Mock(), mocker.Mock()]
+    rows[0].one.return_value = (5,)
+    rows[1].one.return_value = (3,)
+    rows[2].one.return_value = None
+    execute = mocker.patch("stressandra.counters.execute_concurrent_with_args",
+                           return_value=[(True, result) for result in rows])
+    session = mocker.Mock()
+
+    result = verify_counters(session, "ks", "tbl_counters", expected, uncertain=1)
+
+    assert [args[0] for args in execute.call_args.args[2]] == keys_from_buffer(index_keys([1, 2, 3]))
+    assert session.prepare.return_value.consistency_level == ConsistencyLevel.ALL
+    assert result["Counters"] == 3
+    assert (result["Matched"], result["Mismatched"], result["Missing"]) == (1, 1, 1)
+    assert (result["Expected Total"], result["Actual Total"]) == (14, 8)
+    assert result["Uncertain Updates"] == 1
+
+def test_verify_counters_through_a_shared_cluster_session(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future([[(3,)]])
+
+    result = verify_counters(ProfiledSession(session, "127.0.0.1:9042"), "ks", "tbl_counters",
+                             np.array([3, 0, 3], dtype=np.int64))
+
+    assert (result["Counters"], result["Matched"], result["Read Errors"]) == (2, 2, 0)
+    assert {call.kwargs["execution_profile"] for call in session.execute_async.call_args_list} == {"127.0.0.1:9042"}
@@ -0,0 +1,38 @@
+import pytest
+from cassandra.cluster import EXEC_PROFILE_DEFAULT
+from stressandra.db import get_sessions
+
+def discovered(mocker, cluster_class, hosts):
+    cluster_class.return_value.metadata.all_hosts.return_value = [
+        mocker.Mock(endpoint=mocker.Mock(address=host, port=port)) for host, port in hosts]
+
+def test_shared_cluster_routes_hosts_through_profiles(mocker):
+    cluster_class = mocker.patch("stressandra.db.Cluster")
+    session = cluster_class.return_value.connect.return_value
+    hosts = [("127.0.0.1", 9042), ("127.0.0.1", 9043)]
+    discovered(mocker, cluster_class, hosts)
+
+    sessions = get_sessions(hosts, coordinator="pinned", shared_cluster=True)
+
+    cluster_class.assert_called_once()
+    profiles = cluster_class.call_args.kwargs["execution_profiles"]
+    assert set(profiles) == {"127.0.0.1:9042", "127.0.0.1:9043", EXEC_PROFILE_DEFAULT}
+    sessions["127.0.0.1:9043"].execute_async("SELECT 1")
+    session.execute_async.assert_called_once_with("SELECT 1", None, execution_profile="127.0.0.1:9043")
+
+def test_shared_cluster_rejects_undiscovered_pinned_hosts(mocker):
+    cluster_class = mocker.patch("stressandra.db.Cluster")
+    # Docker nodes on one address: the driver keeps only the node it reached through system.peers.
+    discovered(mocker, cluster_class, [("127.0.0.1", 9042)])
+
+    with pytest.raises(RuntimeError, match="127.0.0.1:9043"):
+        get_sessions([("127.0.0.1", 9042), ("127.0.0.1", 9043)], coordinator="pinned", shared_cluster=True)
+    cluster_class.return_value.shutdown.assert_called_once()
+
+def test_cluster_per_host(mocker):
+    cluster_class = mocker.patch("stressandra.db.Cluster")
+
+    sessions = get_sessions([("127.0.0.1", 9042), ("127.0.0.1", 9043)], coordinator="driver", shared_cluster=False)
+
+    assert cluster_class.call_count == 2
+    assert list(sessions) == ["127.0.0.1:9042", "127.0.0.1:9043"]
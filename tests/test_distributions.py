@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from stressandra.distributions import KeyDistribution, DISTRIBUTION_DEFAULTS, index_keys, validate_distribution
+from stressandra.generators import KeyPool
+
+def make(type, **settings):
+    return KeyDistribution(np.random.default_rng(42), type=type, partitions=1000, **settings)
+
+@pytest.mark.parametrize("type", ["uniform", "zipfian", "gaussian", "sequential", "hotspot"])
+def test_indices_stay_in_range(type):
+    indices = make(type).sample(10000)
+    assert indices.dtype == np.uint64
+    assert indices.min() >= 0 and indices.max() < 1000
+
+def test_zipfian_favours_low_indices():
+    counts = np.bincount(make("zipfian").sample(100000).astype(np.int64), minlength=1000)
+    assert counts[0] > counts[10] > counts[500]
+
+def test_large_zipfian_uses_approximation():
+    distribution = KeyDistribution(np.random.default_rng(1), type="zipfian", partitions=10**9)
+    assert distribution.cdf is None
+    indices = distribution.sample(10000)
+    assert indices.max() < 10**9
+    assert np.mean(indices < 1000) > 0.2
+
+def test_sequential_wraps_and_continues():
+    distribution = make("sequential", start=998)
+    assert distribution.sample(3).tolist() == [998, 999, 0]
+    assert distribution.sample(2).tolist() == [1, 2]
+
+def test_hotspot_concentrates_on_hot_fraction():
+    indices = make("hotspot", hot_fraction=0.1, hot_probability=0.9).sample(100000)
+    assert 0.88 < np.mean(indices < 100) < 0.92
+
+def test_index_keys_are_deterministic_uuids():
+    first = index_keys([0, 1, 2], namespace=5)
+    assert (first == index_keys([0, 1, 2], namespace=5)).all()
+    assert not (first == index_keys([0, 1, 2], namespace=6)).all()
+    assert len({bytes(row) for row in first}) == 3
+
+def test_key_pools_share_keys_for_a_distribution():
+    settings = {"type": "sequential", "partitions": 50}
+    writer, reader = KeyPool(seed=1, batch_size=10, distribution=settings), KeyPool(seed=2, batch_size=10, distribution=settings)
+    keys = [writer.take() for _ in range(60)]
+    assert keys == [reader.take() for _ in range(60)]
+    assert len(set(keys)) == 50
+    assert all(key.version == 4 for key in keys)
+
+def test_validate_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        validate_distribution({**DISTRIBUTION_DEFAULTS, "type": "pareto"})
@@ -0,0 +1,107 @@
+import time
+import pytest
+from cassandra import ConsistencyLevel
+from stressandra.engine import AsyncEngine
+
+@pytest.fixture
+def mock_session(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future()
+    return session
+
+def test_engine_round_robins_targets(mock_session):
+    targets = [(mock_session, "127.0.0.1", 9042), (mock_session, "127.0.0.1", 9043)]
+    engine = AsyncEngine(targets, rate=100, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl", max_in_flight=8)
+    engine.run()
+
+    summary = engine.summary()
+    assert summary["Nodes"]["127.0.0.1:9042"]["Sent"] == summary["Nodes"]["127.0.0.1:9043"]["Sent"] == 100
+    assert summary["Nodes"]["127.0.0.1:9042"]["Completed"] == 100
+    assert summary["Nodes"]["127.0.0.1:9042"]["Errors"] == 0
+    assert engine.histograms[("insert", "127.0.0.1:9043")].total == 100
+
+def test_engine_counts_errors_and_releases_permits(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future(exception=Exception("timeout"))
+    engine = AsyncEngine([(session, "127.0.0.1", 9042)], rate=50, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl", max_in_flight=4)
+    engine.run()
+
+    summary = engine.summary()["Nodes"]["127.0.0.1:9042"]
+    assert summary["Errors"] == 50
+    assert summary["Last Error"] == "timeout"
+
+def test_failing_result_handling_still_releases_the_permit(mock_session, fake_future):
+    engine = AsyncEngine([(mock_session, "127.0.0.1", 9042)], rate=10, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl", max_in_flight=1)
+    engine.in_flight.acquire()
+
+    # A read whose last column is not a blob cannot be sized.
+    with pytest.raises(TypeError):
+        engine.on_success([(b"id", 5)], engine.targets[0], "read", time.monotonic(), fake_future())
+    assert engine.in_flight.acquire(timeout=0)
+
+def test_latency_is_attributed_to_actual_coordinator(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future(coordinator_host="10.0.0.2:9042")
+    engine = AsyncEngine([(session, "127.0.0.1", 9042)], rate=20, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl")
+    engine.run()
+
+    summary = engine.summary()
+    assert summary["Coordinators"]["10.0.0.2:9042"]["Completed"] == 20
+    assert set(engine.histograms) == {("insert", "10.0.0.2:9042")}
+
+def test_ring_retention_deletes_oldest_keys(mock_session):
+    engine = AsyncEngine([(mock_session, "127.0.0.1", 9042)], rate=100, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl", retention={"mode": "ring", "max_keys": 50, "delete_rate": 1000})
+    engine.run()
+
+    node = engine.summary()["Nodes"]["127.0.0.1:9042"]
+    assert node["Completed"] == 100
+    assert node["Deleted"] == 50
+    assert node["Retained Keys"] == 50
+
+def test_reads_split_hits_and_misses(mocker, fake_future):
+    written = set()
+
+    def execute_async(statement, parameters=None):
+        # Selects get a row for keys that were written and no rows otherwise.
+        values = parameters or statement.values
+        if len(values) == 1:
+            return fake_future([[("row",)] if values[0] in written else []])
+        written.add(values[0])
+        return fake_future()
+
+    session = mocker.Mock()
+    session.execute_async.side_effect = execute_async
+    targets = [(session, "127.0.0.1", 9042)]
+    writer = AsyncEngine(targets, rate=100, duration=1, consistency=ConsistencyLevel.ONE, keyspace="ks", table="tbl",
+                         prepared=False, seed=1, reads={"record_keys": 1000})
+    writer.run()
+
+    reader = AsyncEngine(targets, rate=200, duration=1, consistency=ConsistencyLevel.ONE, keyspace="ks", table="tbl",
+                         prepared=False, seed=2, reads={"miss_ratio": 0.25}, operation="read", written=writer.written)
+    reader.run()
+
+    node = reader.summary()["Nodes"]["127.0.0.1:9042"]
+    assert node["Hits"] + node["Misses"] == 200
+    assert node["Misses"] == node["Intended Misses"]
+    assert 20 < node["Misses"] < 80
+    assert reader.histograms[("read_hit", "127.0.0.1:9042")].total == node["Hits"]
+    assert reader.histograms[("read_miss", "127.0.0.1:9042")].total == node["Misses"]
+
+def test_mixed_run_follows_operation_ratios(mock_session):
+    engine = AsyncEngine([(mock_session, "127.0.0.1", 9042)], rate=1000, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl", seed=3, operation="mixed",
+                         operations={"insert": 60, "read": 35, "delete": 5})
+    engine.run()
+
+    operations = engine.summary()["Operations"]
+    assert sum(stats["Sent"] for stats in operations.values()) == 1000
+    assert 540 < operations["insert"]["Sent"] < 660
+    assert 290 < operations["read"]["Sent"] < 410
+    assert 20 < operations["delete"]["Sent"] < 80
+    assert operations["read"]["Completed"] == operations["read"]["Sent"]
+    assert ("delete", "127.0.0.1:9042") in engine.histograms
@@ -0,0 +1,37 @@
+from stressandra.generators import KeyPool, ValuePool, OperationMix
+
+def test_key_pool_produces_version_4_uuids():
+    pool = KeyPool(seed=1, batch_size=64)
+    keys = [pool.take() for _ in range(200)]
+
+    assert all(key.version == 4 for key in keys)
+    assert all(key.variant == "specified in RFC 4122" for key in keys)
+    assert len(set(keys)) == 200
+    assert pool.generated == 256
+
+def test_pools_are_deterministic_with_a_seed():
+    first, second = KeyPool(seed=7, batch_size=16), KeyPool(seed=7, batch_size=16)
+    assert [first.take() for _ in range(40)] == [second.take() for _ in range(40)]
+    assert KeyPool(seed=[7, 0]).take() != KeyPool(seed=[7, 1]).take()
+
+def test_value_pool_slices_one_buffer():
+    pool = ValuePool(seed=3, size=100, buffer_size=4096, batch_size=8)
+    values = [pool.take() for _ in range(20)]
+
+    assert all(isinstance(value, memoryview) and len(value) == 100 for value in values)
+    assert all(value.obj is pool.buffer.obj for value in values)
+
+def test_value_pool_size_modes():
+    uniform = ValuePool(seed=4, mode="uniform", min_size=10, max_size=20, batch_size=500)
+    assert {len(uniform.take()) for _ in range(500)} == set(range(10, 21))
+
+    histogram = ValuePool(seed=5, mode="histogram", sizes=[100, 5000], weights=[3, 1], batch_size=1000)
+    sizes = [len(histogram.take()) for _ in range(1000)]
+    assert set(sizes) == {100, 5000}
+    assert 650 < sizes.count(100) < 850
+
+def test_operation_mix_skips_zero_weights():
+    mix = OperationMix({"insert": 3, "read": 1, "delete": 0}, seed=5, batch_size=1000)
+    ops = [mix.take() for _ in range(4000)]
+    assert set(ops) == {"insert", "read"}
+    assert 2800 < ops.count("insert") < 3200
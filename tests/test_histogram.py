@@ -0,0 +1,52 @@
+import pytest
+from stressandra.histogram import LatencyHistogram, merge_histograms
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(99) == 99
+    assert histogram.percentile(100) == 100
+    assert histogram.mean() == 50.5
+
+def test_large_values_within_relative_error():
+    histogram = LatencyHistogram(precision_bits=8)
+    for value in range(1000, 1_000_001, 1000):
+        histogram.record(value)
+
+    for percentile in (50, 90, 99):
+        expected = percentile * 10_000
+        assert histogram.percentile(percentile) == pytest.approx(expected, rel=1 / 128)
+
+def test_value_range_inverts_index_of():
+    histogram = LatencyHistogram()
+    for value in (0, 255, 256, 511, 512, 123_456, 59_999_999):
+        lowest, highest = histogram.value_range(histogram.index_of(value))
+        assert lowest <= value <= highest
+
+def test_values_above_max_are_clamped_but_max_is_exact():
+    histogram = LatencyHistogram(max_value=1_000_000)
+    histogram.record(5_000_000)
+
+    assert histogram.max == 5_000_000
+    assert histogram.percentile(100) == 5_000_000
+
+def test_merge_and_round_trip():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(100, count=3)
+    second.record(10_000)
+
+    merged = merge_histograms([{("insert", "a"): first}, {("insert", "a"): second}])[("insert", "a")]
+    restored = LatencyHistogram.from_dict(merged.to_dict())
+
+    assert restored.total == 4
+    assert restored.min == 100
+    assert restored.max == 10_000
+    assert restored.percentile(75) == 100
+    assert first.total == 3
+
+def test_merge_rejects_different_layouts():
+    with pytest.raises(ValueError):
+        LatencyHistogram(precision_bits=7).merge(LatencyHistogram(precision_bits=8))
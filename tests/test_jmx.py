@@ -1,27 +1,114 @@
+import csv
 import pytest
-from stressandra.jmx import collect_metrics
+import io
+import threading
+from stressandra.jmx import JMXCollector, JMXMetrics, MetricsWriter, check_java, parse_collector_line
+from stressandra.config import Config
+from stressandra.stressandra import Stressandra
 
-@pytest.fixture
-def mock_jmxquery(mocker):
-    mock_connection = mocker.patch("stressandra.jmx.JMXConnection")
-    mock_query = mocker.patch("stressandra.jmx.JMXQuery")
+MBEANS = [
+    "org.apache.cassandra.metrics:type=ClientRequest,scope=Write,name=Latency/Mean",
+    "org.apache.cassandra.metrics:type=ClientRequest,scope=Read,name=Latency/Mean",
+    "org.apache.cassandra.metrics:type=Storage,name=Load/Count",
+]
 
-    # Simulated JMX query results
-    mock_connection().query.return_value = [
-        mocker.Mock(metric_name="ClientRequest.Write.Latency", value=2.5),
-        mocker.Mock(metric_name="ClientRequest.Read.Latency", value=1.2),
-        mocker.Mock(metric_name="Storage.Load", value=1000),
-    ]
+def test_parse_collector_line():
+    sample = parse_collector_line("S\t10.0.0.1:7199\t1700000000250\t1.5\t0=2.5\t2=1000\n", MBEANS)
+    assert sample == ("sample", "10.0.0.1:7199", 1700000000.25, 1.5, {MBEANS[0]: 2.5, MBEANS[2]: 1000.0})
+    assert parse_collector_line("E\t10.0.0.1:7199\tjava.io.IOException: refused\n", MBEANS) == \
+        ("error", "10.0.0.1:7199", "java.io.IOException: refused")
 
-    return mock_connection
+def make_metrics(mocker, metrics_dir, target_rate=None):
+    config = mocker.Mock(jmx_metrics=[{"name": name, "mbean": mbean, "unit": None} for name, mbean in zip("ABC", MBEANS)])
+    return JMXMetrics(config, "10.0.0.1", 7199, str(metrics_dir), threading.Event(), target_rate=target_rate)
 
-def test_collect_metrics(mock_jmxquery):
-    results = collect_metrics(jmx_port=7199)
+def test_collector_dispatches_samples_per_node(mocker, tmp_path):
+    metrics = make_metrics(mocker, tmp_path, target_rate=lambda: 500)
+    collector = JMXCollector(["10.0.0.1:7199", "10.0.0.2:7199"], MBEANS)
+    collector.subscribe(metrics.host, metrics)
+    collector.read(io.StringIO(
+        "S\t10.0.0.1:7199\t1000\t0.8\t0=2.5\t1=1.2\n"
+        "S\t10.0.0.2:7199\t1000\t0.9\t0=9.0\n"
+        "E\t10.0.0.1:7199\tconnection refused\n"
+        "E\t10.0.0.1:7199\tconnection refused\n"
+        "S\t10.0.0.1:7199\t2000\t0.7\t0=3.5\n"
+    ))
 
-    # Validate expected metrics are present
-    assert any(m.metric_name == "ClientRequest.Write.Latency" and m.value == 2.5 for m in results)
-    assert any(m.metric_name == "ClientRequest.Read.Latency" and m.value == 1.2 for m in results)
-    assert any(m.metric_name == "Storage.Load" and m.value == 1000 for m in results)
+    metrics.stop_event.set()
+    metrics.collect_metrics_per_node()
+    assert {name: (stats.count, stats.mean) for name, stats in metrics.metrics.items()} == \
+        {"Target Rate": (2, 500), MBEANS[0]: (2, 3.0), MBEANS[1]: (1, 1.2)}
+    assert metrics.errors == ["connection refused"]
+    assert metrics.stats[MBEANS[0]]["Mean"] == 3.0
+    assert collector.query_ms == {"10.0.0.1:7199": 0.7}
 
-    # Ensure query() was called once
-    mock_jmxquery().query.assert_called_once()
+    with open(tmp_path / "10.0.0.1:7199.csv") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["Timestamp", "Target Rate"] + MBEANS
+    assert rows[1:] == [["1.0", "500", "2.5", "1.2", ""], ["2.0", "500", "3.5", "", ""]]
+
+def test_metrics_writer_flushes_in_batches_and_appends(tmp_path):
+    filename = str(tmp_path / "node.csv")
+    writer = MetricsWriter(filename, ["Timestamp", "a"], flush_rows=2, flush_seconds=60)
+    writer.write({"Timestamp": 1, "a": 5})
+    assert open(filename).read().splitlines() == ["Timestamp,a"]
+    writer.write({"Timestamp": 2})
+    assert open(filename).read().splitlines() == ["Timestamp,a", "1,5", "2,"]
+    writer.close()
+
+    MetricsWriter(filename, ["Timestamp", "a"]).close()
+    assert open(filename).read().splitlines()[0:1] == ["Timestamp,a"]
+    assert len(open(filename).read().splitlines()) == 3
+
+def test_collector_reports_a_dead_jvm(mocker, tmp_path):
+    metrics = make_metrics(mocker, tmp_path)
+    collector = JMXCollector(["10.0.0.1:7199"], MBEANS)
+    collector.subscribe(metrics.host, metrics)
+    collector.stderr_reader = mocker.Mock()
+    collector.stderr = ["Exception in thread main java.lang.IllegalArgumentException"]
+
+    collector.check_exit(1)
+
+    assert metrics.errors == ["JMX collector exited with code 1: Exception in thread main java.lang.IllegalArgumentException"]
+
+def test_config_rejects_mbeans_without_attribute():
+    with pytest.raises(ValueError, match="must name an attribute"):
+        Config(hostIPs=["127.0.0.1"], hostPorts=[9042], hostJMXPorts=[7199], write_test=True,
+               jmx_metrics=[{"name": "Load", "mbean": "org.apache.cassandra.metrics:type=Storage,name=Load", "unit": None}])
+
+def test_failed_run_stops_metrics_threads(mocker, tmp_path):
+    mocker.patch("stressandra.stressandra.check_java")
+    mocker.patch("stressandra.stressandra.JMXCollector")
+    mocker.patch.object(Stressandra, "setup")
+    mocker.patch.object(Stressandra, "run_warmup")
+    mocker.patch.object(Stressandra, "run_stress_test", side_effect=RuntimeError("stress failed"))
+    stressandra = Stressandra(hostIPs=["127.0.0.1"], hostPorts=[9042], hostJMXPorts=[7199], write_test=True,
+                              jmx_metrics=[{"name": "Load", "mbean": MBEANS[2], "unit": "bytes"}])
+    stressandra.metrics_dir = str(tmp_path)
+
+    with pytest.raises(RuntimeError, match="stress failed"):
+        stressandra.run()
+
+    assert all(metrics.stop_event.is_set() for metrics in stressandra.jmx_metric_objs)
+    assert not [thread for thread in threading.enumerate() if thread.name != "MainThread" and not thread.daemon]
+
+def test_check_java_fails_without_a_jvm(mocker):
+    mocker.patch.dict("os.environ", {"JAVA_HOME": "/nonexistent"})
+
+    with pytest.raises(RuntimeError, match="Java"):
+        check_java()
+
+def test_non_finite_samples_are_left_out_of_the_stats(mocker, tmp_path):
+    metrics = make_metrics(mocker, tmp_path)
+    collector = JMXCollector(["10.0.0.1:7199"], MBEANS)
+    collector.subscribe(metrics.host, metrics)
+    mocker.patch.object(metrics, "on_error", side_effect=RuntimeError("subscriber failed"))
+    collector.read(io.StringIO(
+        "S\t10.0.0.1:7199\t1000\t0.8\t0=Infinity\t1=NaN\n"
+        "E\t10.0.0.1:7199\tconnection refused\n"
+        "S\t10.0.0.1:7199\t2000\t0.7\t0=3.5\n"
+    ))
+
+    metrics.stop_event.set()
+    metrics.collect_metrics_per_node()
+    assert {name: stats.count for name, stats in metrics.metrics.items()} == {MBEANS[0]: 1}
@@ -0,0 +1,60 @@
+import queue
+import numpy as np
+from cassandra.metadata import Murmur3Token
+from stressandra.db import ProfiledSession
+from stressandra.generators import ValuePool
+from stressandra.load import Checkpoint, chunk_rows, load_chunk, run_loader, target_rows
+
+def test_target_rows_from_bytes():
+    payload = {"mode": "histogram", "size": 16, "min_size": 16, "max_size": 1024, "sizes": [100, 500], "weights": [3, 1]}
+    assert target_rows(1000, None, payload) == 1000
+    assert target_rows(1000, 2_000_000, payload) == 10000
+    assert target_rows(1, 1000, {"mode": "uniform", "min_size": 10, "max_size": 30}) == 50
+
+def test_chunk_rows_cover_every_row_once():
+    rows = np.concatenate([chunk_rows(chunk, 300, 1000) for chunk in range(4)])
+    assert rows.tolist() == list(range(1000))
+
+def test_checkpoint_resumes_only_the_same_dataset(tmp_path):
+    path = str(tmp_path / "load.json")
+    checkpoint = Checkpoint(path, {"Rows": 100})
+    checkpoint.done.update({0, 2})
+    checkpoint.save()
+
+    assert Checkpoint(path, {"Rows": 100}).done == {0, 2}
+    assert Checkpoint(path, {"Rows": 200}).done == set()
+
+def test_load_chunk_orders_rows_by_token(mocker):
+    execute = mocker.patch("stressandra.load.execute_concurrent_with_args",
+                           side_effect=lambda session, statement, parameters, **kwargs:
+                           [(True, None)] * (len(parameters) - 1) + [(False, Exception("timeout"))])
+    values = ValuePool(seed=1, size=10, buffer_size=1024, batch_size=16)
+
+    written, failed, written_bytes, error = load_chunk(mocker.Mock(), mocker.Mock(), np.arange(50), values)
+
+    keys = [key for key, _ in execute.call_args.args[2]]
+    tokens = [Murmur3Token.hash_fn(key.bytes) for key in keys]
+    assert tokens == sorted(tokens) and len(set(keys)) == 50
+    assert (written, failed, written_bytes, error) == (49, 1, 490, "timeout")
+
+def test_load_chunk_through_a_shared_cluster_session(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future()
+    values = ValuePool(seed=1, size=10, buffer_size=1024, batch_size=16)
+
+    result = load_chunk(ProfiledSession(session, "127.0.0.1:9042"), mocker.Mock(), np.arange(5), values)
+
+    assert result == (5, 0, 50, None)
+    assert {call.kwargs["execution_profile"] for call in session.execute_async.call_args_list} == {"127.0.0.1:9042"}
+
+def test_loader_keeps_the_configured_session_layout(mocker):
+    get_sessions = mocker.patch("stressandra.load.get_sessions", return_value={"127.0.0.1:9042": mocker.Mock()})
+    chunks, results = queue.Queue(), queue.Queue()
+    chunks.put(None)
+    hosts = [("127.0.0.1", 9042), ("127.0.0.1", 9043)]
+    settings = {"seed": 1, "payload": {"size": 10}}
+
+    run_loader(0, hosts, "ks", "tbl", None, settings, {"shared_cluster": False}, chunks, results)
+
+    get_sessions.assert_called_once_with(hosts[:1], shared_cluster=False, coordinator="token_aware")
+    assert results.empty()
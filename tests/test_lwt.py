@@ -0,0 +1,30 @@
+import itertools
+from cassandra import ConsistencyLevel
+from stressandra.engine import AsyncEngine
+from stressandra.lwt import LwtSource
+
+def test_contention_repeats_each_key_and_operation():
+    source = LwtSource(keys=1000, contention=4, operations={"insert": 1, "update": 1}, seed=1, batch_size=40)
+    requests = [source.take() for _ in range(40)]
+
+    for i in range(0, 40, 4):
+        assert len(set(requests[i:i + 4])) == 1
+    assert {kind for kind, _ in requests} == {"lwt_insert", "lwt_update"}
+
+def test_engine_counts_applied_and_uses_serial_consistency(mocker, fake_future):
+    outcomes = itertools.cycle([True, False, False])
+    session = mocker.Mock()
+    # Conditional statements answer with one [applied] row.
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future([[(next(outcomes),)]])
+    engine = AsyncEngine([(session, "127.0.0.1", 9042)], rate=90, duration=1, consistency=ConsistencyLevel.QUORUM,
+                         keyspace="ks", table="tbl", operation="lwt",
+                         lwt={"keys": 10, "contention": 3, "serial_consistency": "LOCAL_SERIAL",
+                              "operations": {"insert": 1}})
+    engine.run()
+
+    stats = engine.summary()["Operations"]["lwt_insert"]
+    assert stats["Applied"] == 30
+    assert stats["Not Applied"] == 60
+    assert engine.histograms[("lwt_insert_not_applied", "127.0.0.1:9042")].total == 60
+    session.prepare.assert_called_once_with("INSERT INTO ks.tbl (id, value) VALUES (?, ?) IF NOT EXISTS")
+    assert session.prepare.return_value.serial_consistency_level == ConsistencyLevel.LOCAL_SERIAL
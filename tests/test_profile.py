@@ -0,0 +1,84 @@
+import pytest
+from stressandra.profile import RateProfile
+from stressandra.scheduler import RateScheduler
+from stressandra.stressandra import Stressandra
+
+def test_rate_at_follows_segments():
+    profile = RateProfile([
+        {"type": "ramp", "start_rate": 100, "end_rate": 300, "duration": 10},
+        {"type": "step", "rates": [400, 500], "step_duration": 5},
+        {"type": "spike", "base_rate": 100, "peak_rate": 1000, "spike_at": 2, "spike_duration": 1, "duration": 5},
+        {"type": "sine", "mean_rate": 100, "amplitude": 50, "period": 4, "duration": 4},
+    ])
+
+    assert profile.duration == 29
+    assert profile.rate_at(5) == 200
+    assert profile.rate_at(12) == 400
+    assert profile.rate_at(17) == 500
+    assert profile.rate_at(21) == 100
+    assert profile.rate_at(22.5) == 1000
+    assert profile.rate_at(26) == pytest.approx(150)
+    assert profile.rate_at(100) == pytest.approx(100)
+    assert profile.scaled(3).rate_at(5) == 600
+
+def test_invalid_segments_are_rejected():
+    with pytest.raises(ValueError):
+        RateProfile([{"type": "sawtooth", "duration": 10}])
+    with pytest.raises(ValueError):
+        RateProfile([{"type": "ramp", "start_rate": 100, "duration": 10}])
+    with pytest.raises(ValueError):
+        RateProfile([{"type": "sine", "mean_rate": 100, "amplitude": 100, "period": 10, "duration": 10}])
+
+def test_scheduler_follows_profile():
+    clock = [0.0]
+    def sleep(seconds):
+        clock[0] += seconds
+    profile = RateProfile([{"type": "step", "rates": [10, 40], "step_duration": 1}])
+    scheduler = RateScheduler(profile, profile.duration, clock=lambda: clock[0], sleep=sleep)
+
+    intended_times = list(scheduler)
+
+    assert sum(1 for t in intended_times if t < 1) == pytest.approx(10, abs=1)
+    assert sum(1 for t in intended_times if t >= 1) == pytest.approx(40, abs=1)
+    assert [sample["Intended"] for sample in scheduler.samples] == [10, 40]
+
+def test_ramp_sends_its_integral_without_a_trailing_sample():
+    clock = [0.0]
+    def sleep(seconds):
+        clock[0] += seconds + 0.0002  # sleeps overshoot, so the last ops run just past the window
+    profile = RateProfile([{"type": "ramp", "start_rate": 100, "end_rate": 1000, "duration": 4}])
+    scheduler = RateScheduler(profile, profile.duration, clock=lambda: clock[0], sleep=sleep)
+
+    assert sum(1 for _ in scheduler) == 2200
+    assert [sample["Time"] for sample in scheduler.samples] == [1, 2, 3, 4]
+
+def test_intended_rate_is_the_window_average():
+    clock = [0.0]
+    def sleep(seconds):
+        clock[0] += seconds
+    profile = RateProfile([{"type": "sine", "mean_rate": 1000, "amplitude": 500, "period": 4, "duration": 4}])
+    scheduler = RateScheduler(profile, profile.duration, clock=lambda: clock[0], sleep=sleep)
+
+    list(scheduler)
+
+    for sample in scheduler.samples:
+        assert sample["Achieved"] == pytest.approx(sample["Intended"], rel=0.01)
+
+def test_target_rate_restarts_with_every_phase(mocker):
+    stressandra = Stressandra(hostIPs=["127.0.0.1"], hostPorts=[9042], hostJMXPorts=[7199], write_test=True,
+                              rate_profile=[{"type": "ramp", "start_rate": 100, "end_rate": 1000, "duration": 10}])
+    clock = mocker.patch("stressandra.stressandra.time.monotonic", return_value=1000.0)
+    targets = []
+
+    def run_phase(*args, **kwargs):
+        clock.return_value += 5
+        targets.append(stressandra.current_target_rate())
+        return mocker.Mock(histograms={}, written=None, counter_expected=None, scheduler=mocker.Mock(samples=[]))
+    mocker.patch.object(Stressandra, "run_async_engine", side_effect=run_phase)
+
+    stressandra.run_load(stressandra.rate_profile, 10, None, "Write")
+    clock.return_value += 100
+    stressandra.run_load(stressandra.rate_profile, 10, None, "Read")
+    stressandra.run_load(300, 10, None, "Wide Load")
+
+    assert targets == [550, 550, 300]
@@ -0,0 +1,66 @@
+import uuid
+import numpy as np
+from stressandra.retention import KeyRing, Retention, merge_key_rings
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_ring_is_fifo_and_drops_when_full():
+    ring = KeyRing(3)
+    keys = [uuid.uuid4().bytes for _ in range(4)]
+    for i, key in enumerate(keys):
+        ring.push(key, i)
+
+    assert len(ring) == 3
+    assert ring.dropped == 1
+    assert ring.oldest_time() == 1
+    assert ring.key_at(2) == keys[3]
+    assert [ring.pop() for _ in range(3)] == keys[1:]
+
+def test_deletes_past_max_keys_within_rate():
+    clock = FakeClock()
+    retention = Retention("ring", max_keys=10, delete_rate=5, clock=clock)
+    keys = [uuid.uuid4() for _ in range(20)]
+    for key in keys:
+        retention.record(key)
+
+    assert list(retention.due()) == keys[:5]
+    assert list(retention.due()) == []
+    clock.now = 1.0
+    assert list(retention.due()) == keys[5:10]
+    clock.now = 2.0
+    assert list(retention.due()) == []
+    assert retention.stats()["Retained Keys"] == 10
+
+def test_deletes_by_age():
+    clock = FakeClock()
+    retention = Retention("ring", max_keys=100, max_age=30, delete_rate=100, clock=clock)
+    old, new = uuid.uuid4(), uuid.uuid4()
+    retention.record(old)
+    clock.now = 20
+    retention.record(new)
+
+    clock.now = 40
+    assert list(retention.due()) == [old]
+
+def test_none_and_ttl_keep_no_keys():
+    for retention in (Retention("none"), Retention("ttl", ttl=60)):
+        retention.record(uuid.uuid4())
+        assert list(retention.due()) == []
+
+def test_key_ring_sample_and_merge():
+    first, second = KeyRing(4), KeyRing(4)
+    for i in range(6):
+        first.push(bytes([i]) * 16, i)
+    second.push(bytes([9]) * 16, 0)
+
+    sampled = {bytes(row) for row in first.sample(np.random.default_rng(0), 100)}
+    assert sampled == {bytes([i]) * 16 for i in range(2, 6)}
+
+    merged = merge_key_rings([first, second], 8)
+    assert len(merged) == 5
+    assert merged.key_at(4) == bytes([9]) * 16
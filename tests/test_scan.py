@@ -0,0 +1,54 @@
+from cassandra import ConsistencyLevel
+from stressandra.scan import TableScan, split_range, split_ring
+
+class Token:
+    def __init__(self, value):
+        self.value = value
+
+class Endpoint:
+    def __init__(self, address, port=9042):
+        self.address = address
+        self.port = port
+
+class Host:
+    def __init__(self, address):
+        self.endpoint = Endpoint(address)
+
+def make_metadata(mocker, values, hosts):
+    metadata = mocker.Mock()
+    metadata.partitioner = "org.apache.cassandra.dht.Murmur3Partitioner"
+    metadata.token_map.ring = [Token(value) for value in values]
+    metadata.token_map.get_replicas.side_effect = lambda keyspace, token: [hosts[values.index(token.value) % len(hosts)]]
+    return metadata
+
+def test_split_range_is_contiguous():
+    assert split_range(0, 10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert split_range(0, 2, 4) == [(0, 1), (1, 2)]
+
+def test_split_ring_covers_every_token_once(mocker):
+    metadata = make_metadata(mocker, [-100, 0, 500], [Host("10.0.0.1"), Host("10.0.0.2")])
+    ranges = split_ring(metadata, "ks", splits_per_range=2)
+
+    bounds = sorted((start, end) for start, end, _ in ranges)
+    assert bounds[0][0] == -2 ** 63 and bounds[-1][1] == 2 ** 63 - 1
+    assert all(previous[1] == following[0] for previous, following in zip(bounds, bounds[1:]))
+    assert len(ranges) == 8
+    # The wrapping range belongs to the first token's replicas.
+    assert {replicas[0].endpoint.address for start, end, replicas in ranges if end == -100} == {"10.0.0.1"}
+
+def test_scan_pages_each_range_on_a_replica(mocker, fake_future):
+    sessions = {"10.0.0.1:9042": mocker.Mock(), "10.0.0.2:9042": mocker.Mock()}
+    for session in sessions.values():
+        session.execute_async.side_effect = lambda *args, **kwargs: fake_future([[(1, b"abcd")] * 3, [(2, b"ab")]])
+    ranges = [(0, 10, [Host("10.0.0.1")]), (10, 20, [Host("10.0.0.2")]), (20, 30, [Host("10.0.0.2")])]
+    scan = TableScan(sessions, "ks", "tbl", "id", ranges, ConsistencyLevel.ONE, parallelism=2, fetch_size=3)
+    scan.run()
+
+    summary = scan.summary()
+    assert summary["Total"]["Rows"] == 12
+    assert summary["Total"]["Ranges"] == 3
+    assert summary["Nodes"]["10.0.0.2:9042"]["Rows"] == 8
+    assert sessions["10.0.0.1:9042"].execute_async.call_args.args[1] == (0, 10)
+    sessions["10.0.0.1:9042"].prepare.assert_called_once_with(
+        "SELECT * FROM ks.tbl WHERE token(id) > ? AND token(id) <= ?")
+    assert scan.histograms[("scan_range", "10.0.0.2:9042")].total == 2
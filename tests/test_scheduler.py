@@ -0,0 +1,52 @@
+from stressandra.scheduler import RateScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_deadlines_do_not_drift_with_work_time():
+    clock = FakeClock()
+    scheduler = RateScheduler(100, 2, clock=clock, sleep=clock.sleep)
+
+    intended_times = []
+    for intended in scheduler:
+        intended_times.append(intended)
+        clock.now += 0.004  # work that takes 40% of the interval
+
+    assert len(intended_times) == 200
+    assert intended_times[150] == 100.0 + 150 / 100
+    assert [round(sample["Achieved"]) for sample in scheduler.samples] == [100, 100]
+
+def test_bursts_when_behind():
+    clock = FakeClock()
+    sleeps = []
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.sleep(seconds)
+    scheduler = RateScheduler(10, 1, max_burst=4, clock=clock, sleep=sleep)
+
+    iterator = iter(scheduler)
+    next(iterator)
+    clock.now += 0.5  # stall for five intervals
+    released = [next(iterator) for _ in range(5)]
+
+    assert released == [100.0 + i / 10 for i in range(1, 6)]
+    assert 0 in sleeps  # yields the GIL once the burst limit is reached
+
+def test_reports_samples_to_callback():
+    clock = FakeClock()
+    reported = []
+    scheduler = RateScheduler(50, 3, on_report=reported.append, clock=clock, sleep=clock.sleep)
+
+    sent = sum(1 for _ in scheduler)
+
+    assert sent == 150
+    assert len(reported) == 3
+    assert all(sample["Intended"] == 50 for sample in reported)
+    assert scheduler.latest() is reported[-1]
@@ -0,0 +1,45 @@
+from stressandra.histogram import LatencyHistogram
+from stressandra.search import ThroughputSearch
+
+def fake_cluster(capacity):
+    """Latency stays at 2ms below capacity and jumps to 50ms above it."""
+    def run_step(rate):
+        histogram = LatencyHistogram()
+        histogram.record(2000 if rate <= capacity else 50_000, count=rate)
+        summary = {"Nodes": {"127.0.0.1:9042": {"Sent": rate, "Completed": rate, "Errors": 0, "Throughput": rate}}}
+        return summary, {("insert", "127.0.0.1:9042"): histogram}
+    return run_step
+
+def test_binary_search_converges_below_capacity():
+    search = ThroughputSearch(fake_cluster(3300), min_rate=100, max_rate=10000, p99_ms=10, tolerance=50)
+
+    best = search.run()
+
+    assert 3250 <= best <= 3300
+    assert search.steps[0].rate == 100 and search.steps[0].passed
+    assert search.steps[1].rate == 10000 and not search.steps[1].passed
+
+def test_ramp_stops_at_first_failure():
+    search = ThroughputSearch(fake_cluster(1000), min_rate=250, max_rate=5000, p99_ms=10, strategy="ramp", ramp_step=250)
+
+    assert search.run() == 1000
+    assert [step.rate for step in search.steps] == [250, 500, 750, 1000, 1250]
+    assert "p99" in search.table()
+
+def test_no_rate_passes():
+    search = ThroughputSearch(fake_cluster(10), min_rate=100, max_rate=1000, p99_ms=10)
+
+    assert search.run() is None
+    assert len(search.steps) == 1
+
+def test_judge_ignores_retention_deletes():
+    insert, expire = LatencyHistogram(), LatencyHistogram()
+    insert.record(2000, count=100)
+    expire.record(500_000, count=100)
+    summary = {"Nodes": {"127.0.0.1:9042": {"Sent": 100, "Completed": 100, "Errors": 0, "Throughput": 100}}}
+    search = ThroughputSearch(fake_cluster(100), min_rate=100, max_rate=1000, p99_ms=10)
+
+    step = search.judge(100, summary, {("insert", "127.0.0.1:9042"): insert, ("expire", "127.0.0.1:9042"): expire})
+
+    assert step.passed
+    assert step.p99 < 10
@@ -0,0 +1,33 @@
+from cassandra import ConsistencyLevel
+from cassandra.query import SimpleStatement
+from stressandra.statements import StatementCache
+
+def test_prepares_once_per_key(mocker):
+    session = mocker.Mock()
+    cache = StatementCache(session, prepared=True)
+
+    for _ in range(3):
+        statement, parameters = cache.bind("insert", "ks", "tbl", ConsistencyLevel.ONE, ("id", "value"))
+        assert parameters is None
+    cache.bind("insert", "ks", "tbl", ConsistencyLevel.QUORUM, ("id", "value"))
+
+    assert session.prepare.call_count == 2
+    session.prepare.assert_any_call("INSERT INTO ks.tbl (id, value) VALUES (?, ?)")
+    assert session.prepare.return_value.bind.call_count == 4
+
+def test_unprepared_returns_simple_statement(mocker):
+    session = mocker.Mock()
+    cache = StatementCache(session, prepared=False)
+
+    statement, parameters = cache.bind("delete", "ks", "tbl", ConsistencyLevel.ONE, ("id",))
+
+    assert isinstance(statement, SimpleStatement)
+    assert statement.query_string == "DELETE FROM ks.tbl WHERE id = %s"
+    assert statement.consistency_level == ConsistencyLevel.ONE
+    assert parameters == ("id",)
+    session.prepare.assert_not_called()
+
+def test_unprepared_copies_blob_slices(mocker):
+    cache = StatementCache(mocker.Mock(), prepared=False)
+    _, parameters = cache.bind("insert", "ks", "tbl", ConsistencyLevel.ONE, ("id", memoryview(b"payload")[1:4]))
+    assert parameters == ("id", b"ayl")
@@ -0,0 +1,37 @@
+import numpy as np
+from stressandra.streamstats import QuantileSketch, RunningStats, merge_running_stats
+
+def test_sketch_quantiles_stay_within_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(0, 2, size=20000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values.tolist():
+        sketch.add(value)
+
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = np.quantile(values, q, method="lower")
+        assert abs(sketch.quantile(q) - exact) <= 0.0101 * exact
+
+def test_sketch_handles_zeros_negatives_and_bounded_buckets():
+    sketch = QuantileSketch(max_buckets=16)
+    for value in [-8.0, -1.0, 0.0, 0.0, 1.0] + [float(2 ** i) for i in range(40)]:
+        sketch.add(value)
+    assert len(sketch.positive) <= 16
+    assert sketch.quantile(0) < -7.8 and sketch.quantile(2 / 44) == 0.0
+    assert abs(sketch.quantile(1) - 2 ** 39) <= 0.01 * 2 ** 39
+
+def test_running_stats_merge_matches_one_pass():
+    values = np.random.default_rng(2).normal(50, 10, size=3000)
+    nodes = [RunningStats() for _ in range(3)]
+    for i, value in enumerate(values.tolist()):
+        nodes[i % 3].add(value)
+
+    merged = merge_running_stats([{"latency": node} for node in nodes])["latency"].summary()
+    assert merged["Count"] == 3000
+    assert np.isclose(merged["Mean"], values.mean())
+    assert np.isclose(merged["StdDev"], values.std(ddof=1))
+    assert (merged["Min"], merged["Max"]) == (values.min(), values.max())
+    assert abs(merged["Median"] - np.median(values)) <= 0.02 * np.median(values)
+
+def test_empty_stats_summary():
+    assert RunningStats().summary() == {"Count": 0, "Mean": None, "Min": None, "Max": None, "Median": None,
+                                        "p90": None, "p99": None, "p999": None, "StdDev": 0}
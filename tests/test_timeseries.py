@@ -0,0 +1,33 @@
+import csv
+import numpy as np
+from stressandra.timeseries import TimeSeriesStore
+
+def test_store_round_trips_through_npz(tmp_path):
+    store = TimeSeriesStore()
+    store.extend("10.0.0.1:7199", 1.0, {"Write Latency": 2.5, "Load": 100.0})
+    store.extend("10.0.0.1:7199", 2.0, {"Write Latency": 3.5})
+    store.extend("10.0.0.2:7199", 1.5, {"Write Latency": 9.0})
+    store.save(str(tmp_path / "metrics.npz"))
+
+    loaded = TimeSeriesStore.load(str(tmp_path / "metrics.npz"))
+    assert sorted(loaded.keys()) == sorted(store.keys())
+    t, value = loaded.get("10.0.0.1:7199", "Write Latency")
+    assert t.tolist() == [1.0, 2.0] and value.tolist() == [2.5, 3.5]
+
+    loaded.to_csv(str(tmp_path / "metrics.csv"))
+    with open(tmp_path / "metrics.csv") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["Timestamp", "Node", "Metric", "Value"]
+    assert [float(row[0]) for row in rows[1:]] == [1.0, 1.0, 1.5, 2.0]
+    assert rows[3] == ["1.5", "10.0.0.2:7199", "Write Latency", "9.0"]
+
+def test_empty_store_saves(tmp_path):
+    TimeSeriesStore().save(str(tmp_path / "empty.npz"))
+    assert TimeSeriesStore.load(str(tmp_path / "empty.npz")).keys() == []
+
+def test_appending_after_get_is_allowed():
+    store = TimeSeriesStore()
+    store.append("n", "m", 1.0, 1.0)
+    t, _ = store.get("n", "m")
+    store.append("n", "m", 2.0, 2.0)
+    assert np.array_equal(store.get("n", "m")[0], [1.0, 2.0]) and t.tolist() == [1.0]
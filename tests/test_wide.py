@@ -0,0 +1,48 @@
+from cassandra import ConsistencyLevel
+from stressandra.engine import AsyncEngine
+from stressandra.wide import WidePartitions, WideRowSource, SliceSource, size_bucket
+
+def test_rows_per_partition_are_deterministic_and_bounded():
+    layout = WidePartitions("wide", partitions=50, min_rows=5, max_rows=20)
+    rows = layout.rows_in(range(50))
+    assert rows.min() >= 5 and rows.max() <= 20
+    assert (rows == WidePartitions("wide", partitions=50, min_rows=5, max_rows=20).rows_in(range(50))).all()
+    assert layout.total_rows() == rows.sum()
+
+def test_striped_row_sources_write_every_row_once():
+    layout = WidePartitions("wide", partitions=6, min_rows=1, max_rows=4)
+    total = layout.total_rows()
+    sources = [WideRowSource(layout, first, 2, batch_size=3) for first in range(2)]
+    written = []
+    for source in sources:
+        per_source = int(layout.rows_in(range(source.partition, 6, 2)).sum())
+        written += [source.take() for _ in range(per_source)]
+
+    assert len(set(written)) == total
+
+def test_slice_source_stays_inside_partitions():
+    layout = WidePartitions("wide", partitions=10, min_rows=50, max_rows=50, slice_rows=[10], range_ratio=0.5)
+    reads = [SliceSource(layout, seed=1, batch_size=100).take() for _ in range(100)]
+    for kind, values, partition_rows in reads:
+        assert partition_rows == 50
+        assert -1 <= values[1] < 40
+        assert values[2] == (values[1] + 10 if kind == "wide_range" else 10)
+    assert {kind for kind, _, _ in reads} <= {"wide_slice", "wide_range"}
+
+def test_size_bucket():
+    assert [size_bucket(n) for n in (0, 1, 9, 10, 11, 1000)] == [0, 1, 10, 10, 100, 1000]
+
+def test_wide_reads_follow_pages_and_bucket_latency(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future([[(1, b"ab")] * 3, [(4, b"ab")] * 2])
+    layout = WidePartitions("wide", partitions=10, min_rows=500, max_rows=500, slice_rows=[5], fetch_size=3)
+    engine = AsyncEngine([(session, "127.0.0.1", 9042)], rate=20, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="tbl", max_in_flight=4, operation="wide_read", wide=layout)
+    engine.run()
+
+    operations = engine.summary()["Operations"]["wide_read"]
+    assert operations["Completed"] == 20
+    assert operations["Rows"] == 100
+    assert engine.histograms[("wide_slice_p1000_r10", "127.0.0.1:9042")].total == 20
+    assert session.prepare.return_value.fetch_size == 3
+    session.prepare.assert_called_once_with("SELECT ck, value FROM ks.wide WHERE pk = ? AND ck > ? LIMIT ?")
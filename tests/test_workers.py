@@ -0,0 +1,28 @@
+import pytest
+from stressandra.workers import split_rate, merge_summaries
+
+def make_summary(sent, completed, errors, cpu):
+    return {
+        "Nodes": {"127.0.0.1:9042": {"Sent": sent, "Completed": completed, "Errors": errors, "Throughput": completed / 10, "Last Error": None}},
+        "Coordinators": {"127.0.0.1:9042": {"Completed": completed, "Throughput": completed / 10}},
+        "Client": {"Prepared": True, "Throughput": completed / 10, "CPU Seconds": cpu, "CPU ms per 1k Ops": None},
+    }
+
+def test_split_rate_preserves_total():
+    assert split_rate(1000, 3) == [334, 333, 333]
+    assert sum(split_rate(7, 4)) == 7
+
+def test_split_rate_rejects_idle_workers():
+    with pytest.raises(ValueError):
+        split_rate(3, 4)
+
+def test_merge_summaries_sums_workers():
+    merged = merge_summaries([make_summary(500, 490, 10, 2.0), make_summary(500, 500, 0, 3.0)])
+
+    node = merged["Nodes"]["127.0.0.1:9042"]
+    assert node["Sent"] == 1000
+    assert node["Completed"] == 990
+    assert node["Errors"] == 10
+    assert merged["Client"]["CPU Seconds"] == 5.0
+    assert merged["Client"]["Workers"] == 2
+    assert set(merged["Workers"]) == {"Worker 0", "Worker 1"}
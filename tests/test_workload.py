@@ -0,0 +1,92 @@
+import datetime
+import uuid
+import pytest
+from cassandra import ConsistencyLevel
+from stressandra.engine import AsyncEngine
+from stressandra.workload import ColumnGenerator, WorkloadProfile, RowSource
+
+PROFILE = {
+    "partition_keys": ["user_id"],
+    "clustering_columns": ["created"],
+    "clustering_order": {"created": "desc"},
+    "columns": {
+        "user_id": {"type": "uuid", "generator": "key"},
+        "created": {"type": "timestamp", "generator": "sequence"},
+        "name": {"type": "text", "size": 8},
+        "score": {"type": "int", "generator": "uniform", "min": 1, "max": 3},
+    },
+    "queries": {
+        "insert_event": {"cql": "INSERT INTO {keyspace}.{table} (user_id, created, name, score) VALUES (?, ?, ?, ?)",
+                   "parameters": ["user_id", "created", "name", "score"], "weight": 3},
+        "latest": {"cql": "SELECT * FROM {keyspace}.{table} WHERE user_id = ? LIMIT 10",
+                   "parameters": ["user_id"], "weight": 1},
+    },
+}
+
+def test_create_table_cql():
+    cql = WorkloadProfile(**PROFILE).create_table_cql("ks", "events")
+    assert cql == ("CREATE TABLE IF NOT EXISTS ks.events (user_id uuid, created timestamp, name text, score int, "
+                   "PRIMARY KEY ((user_id), created)) WITH CLUSTERING ORDER BY (created DESC)")
+
+def test_row_source_generates_typed_parameters():
+    rows = RowSource(WorkloadProfile(**PROFILE), seed=1, batch_size=16)
+    values = [rows.take("insert_event") for _ in range(40)]
+
+    assert all(isinstance(user_id, uuid.UUID) for user_id, _, _, _ in values)
+    assert all(isinstance(created, datetime.datetime) for _, created, _, _ in values)
+    assert all(len(name) == 8 and name.isalnum() for _, _, name, _ in values)
+    assert {score for _, _, _, score in values} == {1, 2, 3}
+    assert len(rows.take("latest")) == 1
+
+def test_profile_rejects_mismatched_bind_markers():
+    queries = {"bad": {"cql": "SELECT * FROM {keyspace}.{table} WHERE user_id = ?", "parameters": []}}
+    with pytest.raises(ValueError):
+        WorkloadProfile(**{**PROFILE, "queries": queries})
+
+def test_profile_rejects_reserved_query_names():
+    queries = {"read": {"cql": "SELECT * FROM {keyspace}.{table} WHERE user_id = ?", "parameters": ["user_id"]}}
+    with pytest.raises(ValueError, match="reserved"):
+        WorkloadProfile(**{**PROFILE, "queries": queries})
+
+def test_column_rejects_generator_for_wrong_type():
+    with pytest.raises(ValueError):
+        ColumnGenerator("name", "text", generator="gaussian")
+
+def test_engine_prepares_and_runs_profile_queries(mocker, fake_future):
+    session = mocker.Mock()
+    session.execute_async.side_effect = lambda *args, **kwargs: fake_future()
+    engine = AsyncEngine([(session, "127.0.0.1", 9042)], rate=200, duration=1, consistency=ConsistencyLevel.ONE,
+                         keyspace="ks", table="events", seed=2, workload=WorkloadProfile(**PROFILE))
+    engine.run()
+
+    prepared = {call.args[0] for call in session.prepare.call_args_list}
+    assert prepared == {
+        "INSERT INTO ks.events (user_id, created, name, score) VALUES (?, ?, ?, ?)",
+        "SELECT * FROM ks.events WHERE user_id = ? LIMIT 10",
+    }
+    operations = engine.summary()["Operations"]
+    assert operations["insert_event"]["Completed"] + operations["latest"]["Completed"] == 200
+    assert operations["insert_event"]["Completed"] > operations["latest"]["Completed"]
+
+def test_templates_keep_literal_braces_and_quoted_question_marks():
+    cql = "UPDATE {keyspace}.{table} SET tags = {'a?': 1}, note = 'why?' WHERE user_id = ? AND \"q?\" = $$?{x}$$"
+    queries = {"tag": {"cql": cql, "parameters": ["user_id"]}}
+    template = WorkloadProfile(**{**PROFILE, "queries": queries}).statement_templates()["tag"]
+
+    assert template.format(keyspace="ks", table="events", marker="?") == (
+        "UPDATE ks.events SET tags = {'a?': 1}, note = 'why?' WHERE user_id = ? AND \"q?\" = $$?{x}$$")
+
+def test_key_and_uuid_columns_draw_different_values():
+    columns = {"user_id": {"type": "uuid", "generator": "key"}, "other": {"type": "uuid", "generator": "uuid"}}
+    queries = {"insert_event": {"cql": "INSERT INTO {keyspace}.{table} (user_id, other) VALUES (?, ?)",
+                          "parameters": ["user_id", "other"]}}
+    rows = RowSource(WorkloadProfile(columns=columns, partition_keys=["user_id"], queries=queries), seed=1)
+    values = [rows.take("insert_event") for _ in range(100)]
+
+    assert not {key for key, _ in values} & {other for _, other in values}
+
+def test_now_timestamps_increase_per_row():
+    column = ColumnGenerator("created", "timestamp", generator="now")
+    values = column.batch(None, 100) + column.batch(None, 100)
+
+    assert all(earlier < later for earlier, later in zip(values, values[1:]))